@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+作答记录（Web 版和 GUI 共用）
+每次作答追加一条记录（学习者、题目ID、答案、是否正确、时间、用时），由后台线程批量写入
+SQLite（WAL 模式）：请求线程只把记录放进队列，不等待磁盘写入。
+
+写入记录的同一个事务中增量更新每个学习者的累计统计（learner_stats 表）和其他派生数据
+（如错题本，见 wrong_book），查询时只读一行，再加上本进程中还没写入的记录，不需要重新扫描作答记录。
+
+用法: python answer_log.py [学习者ID]   # 显示累计统计
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ANSWER_DB = 'answers.db'
+BATCH_SIZE = 500          # 每个事务最多写入的记录数
+CHECKPOINT_EVERY = 50     # 每写入多少批做一次 WAL 检查点
+LATENCY_MAX_MS = 60 * 60 * 1000
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS answers ('
+    'id INTEGER PRIMARY KEY, learner TEXT NOT NULL, source TEXT, question_id INTEGER NOT NULL, '
+    'answer TEXT NOT NULL, correct INTEGER NOT NULL, ts REAL NOT NULL, latency_ms INTEGER, attempt INTEGER)',
+    # 离线同步按 (学习者, 时间) 去重
+    'CREATE INDEX IF NOT EXISTS answers_learner_ts ON answers (learner, ts)',
+    'CREATE TABLE IF NOT EXISTS learner_stats ('
+    'learner TEXT PRIMARY KEY, answered INTEGER NOT NULL, correct INTEGER NOT NULL, '
+    'latency_ms INTEGER NOT NULL, timed INTEGER NOT NULL, last_ts REAL NOT NULL)',
+)
+_UPSERT_STATS = (
+    'INSERT INTO learner_stats (learner, answered, correct, latency_ms, timed, last_ts) '
+    'VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(learner) DO UPDATE SET '
+    'answered = answered + excluded.answered, correct = correct + excluded.correct, '
+    'latency_ms = latency_ms + excluded.latency_ms, timed = timed + excluded.timed, '
+    'last_ts = MAX(last_ts, excluded.last_ts)')
+
+
+# 作答记录的字段顺序（队列中的记录、answers 表的列）
+FIELDS = ('learner', 'source', 'question_id', 'answer', 'correct', 'ts', 'latency_ms', 'attempt')
+
+
+def connect(path: str, aggregates=()) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    for statement in _SCHEMA:
+        conn.execute(statement)
+    # 旧版本数据库没有 attempt 列
+    if 'attempt' not in [row[1] for row in conn.execute('PRAGMA table_info(answers)')]:
+        conn.execute('ALTER TABLE answers ADD COLUMN attempt INTEGER')
+    for aggregate in aggregates:
+        aggregate.init(conn)
+    return conn
+
+
+def normalize_latency(value) -> Optional[int]:
+    """客户端上报的用时（毫秒），无效时返回 None"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return int(value) if 0 <= value <= LATENCY_MAX_MS else None
+
+
+def _summarize(answered: int, correct: int, latency_ms: int, timed: int) -> Dict[str, Any]:
+    return {
+        'answered_questions': answered,
+        'correct_answers': correct,
+        'accuracy': round(correct / answered * 100, 1) if answered > 0 else 0,
+        'avg_latency_ms': round(latency_ms / timed) if timed else None,
+    }
+
+
+class AnswerLog:
+    """追加写入的作答记录 + 按学习者的累计统计
+
+    连接和写线程在首次使用时创建；fork 出的工作进程各自重新创建。
+    派生数据通过 add_aggregate 注册，对象需提供 init(conn)（建表）和 apply(conn, rows)（在写入事务中更新）
+    """
+
+    def __init__(self, path: str = ANSWER_DB, batch_size: int = BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.aggregates = []
+        self._pid = None
+        self._init_lock = threading.Lock()
+
+    def add_aggregate(self, aggregate):
+        """注册派生数据（须在首次记录之前）"""
+        self.aggregates.append(aggregate)
+
+    def _check_pid(self):
+        if self._pid == os.getpid():
+            return
+        with self._init_lock:
+            if self._pid != os.getpid():
+                self._start()
+
+    def _start(self):
+        self._queue = queue.Queue()
+        # record 只持有 _lock；写线程提交事务并扣减增量时持有 _commit_lock，
+        # 读统计时也持有它，保证数据库中的累计值和未写入的增量不会重复或遗漏
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self._pending = {}  # 学习者 -> 还没写入的记录（按入队顺序）
+        self._reader = connect(self.path, self.aggregates)
+        self._writer = threading.Thread(target=self._run, name='answer-log', daemon=True)
+        self._writer.start()
+        self._pid = os.getpid()
+        atexit.register(self.close)
+
+    def record(self, learner: str, question_id: int, answer: str, is_correct: bool,
+               latency_ms: Optional[int] = None, source: Optional[str] = None,
+               attempt: Optional[int] = None, ts: Optional[float] = None):
+        """追加一条作答记录（只入队，不等待写入）
+
+        source 为 None 表示题库题目（question_id 为全局题目ID）；attempt 标识一次考试（开始考试的时间戳）
+        """
+        self._check_pid()
+        ts = ts or time.time()
+        row = (learner, source, question_id, answer, int(bool(is_correct)), ts, latency_ms, attempt)
+        with self._lock:
+            self._pending.setdefault(learner, []).append(row)
+        self._queue.put(row)
+
+    def snapshot(self, learner: str, read: Callable[[sqlite3.Connection, str], Any]) -> Tuple[Any, List[tuple]]:
+        """一致地读取 (read(连接, 学习者) 的结果, 本进程还没写入的该学习者记录)"""
+        self._check_pid()
+        with self._commit_lock:
+            stored = read(self._reader, learner)
+            with self._lock:
+                pending = list(self._pending.get(learner, ()))
+        return stored, pending
+
+    def stats(self, learner: str) -> Dict[str, Any]:
+        """学习者的累计统计：数据库中的累计值 + 本进程未写入的记录"""
+        row, pending = self.snapshot(learner, _read_stats)
+        totals = list(row)
+        for pending_row in pending:
+            _add_row(totals, pending_row)
+        return _summarize(*totals[:4])
+
+    def recorded_ts(self, learner: str, timestamps) -> set:
+        """timestamps 中已有记录（含本进程未写入的）的作答时间，用于离线同步重发时去重"""
+        wanted = set(timestamps)
+        if not wanted:
+            return set()
+
+        def read(conn, learner):
+            return {row[0] for row in conn.execute(
+                'SELECT ts FROM answers WHERE learner = ? AND ts BETWEEN ? AND ?',
+                (learner, min(wanted), max(wanted)))}
+
+        stored, pending = self.snapshot(learner, read)
+        return (stored | {row[5] for row in pending}) & wanted
+
+    def history(self, learner: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """最近的作答记录（已写入部分）"""
+        self._check_pid()
+        with self._commit_lock:
+            rows = self._reader.execute(
+                'SELECT source, question_id, answer, correct, ts, latency_ms, attempt FROM answers '
+                'WHERE learner = ? ORDER BY id DESC LIMIT ?', (learner, limit)).fetchall()
+        return [{'source': r[0], 'question_id': r[1], 'answer': r[2], 'is_correct': bool(r[3]),
+                 'ts': r[4], 'latency_ms': r[5], 'attempt': r[6]} for r in rows]
+
+    def flush(self):
+        """等待队列中的记录全部写入"""
+        if self._pid == os.getpid():
+            self._queue.join()
+
+    def close(self):
+        if self._pid != os.getpid() or not self._writer.is_alive():
+            return
+        self._queue.put(None)
+        self._writer.join()
+
+    def _run(self):
+        conn = connect(self.path, self.aggregates)
+        # 检查点在提交锁之外执行，读统计的请求不会等待 fsync
+        conn.execute('PRAGMA wal_autocheckpoint=0')
+        batches = 0
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            # 队列中已有的记录一起写入：负载越高，每批越大
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                stopping = True
+            rows = [row for row in batch if row is not None]
+            if rows:
+                self._write(conn, rows)
+                batches += 1
+                if batches % CHECKPOINT_EVERY == 0:
+                    conn.execute('PRAGMA wal_checkpoint(PASSIVE)')
+            for _ in batch:
+                self._queue.task_done()
+        conn.execute('PRAGMA wal_checkpoint(PASSIVE)')
+        conn.close()
+
+    def _write(self, conn: sqlite3.Connection, rows):
+        deltas = {}
+        for row in rows:
+            delta = deltas.get(row[0])
+            if delta is None:
+                delta = deltas[row[0]] = [0, 0, 0, 0, 0.0]
+            _add_row(delta, row)
+        with self._commit_lock:
+            try:
+                conn.execute('BEGIN')
+                conn.executemany(
+                    f'INSERT INTO answers ({", ".join(FIELDS)}) VALUES ({", ".join("?" * len(FIELDS))})', rows)
+                conn.executemany(_UPSERT_STATS, [(learner, *delta) for learner, delta in deltas.items()])
+                for aggregate in self.aggregates:
+                    aggregate.apply(conn, rows)
+                conn.execute('COMMIT')
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                print(f'作答记录写入失败，丢弃 {len(rows)} 条: {e}')
+            # 每个学习者最早入队的记录就是本批写入的记录
+            with self._lock:
+                for learner, delta in deltas.items():
+                    pending = self._pending[learner]
+                    del pending[:delta[0]]
+                    if not pending:
+                        del self._pending[learner]
+
+
+def _read_stats(conn: sqlite3.Connection, learner: str):
+    return conn.execute('SELECT answered, correct, latency_ms, timed, last_ts FROM learner_stats '
+                        'WHERE learner = ?', (learner,)).fetchone() or (0, 0, 0, 0, 0.0)
+
+
+def _add_row(delta: list, row: tuple):
+    """把一条记录计入增量 [作答数, 答对数, 用时合计, 计时题数, 最后作答时间]"""
+    delta[0] += 1
+    delta[1] += row[4]
+    if row[6] is not None:
+        delta[2] += row[6]
+        delta[3] += 1
+    delta[4] = max(delta[4], row[5])
+
+
+def main():
+    path = os.environ.get('EXAM_ANSWER_DB', ANSWER_DB)
+    if not os.path.exists(path):
+        print(f'没有作答记录: {path}')
+        sys.exit(1)
+    conn = connect(path)
+    if len(sys.argv) > 1:
+        rows = conn.execute('SELECT learner, answered, correct, latency_ms, timed FROM learner_stats '
+                            'WHERE learner = ?', (sys.argv[1],)).fetchall()
+    else:
+        rows = conn.execute('SELECT learner, answered, correct, latency_ms, timed FROM learner_stats '
+                            'ORDER BY answered DESC').fetchall()
+    for learner, *values in rows:
+        stats = _summarize(*values)
+        latency = f"，平均用时 {stats['avg_latency_ms'] / 1000:.1f} 秒" if stats['avg_latency_ms'] is not None else ''
+        print(f"{learner}: 作答 {stats['answered_questions']} 题，答对 {stats['correct_answers']} 题，"
+              f"正确率 {stats['accuracy']}%{latency}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+题库导出（离线练习用）
+网页把整个题库缓存在本机（Cache Storage），离线时在浏览器中出题和判分。导出格式紧凑：
+
+    {"version": "…", "types": ["single_choice", ...], "total": 480,
+     "questions": [[题型序号, 题干, [选项...], 答案], ...]}      # 下标即全局题目ID
+
+版本号由每道题的内容摘要计算，题库不变时不变。每个版本的逐题摘要保存在编译后题库旁的 bank_versions.json
+（保留最近 KEEP_VERSIONS 个），客户端带着旧版本号请求时只返回变化的题：
+
+    {"version": "新", "base": "旧", "total": 480, "changes": [[全局题目ID, 题目], ...]}
+
+整份导出和各个增量都只在首次请求时序列化一次并预压缩（static_assets.Asset：强 ETag、gzip/br）。
+
+用法: python bank_export.py [旧版本号]   # 显示当前版本、导出大小和相对旧版本的变化
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+from question_bank import load_bank
+from static_assets import Asset
+
+BANK_VERSIONS_FILE = 'bank_versions.json'
+KEEP_VERSIONS = 10
+EXPORT_CACHE_CONTROL = 'no-cache'
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class BankExport:
+    """当前题库的导出和相对历史版本的增量
+
+    versions_path 省略时使用题库文件所在目录下的 BANK_VERSIONS_FILE（与工作目录无关）；
+    题库不是从文件映射的（如目录只读时在内存中编译）则只在内存中记录当前版本。
+    """
+
+    def __init__(self, bank, versions_path: Optional[str] = None, keep: int = KEEP_VERSIONS):
+        self.types = list(bank.types)
+        self.questions = []
+        for question_type in self.types:
+            type_idx = self.types.index(question_type)
+            for question in bank.questions[question_type]:
+                self.questions.append([type_idx, question['text'], list(question['options']), question['answer']])
+        self.digests = [hashlib.blake2b(_dumps(q), digest_size=8).hexdigest() for q in self.questions]
+        self.version = hashlib.blake2b(''.join(self.types + self.digests).encode('ascii'),
+                                       digest_size=8).hexdigest()
+        if versions_path is None and bank.path is not None:
+            versions_path = os.path.join(os.path.dirname(os.path.abspath(bank.path)), BANK_VERSIONS_FILE)
+        self.versions_path = versions_path
+        self.history = self._update_history(keep)
+        self.full = Asset('bank_export.json', 'application/json', _dumps({
+            'version': self.version, 'types': self.types, 'total': len(self.questions), 'questions': self.questions,
+        }), EXPORT_CACHE_CONTROL)
+        self._deltas = {}
+        self._lock = threading.Lock()
+
+    def _update_history(self, keep: int) -> Dict[str, List[str]]:
+        """读取历史版本的逐题摘要，记下当前版本（写入失败不影响导出，只是旧客户端会收到整份题库）"""
+        if self.versions_path is None:
+            return {self.version: self.digests}
+        try:
+            with open(self.versions_path, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+        except (OSError, ValueError):
+            history = {}
+        if history.get(self.version) != self.digests:
+            history.pop(self.version, None)
+            history[self.version] = self.digests
+            history = dict(list(history.items())[-keep:])
+            try:
+                tmp = f'{self.versions_path}.{os.getpid()}.tmp'
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(history, f)
+                os.replace(tmp, self.versions_path)
+            except OSError as e:
+                print(f'题库版本记录写入失败: {e}')
+        return history
+
+    def changes(self, base: str) -> Optional[List[list]]:
+        """相对旧版本变化的题 [[全局题目ID, 题目], ...]；不认识的版本返回 None"""
+        old = self.history.get(base)
+        if old is None:
+            return None
+        return [[i, q] for i, (q, digest) in enumerate(zip(self.questions, self.digests))
+                if i >= len(old) or old[i] != digest]
+
+    def export(self, since: Optional[str] = None) -> Asset:
+        """since 为客户端已有的版本：认识时返回增量（版本相同时为空增量），否则返回整份题库"""
+        if not since or since not in self.history:
+            return self.full
+        with self._lock:
+            delta = self._deltas.get(since)
+            if delta is None:
+                delta = self._deltas[since] = Asset(f'bank_delta_{since}.json', 'application/json', _dumps({
+                    'version': self.version, 'base': since, 'types': self.types, 'total': len(self.questions),
+                    'changes': self.changes(since),
+                }), EXPORT_CACHE_CONTROL)
+        return delta
+
+
+def main():
+    export = BankExport(load_bank())
+    sizes = ' | '.join(f'{encoding} {len(body) / 1024:.1f} KB' for encoding, body in export.full.bodies.items())
+    print(f'题库版本 {export.version}，{len(export.questions)} 题，导出 {sizes}')
+    print(f'已记录的版本: {", ".join(export.history)}')
+    if len(sys.argv) > 1:
+        changes = export.changes(sys.argv[1])
+        if changes is None:
+            print(f'未知版本 {sys.argv[1]}，客户端将收到整份题库')
+        else:
+            print(f'相对 {sys.argv[1]} 有 {len(changes)} 道题变化')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+响应编码与压缩微基准
+对题库中的每道题（单题响应）、每 20 题一页（/get_questions）和交卷结果（/submit_answer），
+比较各种输出方式的传输字节数和每次请求的 CPU 耗时：
+- ascii   : 原输出（中文转义为 \\uXXXX，不压缩；与 utf8 一样直接返回缓存的字节）
+- utf8    : UTF-8 JSON，不压缩
+- gzip    : UTF-8 JSON，每次请求整体 gzip（级别 6）
+- spliced : 预压缩的静态部分 + 实时压缩的会话字段（compression.gzip_join，单题响应使用；
+            一页多题时片段互相独立，不如整体 gzip，页面响应使用整体压缩）
+- br      : UTF-8 JSON，每次请求整体 brotli（需安装 brotli）
+用法: python bench_compression.py [每种方式的重复轮数]
+"""
+
+import json
+import sys
+import time
+
+import compression
+from question_bank import load_bank
+from question_payloads import QuestionPayloadCache, encode
+
+
+def cases(payloads, bank):
+    """(名称, [(静态+会话片段列表, 未压缩的 UTF-8 响应体, ASCII 转义的响应体), ...])"""
+    singles = []
+    for question_type in bank.types:
+        for q_idx in range(len(bank.questions[question_type])):
+            fields = {'question_number': len(singles) + 1, 'total_count': bank.record_count}
+            parts = payloads._parts(question_type, q_idx, **fields)
+            singles.append(_sample(parts))
+
+    pages = []
+    items = [(t, i, {'question_number': n + 1, 'total_count': bank.record_count})
+             for n, (t, i) in enumerate((t, i) for t in bank.types for i in range(len(bank.questions[t])))]
+    for start in range(0, len(items), 20):
+        header = f',"next_start":{start + 21},"count":20'
+        parts = payloads._page_parts(items[start:start + 20], header)
+        pages.append(_sample(parts))
+
+    results = []
+    for n in range(200):
+        result = {'status': 'success', 'is_correct': n % 3 != 0, 'correct_answer': 'ABD', 'user_answer': 'AB',
+                  'total_questions': n + 1, 'answered_questions': n + 1, 'correct_answers': n * 2 // 3,
+                  'accuracy': 66.7, 'review_in': '10 分钟', 'message': '回答错误，正确答案是：ABD'}
+        body = json.dumps(result, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        results.append(_sample([body]))
+    return [('单题', singles), ('20 题一页', pages), ('交卷结果', results)]
+
+
+def _sample(parts):
+    body = encode(parts, 'identity')
+    return parts, body, json.dumps(json.loads(body), separators=(',', ':')).encode('ascii')
+
+
+def measure(samples, encode_one, rounds: int):
+    total_bytes = sum(len(encode_one(*sample)) for sample in samples)
+    started = time.process_time()
+    for _ in range(rounds):
+        for sample in samples:
+            encode_one(*sample)
+    cpu = time.process_time() - started
+    count = len(samples) * rounds
+    return {'bytes': round(total_bytes / len(samples)), 'cpu_us': round(cpu / count * 1e6, 1)}
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    bank = load_bank()
+    payloads = QuestionPayloadCache(bank.questions)
+    methods = {
+        'ascii': lambda parts, body, ascii_body: ascii_body,
+        'utf8': lambda parts, body, ascii_body: body,
+        'gzip': lambda parts, body, ascii_body: compression.compress(body, 'gzip'),
+        'spliced': lambda parts, body, ascii_body: compression.gzip_join(parts),
+    }
+    if 'br' in compression.ENCODINGS:
+        methods['br'] = lambda parts, body, ascii_body: compression.compress(body, 'br')
+
+    report = {}
+    print(f"{'响应':<10} {'方式':>8} {'平均字节':>10} {'CPU(微秒/次)':>14}")
+    for name, samples in cases(payloads, bank):
+        report[name] = {}
+        for method, func in methods.items():
+            if method == 'spliced' and name == '交卷结果':
+                continue  # 没有静态部分
+            r = report[name][method] = measure(samples, func, rounds)
+            print(f"{name:<10} {method:>8} {r['bytes']:>10} {r['cpu_us']:>14}")
+    print(json.dumps(report, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
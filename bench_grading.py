@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+判分微基准
+对比三种方式批量判分 1 万 / 10 万 / 100 万份答案的吞吐量：
+- legacy : 原 check_answer（字符串大写 + set 比较）
+- mask   : 逐题掩码整数比较
+- numpy  : grade_sheet 向量化判分（需安装 NumPy）
+用法: python bench_grading.py [答案数 ...]
+"""
+
+import json
+import random
+import sys
+import time
+
+import grading
+from question_bank import load_bank, mask_to_answer
+
+
+def legacy_check_answer(question_type, user_answer, correct_answer):
+    """改造前的判分实现（用于对比）"""
+    user_answer = user_answer.upper().strip()
+    correct_answer = correct_answer.upper().strip()
+    if question_type == 'multiple_choice':
+        return set(user_answer.replace(' ', '')) == set(correct_answer.replace(' ', ''))
+    return user_answer == correct_answer
+
+
+def make_sheet(bank, n, seed=2024):
+    """随机生成 n 份作答：约 70% 答对，其余随机选项"""
+    rng = random.Random(seed)
+    correct_masks = bank.answer_masks()
+    types = [bank.locate_id(i)[0] for i in range(bank.record_count)]
+    ids = [rng.randrange(bank.record_count) for _ in range(n)]
+    user_masks = bytearray(n)
+    for k, qid in enumerate(ids):
+        if rng.random() < 0.7:
+            user_masks[k] = correct_masks[qid]
+        else:
+            user_masks[k] = rng.randrange(1, 32)
+    return ids, bytes(user_masks), types
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run(n, bank):
+    ids, user_masks, types = make_sheet(bank, n)
+    correct_masks = bank.answer_masks()
+    user_answers = [mask_to_answer(m) for m in user_masks]
+    correct_answers = [mask_to_answer(correct_masks[q]) for q in ids]
+    question_types = [types[q] for q in ids]
+    sheet_correct = bytes(correct_masks[q] for q in ids)
+
+    results = {}
+    elapsed, legacy = timed(lambda: sum(
+        legacy_check_answer(t, u, c) for t, u, c in zip(question_types, user_answers, correct_answers)))
+    results['legacy'] = elapsed
+
+    elapsed, mask = timed(lambda: sum(
+        grading.grade_mask(u, c) for u, c in zip(user_masks, sheet_correct)))
+    results['mask'] = elapsed
+    assert mask == legacy, '掩码判分结果与原实现不一致'
+
+    if grading.np is not None:
+        elapsed, scores = timed(lambda: grading.grade_sheet(user_masks, sheet_correct))
+        results['numpy'] = elapsed
+        assert int(scores.sum()) == legacy, '向量化判分结果与原实现不一致'
+
+    return {name: {'seconds': round(t, 6), 'answers_per_sec': round(n / t) if t else None}
+            for name, t in results.items()}
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    bank = load_bank()
+    report = {}
+    print(f"{'答案数':>10} {'方式':>8} {'耗时(s)':>10} {'吞吐(份/秒)':>14}")
+    for n in sizes:
+        report[n] = run(n, bank)
+        for name, r in report[n].items():
+            print(f"{n:>10} {name:>8} {r['seconds']:>10.4f} {r['answers_per_sec']:>14,}")
+    print(json.dumps(report))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GUI 换题耗时基准（不需要操作界面；没有显示器的 Linux 服务器可用 xvfb-run python bench_gui.py）
+按固定随机顺序在题库中换题（题型混合，单选/多选/判断交替出现），每次换题 = 显示新题的选项 + 按一个随机答案高亮：
+- rebuild : 原实现（每题销毁并重建选项框架和按钮，高亮/恢复颜色时用 isinstance 遍历所有控件）
+- pooled  : OptionRows（A–E 行只创建一次，原地更新；按字母直接找到要高亮的行）
+- full    : ExamSystemGUI.show_question + 高亮的全流程（题目文字、题号、选项、统计信息）
+每次换题后调用 update() 处理完 Tk 排队的布局和重绘，计入耗时。
+用法: python bench_gui.py [换题次数]
+"""
+
+import json
+import random
+import statistics
+import sys
+import time
+import tkinter as tk
+
+from exam_system_gui import ExamSystemGUI, OptionRows
+from question_bank import OPTION_LETTERS, load_bank
+
+COLORS = {'white': '#FFFFFF', 'text': '#333333', 'success': '#4CAF50', 'error': '#F44336'}
+FONTS = {'normal': ('微软雅黑', 10), 'large': ('微软雅黑', 11)}
+
+
+class LegacyOptions:
+    """改造前的选项区域（用于对比）：每题销毁重建，高亮和恢复颜色时遍历所有控件"""
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.option_widgets = []
+
+    def show(self, question_type, options):
+        for widget in self.option_widgets:
+            widget.destroy()
+        self.option_widgets.clear()
+        self.reset_colors()
+        container = tk.Frame(self.parent, bg=COLORS['white'])
+        container.pack(fill=tk.X, padx=10, pady=10)
+        self.option_widgets.append(container)
+        self.choice = tk.StringVar()
+        self.checks = {}
+        for value, text in zip(OPTION_LETTERS, options):
+            frame = tk.Frame(container, bg=COLORS['white'], relief=tk.RIDGE, bd=1)
+            frame.pack(fill=tk.X, pady=2)
+            if question_type == 'multiple_choice':
+                var = self.checks[value] = tk.BooleanVar(value=False)
+                button = tk.Checkbutton(frame, text=f"{value}. {text}", variable=var, font=FONTS['normal'],
+                                        bg=COLORS['white'], wraplength=700, justify=tk.LEFT, padx=10, pady=5)
+                button.option_value = value
+            elif question_type == 'judgment':
+                button = tk.Radiobutton(frame, text=f"{value}. {text}", variable=self.choice, value=value,
+                                        font=FONTS['large'], bg=COLORS['white'], padx=20, pady=8)
+            else:
+                button = tk.Radiobutton(frame, text=f"{value}. {text}", variable=self.choice, value=value,
+                                        font=FONTS['normal'], bg=COLORS['white'], wraplength=700, justify=tk.LEFT,
+                                        padx=10, pady=5)
+            button.pack(anchor=tk.W)
+            self.option_widgets.append(button)
+            self.option_widgets.append(frame)
+
+    def highlight(self, user_answer, correct_answer):
+        correct = set(correct_answer)
+        for widget in self.option_widgets:
+            if isinstance(widget, (tk.Radiobutton, tk.Checkbutton)):
+                if isinstance(widget, tk.Radiobutton):
+                    value = widget['value']
+                else:
+                    value = getattr(widget, 'option_value', None)
+                if value in correct:
+                    widget.config(bg='#E8F5E8', fg=COLORS['success'])
+                    widget.master.config(bg='#E8F5E8', relief=tk.RIDGE, bd=2)
+                elif value in user_answer:
+                    widget.config(bg='#FFE8E8', fg=COLORS['error'])
+                    widget.master.config(bg='#FFE8E8', relief=tk.RIDGE, bd=2)
+
+    def reset_colors(self):
+        for widget in self.option_widgets:
+            if isinstance(widget, (tk.Radiobutton, tk.Checkbutton)):
+                widget.config(bg=COLORS['white'], fg=COLORS['text'])
+                widget.master.config(bg=COLORS['white'], relief=tk.RIDGE, bd=1)
+
+
+def make_sequence(bank, n, seed=2024):
+    """[(题型, 题目下标, 题目, 选项列表, 随机答案), ...]"""
+    rng = random.Random(seed)
+    sequence = []
+    for _ in range(n):
+        question_type, q_idx = bank.locate_id(rng.randrange(bank.record_count))
+        question = bank.questions[question_type][q_idx]
+        options = ['正确', '错误'] if question_type == 'judgment' else list(question['options'])
+        answer = rng.choice(OPTION_LETTERS[:len(options)])
+        sequence.append((question_type, q_idx, question, options, answer))
+    return sequence
+
+
+def measure(root, switch, sequence):
+    """逐次换题计时，返回 {'mean_ms', 'p50_ms', 'p95_ms'}"""
+    for item in sequence[:20]:  # 预热
+        switch(*item)
+        root.update()
+    timings = []
+    for item in sequence:
+        started = time.perf_counter()
+        switch(*item)
+        root.update()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {'mean_ms': round(statistics.fmean(timings), 3), 'p50_ms': round(timings[len(timings) // 2], 3),
+            'p95_ms': round(timings[int(len(timings) * 0.95)], 3)}
+
+
+def bench_options(sequence):
+    root = tk.Tk()
+    root.geometry('950x600')
+    results = {}
+    for name, create in (('rebuild', LegacyOptions), ('pooled', lambda parent: OptionRows(parent, COLORS, FONTS))):
+        frame = tk.LabelFrame(root, text='选项')
+        frame.pack(fill=tk.X)
+        options = create(frame)
+
+        def switch(question_type, q_idx, question, option_texts, answer, options=options):
+            options.show(question_type, option_texts)
+            options.highlight(answer, question['answer'])
+
+        results[name] = measure(root, switch, sequence)
+        frame.destroy()
+    root.destroy()
+    return results
+
+
+def bench_full(sequence):
+    app = ExamSystemGUI()
+
+    def switch(question_type, q_idx, question, option_texts, answer):
+        app.show_question(question_type, q_idx, question)
+        app.highlight_answer_options(answer, question['answer'])
+
+    result = measure(app.root, switch, sequence)
+    app.root.destroy()
+    return result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    try:
+        tk.Tk().destroy()
+    except tk.TclError as e:
+        print(f'无法创建窗口（{e}），没有显示器时请用: xvfb-run python bench_gui.py')
+        raise SystemExit(1)
+
+    bank = load_bank()
+    sequence = make_sequence(bank, n)
+    report = bench_options(sequence)
+    report['full'] = bench_full(sequence)
+    print(f"{'方式':<10} {'平均(毫秒)':>10} {'中位数':>10} {'P95':>10}")
+    for name, r in report.items():
+        print(f"{name:<10} {r['mean_ms']:>10} {r['p50_ms']:>10} {r['p95_ms']:>10}")
+    print(json.dumps(report, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Web 版负载测试
+本地启动被测服务器（子进程，多线程 werkzeug 服务器），用 N 个并发模拟用户按真实流程答题：
+start_exam -> (get_question -> submit_answer) 循环，每隔若干题进行一次 jump_to 连续跳题（随机版无此接口）。
+统计每个接口的吞吐量、p50/p95/p99 延迟、响应体与 Cookie 大小以及服务器进程内存（RSS），
+结果以 JSON 输出，可用 --compare 与之前保存的结果对比。
+
+用法:
+    python bench_load.py --server v2 --users 20 --iterations 50 --output result.json
+    python bench_load.py --url http://127.0.0.1:5000 --pid 1234     # 测试已运行的服务器
+    python bench_load.py --compare old.json                          # 与旧结果对比
+    python bench_load.py --server async --compare sync.json          # 异步版与同步版对比（需要 uvicorn）
+不依赖外部服务，只使用标准库（http.client）。
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+SERVERS = {
+    'random': 'web_exam_system',
+    'v2': 'web_exam_system_v2',
+    'async': 'web_exam_system_async',
+}
+# 有跳题接口的服务器
+JUMP_SERVERS = {'v2', 'async'}
+# ASGI 应用（用 uvicorn 启动）
+ASGI_SERVERS = {'async'}
+JUMP_EVERY = 10       # 每答多少题进行一次跳题
+JUMP_BURST = 5        # 每次连续跳题次数
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """最近秩百分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct * len(ordered) / 100) - 1))
+    return ordered[rank]
+
+
+def read_rss_kb(pid: Optional[int]) -> Optional[int]:
+    """读取进程常驻内存（KB）；/proc 不可用时尝试 psutil"""
+    if not pid:
+        return None
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss // 1024
+    except Exception:
+        return None
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def serve(module_name: str, port: int):
+    """子进程入口：多线程 werkzeug 服务器（无调试器和重载器）；ASGI 应用使用 uvicorn"""
+    if module_name in (SERVERS[name] for name in ASGI_SERVERS):
+        import uvicorn
+        uvicorn.run(module_name + ':app', host='127.0.0.1', port=port, log_level='warning', access_log=False)
+        return
+    from werkzeug.serving import make_server
+    # 关闭逐请求访问日志，避免日志输出影响测量
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    module = __import__(module_name)
+    server = make_server('127.0.0.1', port, module.app, threaded=True)
+    server.serve_forever()
+
+
+def start_server(module_name: str) -> (subprocess.Popen, str):
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve', module_name, '--port', str(port)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'服务器启动失败（退出码 {proc.returncode}）')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return proc, f'http://127.0.0.1:{port}'
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError('服务器启动超时')
+
+
+class Recorder:
+    """各接口的延迟与大小（线程安全）"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.routes = {}
+        self.cookie_sizes = []
+
+    def add(self, route: str, seconds: float, body_bytes: int, ok: bool):
+        with self.lock:
+            stats = self.routes.setdefault(route, {'latency': [], 'bytes': [], 'errors': 0})
+            stats['latency'].append(seconds)
+            stats['bytes'].append(body_bytes)
+            if not ok:
+                stats['errors'] += 1
+
+    def add_cookie(self, size: int):
+        with self.lock:
+            self.cookie_sizes.append(size)
+
+
+class SimulatedUser:
+    """一个答题用户：独立的长连接和 Cookie"""
+
+    def __init__(self, base_url: str, recorder: Recorder, rng: random.Random, jump: bool = True):
+        parts = urlsplit(base_url)
+        self.conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        self.recorder = recorder
+        self.rng = rng
+        self.cookies = {}
+        self.jump = jump
+
+    def request(self, method: str, route: str, path: str = None, payload: Any = None):
+        headers = {}
+        body = None
+        if payload is not None:
+            body = json.dumps(payload).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        if self.cookies:
+            cookie = '; '.join(f'{k}={v}' for k, v in self.cookies.items())
+            headers['Cookie'] = cookie
+            self.recorder.add_cookie(len(f'Cookie: {cookie}'.encode('utf-8')))
+        start = time.perf_counter()
+        try:
+            self.conn.request(method, path or route, body=body, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.conn.close()
+            self.recorder.add(route, time.perf_counter() - start, 0, False)
+            return None, None
+        elapsed = time.perf_counter() - start
+        for header in response.headers.get_all('Set-Cookie') or []:
+            name, _, rest = header.partition('=')
+            self.cookies[name.strip()] = rest.split(';', 1)[0]
+        self.recorder.add(route, elapsed, len(data), response.status < 400)
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+    def answer_for(self, question: Dict[str, Any]) -> str:
+        """约 70% 答对，其余随机作答"""
+        if self.rng.random() < 0.7 and question.get('correct_answer'):
+            return question['correct_answer']
+        letters = [o['value'] for o in question.get('options') or []] or ['A', 'B']
+        if question.get('question_type') == 'multiple_choice':
+            return ''.join(sorted(self.rng.sample(letters, self.rng.randint(1, len(letters)))))
+        return self.rng.choice(letters)
+
+    def run(self, iterations: int, deadline: Optional[float]):
+        self.request('POST', '/start_exam')
+        total = None
+        for i in range(iterations):
+            if deadline and time.monotonic() >= deadline:
+                break
+            status, question = self.request('GET', '/get_question')
+            if not question or question.get('status') != 'success':
+                continue
+            total = question.get('total_count') or total
+            self.request('POST', '/submit_answer', payload={
+                'answer': self.answer_for(question),
+                'question_number': question.get('question_number'),
+            })
+            if self.jump and total and (i + 1) % JUMP_EVERY == 0:
+                for _ in range(JUMP_BURST):
+                    number = self.rng.randint(1, total)
+                    self.request('GET', '/jump_to', f'/jump_to?question_number={number}')
+        self.request('GET', '/get_stats')
+        self.conn.close()
+
+
+def summarize(recorder: Recorder, wall: float) -> Dict[str, Any]:
+    routes = {}
+    total_requests = 0
+    for route, stats in sorted(recorder.routes.items()):
+        latency_ms = [t * 1000 for t in stats['latency']]
+        count = len(latency_ms)
+        total_requests += count
+        routes[route] = {
+            'count': count,
+            'errors': stats['errors'],
+            'rps': round(count / wall, 1),
+            'mean_ms': round(sum(latency_ms) / count, 3),
+            'p50_ms': round(percentile(latency_ms, 50), 3),
+            'p95_ms': round(percentile(latency_ms, 95), 3),
+            'p99_ms': round(percentile(latency_ms, 99), 3),
+            'avg_bytes': round(sum(stats['bytes']) / count, 1),
+            'max_bytes': max(stats['bytes']),
+        }
+    cookies = recorder.cookie_sizes
+    return {
+        'requests': total_requests,
+        'seconds': round(wall, 3),
+        'throughput_rps': round(total_requests / wall, 1) if wall else None,
+        'routes': routes,
+        'cookie_bytes': {
+            'avg': round(sum(cookies) / len(cookies), 1) if cookies else 0,
+            'max': max(cookies) if cookies else 0,
+        },
+    }
+
+
+def run_load(base_url: str, users: int, iterations: int, duration: Optional[float],
+             pid: Optional[int] = None, jump: bool = True, seed: int = 2024) -> Dict[str, Any]:
+    recorder = Recorder()
+    rss_before = read_rss_kb(pid)
+    deadline = time.monotonic() + duration if duration else None
+    threads = [
+        threading.Thread(target=SimulatedUser(base_url, recorder, random.Random(seed + n), jump).run,
+                         args=(iterations, deadline), daemon=True)
+        for n in range(users)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    result = summarize(recorder, time.perf_counter() - start)
+    result['rss_kb'] = {'before': rss_before, 'after': read_rss_kb(pid)}
+    return result
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]):
+    """打印两次结果的吞吐量与延迟变化"""
+    def change(a, b):
+        return f"{(b - a) / a * 100:+.1f}%" if a else '-'
+
+    print(f"吞吐量: {old['throughput_rps']} -> {new['throughput_rps']} req/s ({change(old['throughput_rps'], new['throughput_rps'])})")
+    for route, stats in new['routes'].items():
+        before = old['routes'].get(route)
+        if not before:
+            continue
+        print(f"  {route:<16} p50 {before['p50_ms']:.2f} -> {stats['p50_ms']:.2f} ms ({change(before['p50_ms'], stats['p50_ms'])})"
+              f"  p99 {before['p99_ms']:.2f} -> {stats['p99_ms']:.2f} ms ({change(before['p99_ms'], stats['p99_ms'])})")
+
+
+def print_report(result: Dict[str, Any]):
+    print(f"{'接口':<16} {'请求数':>7} {'错误':>5} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'平均字节':>9}")
+    for route, r in result['routes'].items():
+        print(f"{route:<16} {r['count']:>7} {r['errors']:>5} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+              f"{r['p99_ms']:>9.2f} {r['avg_bytes']:>9.0f}")
+    print(f"总吞吐量: {result['throughput_rps']} req/s | Cookie 平均 {result['cookie_bytes']['avg']} 字节"
+          f" | 服务器 RSS: {result['rss_kb']['before']} -> {result['rss_kb']['after']} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Web 版负载与延迟测试')
+    parser.add_argument('--server', choices=sorted(SERVERS), default='v2', help='本地启动的被测服务器')
+    parser.add_argument('--url', help='测试已运行的服务器（不自动启动）')
+    parser.add_argument('--pid', type=int, help='配合 --url：读取该进程的 RSS')
+    parser.add_argument('--users', type=int, default=20, help='并发用户数')
+    parser.add_argument('--iterations', type=int, default=50, help='每个用户答题数')
+    parser.add_argument('--no-jump', action='store_true', help='不测试跳题接口（随机版自动关闭）')
+    parser.add_argument('--duration', type=float, help='最长运行秒数')
+    parser.add_argument('--output', help='结果写入 JSON 文件')
+    parser.add_argument('--compare', metavar='BASELINE', help='与之前保存的结果对比')
+    parser.add_argument('--serve', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    proc = None
+    base_url, pid = args.url, args.pid
+    if not base_url:
+        proc, base_url = start_server(SERVERS[args.server])
+        pid = proc.pid
+    try:
+        jump = not args.no_jump and (bool(args.url) or args.server in JUMP_SERVERS)
+        result = run_load(base_url, args.users, args.iterations, args.duration, pid, jump)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+    result['config'] = {
+        'server': args.url or args.server,
+        'users': args.users,
+        'iterations': args.iterations,
+        'duration': args.duration,
+    }
+
+    print_report(result)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), result)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=1)
+    print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+会话 Cookie 体积对比
+- 改造前：Flask 默认签名 Cookie 会话，session 中保存整道题目（原始 JSON 记录）
+- 改造后：服务端会话，Cookie 只携带会话ID，session 中只有整数下标和计数
+对题库中每道题计算请求头中 Cookie 的字节数并汇总。
+"""
+
+import json
+
+from flask import Flask
+from flask.sessions import SecureCookieSessionInterface
+
+from question_bank import read_sources
+from session_store import ServerSideSessionInterface, MemorySessionStore
+
+
+def cookie_header_bytes(name: str, value: str) -> int:
+    """浏览器回传的 Cookie 请求头长度"""
+    return len(f'Cookie: {name}={value}'.encode('utf-8'))
+
+
+def measure_before(app: Flask, sources) -> list:
+    """旧方案：签名 Cookie 中携带整道题"""
+    serializer = SecureCookieSessionInterface().get_signing_serializer(app)
+    name = app.config['SESSION_COOKIE_NAME']
+    sizes = []
+    for question_type, items in sources.items():
+        for question in items:
+            data = {
+                'total_questions': 120,
+                'correct_answers': 80,
+                'answered_questions': 119,
+                'type_order': ['single_choice', 'multiple_choice', 'judgment'],
+                'type_idx': 0,
+                'q_idx': 121,
+                'current_question': question,
+                'current_question_type': question_type,
+            }
+            sizes.append(cookie_header_bytes(name, serializer.dumps(data)))
+    return sizes
+
+
+def measure_after(app: Flask) -> int:
+    """新方案：Cookie 只有会话ID"""
+    interface = ServerSideSessionInterface(MemorySessionStore())
+    return cookie_header_bytes(app.config['SESSION_COOKIE_NAME'], interface.generate_sid())
+
+
+def main():
+    app = Flask(__name__)
+    app.secret_key = 'ai_exam_system_2024'
+    sources = read_sources()
+
+    before = measure_before(app, sources)
+    after = measure_after(app)
+    result = {
+        'before': {
+            'avg_bytes': round(sum(before) / len(before), 1),
+            'max_bytes': max(before),
+            'min_bytes': min(before),
+        },
+        'after': {'bytes': after},
+        'questions': len(before),
+    }
+    print("会话 Cookie 体积对比（每次请求浏览器回传的 Cookie 请求头）")
+    print(f"  改造前: 平均 {result['before']['avg_bytes']} 字节, 最大 {result['before']['max_bytes']} 字节")
+    print(f"  改造后: {after} 字节")
+    print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,8 @@ import sys
 import subprocess
 import shutil
 
+from question_bank import BANK_FILE, compile_bank
+
 def create_spec_file():
     """创建PyInstaller规格文件"""
     spec_content = '''# -*- mode: python ; coding: utf-8 -*-
@@ -19,9 +21,10 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[
-        ('single_choice.json', '.'),
-        ('multiple_choice.json', '.'),
-        ('judgment.json', '.'),
+        ('question_bank.bin', '.'),
+        ('第一套测试题.txt', '.'),
+        ('第二套测试题.txt', '.'),
+        ('第三套测试题.txt', '.'),
         ('README.md', '.'),
         ('GUI使用说明.md', '.'),
     ],
@@ -67,6 +70,7 @@ def check_files():
     """检查必要文件是否存在"""
     required_files = [
         'exam_system_gui.py',
+        'question_bank.py',
         'single_choice.json',
         'multiple_choice.json',
         'judgment.json'
@@ -84,6 +88,17 @@ def check_files():
     print("所有必要文件都存在")
     return True
 
+def build_bank():
+    """编译二进制题库，打包版启动时直接映射，无需解析JSON"""
+    try:
+        data = compile_bank('.', BANK_FILE)
+    except Exception as e:
+        print(f"题库编译失败: {e}")
+        return False
+
+    print(f"已编译题库 {BANK_FILE}（{len(data)} 字节）")
+    return True
+
 def build_exe():
     """构建exe程序"""
     print("开始打包程序...")
@@ -141,6 +156,10 @@ def main():
     if not check_files():
         return
 
+    # 编译题库
+    if not build_bank():
+        return
+
     # 创建规格文件
     create_spec_file()
 
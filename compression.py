@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+响应压缩（Web 版同步/异步服务器共用）
+按 Accept-Encoding（含 q 值）选择 br 或 gzip，小于 MIN_SIZE 的响应不压缩（压缩头尾的开销抵不上节省）。
+
+题目响应的静态部分在加载题库时预先压缩为 deflate 片段（Z_FULL_FLUSH 结尾：按字节对齐、不引用之前的数据），
+请求时只压缩几十字节的会话字段，再拼上 gzip 头、结束块和 CRC，得到合法的单成员 gzip 流（gzip_join），
+不需要对整个响应体重新压缩。brotli 无法这样拼接，题目响应只在客户端不接受 gzip 时才实时压缩为 br。
+
+可选: pip install brotli（未安装时只提供 gzip）
+"""
+
+import gzip
+import os
+import re
+import struct
+import zlib
+from typing import Dict, Iterable, Optional, Sequence, Union
+
+try:
+    import brotli
+except ImportError:  # 可选依赖
+    brotli = None
+
+MIN_SIZE = int(os.environ.get('EXAM_COMPRESS_MIN_SIZE', 256))
+GZIP_LEVEL = 6           # 实时压缩
+BROTLI_QUALITY = 5
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+_GZIP_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'  # 无文件名、mtime=0、OS 未知
+_FINAL_BLOCK = b'\x03\x00'                                   # 空的最后一个固定 Huffman 块
+
+
+def accepted_encodings(header: Optional[str]) -> Dict[str, float]:
+    """Accept-Encoding -> {编码: q 值}"""
+    accepted = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if not coding:
+            continue
+        q = 1.0
+        match = re.search(r'q\s*=\s*([\d.]+)', params)
+        if match:
+            try:
+                q = float(match.group(1))
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(header: Optional[str], available: Sequence[str] = ENCODINGS) -> str:
+    """按 available 的顺序选第一个客户端接受的编码，都不接受时返回 identity"""
+    accepted = accepted_encodings(header)
+    for encoding in available:
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return 'identity'
+
+
+def compress(data: bytes, encoding: str, best: bool = False) -> bytes:
+    """实时压缩；best=True 用于启动时预压缩（最高压缩率）"""
+    if encoding == 'gzip':
+        return gzip.compress(data, 9 if best else GZIP_LEVEL, mtime=0)
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if best else BROTLI_QUALITY)
+    return data
+
+
+class Deflated:
+    """预压缩的片段：原文（计算 CRC 用）+ 以 Z_FULL_FLUSH 结尾的原始 deflate 数据"""
+
+    __slots__ = ('raw', 'deflated')
+
+    def __init__(self, raw: bytes, level: int = 9):
+        self.raw = raw
+        self.deflated = deflate_chunk(raw, level)
+
+
+def deflate_chunk(data: bytes, level: int = GZIP_LEVEL) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FULL_FLUSH)
+
+
+def gzip_join(parts: Iterable[Union[bytes, Deflated]]) -> bytes:
+    """把预压缩片段和原文片段依次拼成一个 gzip 流（原文片段在这里压缩，相邻的合并后一起压缩）"""
+    out = [_GZIP_HEADER]
+    crc = 0
+    size = 0
+    pending = []
+
+    def flush_pending():
+        if pending:
+            data = b''.join(pending)
+            out.append(deflate_chunk(data))
+            pending.clear()
+
+    for part in parts:
+        raw = part.raw if isinstance(part, Deflated) else part
+        crc = zlib.crc32(raw, crc)
+        size += len(raw)
+        if isinstance(part, Deflated):
+            flush_pending()
+            out.append(part.deflated)
+        elif part:
+            pending.append(part)
+    flush_pending()
+    out.append(_FINAL_BLOCK)
+    out.append(struct.pack('<II', crc, size & 0xFFFFFFFF))
+    return b''.join(out)
+
+
+def should_compress(body: bytes, content_type: Optional[str]) -> bool:
+    return len(body) >= MIN_SIZE and (content_type or '').startswith(('application/json', 'text/'))
+
+
+def init_app(app):
+    """Flask：实时压缩 JSON/文本响应
+
+    带 ETag 的响应（题目、页面）自行协商编码并使用各编码自己的 ETag，这里不再处理
+    """
+    from flask import request
+
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough or response.status_code != 200 or 'ETag' in response.headers
+                or 'Content-Encoding' in response.headers
+                or not should_compress(response.get_data(), response.mimetype)):
+            return response
+        encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+        response.vary.add('Accept-Encoding')
+        if encoding == 'identity':
+            return response
+        response.set_data(compress(response.get_data(), encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    return app
@@ -5,9 +5,10 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[
-        ('single_choice.json', '.'),
-        ('multiple_choice.json', '.'),
-        ('judgment.json', '.'),
+        ('question_bank.bin', '.'),
+        ('第一套测试题.txt', '.'),
+        ('第二套测试题.txt', '.'),
+        ('第三套测试题.txt', '.'),
         ('README.md', '.'),
         ('GUI使用说明.md', '.'),
     ],
@@ -8,14 +8,145 @@
 使用tkinter图形界面
 """
 
-import json
-import random
 import sys
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 from typing import Dict, List, Any, Tuple
 import os
 
+import grading
+from answer_log import ANSWER_DB, AnswerLog
+from mock_papers import PaperFormatError, PaperLibrary
+from question_search import SearchIndex
+from question_bank import BANK_FILE, BANK_SOURCES, OPTION_LETTERS, QuestionBankError, load_bank
+from sampler import FeistelPermutation, PermutationSampler, new_seed
+from srs import SRS_DIR, SRSStore, format_interval
+from wrong_book import WrongBook, iter_ids
+
+RANDOM_MODE = '题库随机练习'
+SRS_MODE = '错题间隔复习'
+WRONG_MODE = '错题本练习'
+LEARNER = 'local'  # 单机版只有一个学习者
+DATA_DIR_NAME = 'ai_exam_system'  # 用户数据目录下的子目录名（见 get_data_path）
+
+NO_CHOICE = '-'  # 单选按钮的未选中值（不能用空字符串：Tk 会显示为三态）
+# 选项行的样式：选择题、判断题
+OPTION_STYLE = {'font': 'normal', 'padx': 10, 'pady': 5, 'wraplength': 700}
+JUDGMENT_STYLE = {'font': 'large', 'padx': 20, 'pady': 8, 'wraplength': 0}
+CORRECT_BG = '#E8F5E8'
+WRONG_BG = '#FFE8E8'
+
+
+class OptionRow:
+    """一行选项：框架 + 单选按钮 + 复选框（按题型只显示其中一个）"""
+
+    __slots__ = ('frame', 'radio', 'check', 'widget', 'text', 'style')
+
+    def __init__(self, frame, radio, check):
+        self.frame = frame
+        self.radio = radio
+        self.check = check
+        self.widget = None   # 当前显示的按钮
+        self.text = None     # 当前文字和样式，未变化时不再设置
+        self.style = None
+
+
+class OptionRows:
+    """A–E 五行选项：创建一次，换题时原地修改文字、变量和颜色，不再销毁重建
+
+    显示的行总是从 A 开始的连续几行；按字母直接找到行，高亮和恢复颜色只涉及答案中的字母。
+    widgets 提供 Frame、Radiobutton、Checkbutton、StringVar、BooleanVar，默认为 tkinter（测试中换成不需要显示器的替身）。
+    """
+
+    def __init__(self, parent, colors: Dict[str, str], fonts: Dict[str, tuple], widgets=tk):
+        self.colors = colors
+        self.fonts = fonts
+        self.container = widgets.Frame(parent, bg=colors['white'])
+        self.container.pack(fill=tk.X, padx=10, pady=10)
+        self.choice = widgets.StringVar(value=NO_CHOICE)
+        self.checks = {}
+        self.rows = {}
+        for letter in OPTION_LETTERS:
+            frame = widgets.Frame(self.container, bg=colors['white'], relief=tk.RIDGE, bd=1)
+            radio = widgets.Radiobutton(frame, variable=self.choice, value=letter, bg=colors['white'],
+                                        justify=tk.LEFT, indicatoron=1)
+            var = self.checks[letter] = widgets.BooleanVar(value=False)
+            check = widgets.Checkbutton(frame, variable=var, bg=colors['white'], justify=tk.LEFT)
+            self.rows[letter] = OptionRow(frame, radio, check)
+        self.shown = 0
+        self.painted = set()
+
+    def show(self, question_type: str, options: List[str]):
+        """显示一道题的选项（全部未选中）"""
+        self.clear_marks()
+        self.choice.set(NO_CHOICE)
+        for var in self.checks.values():
+            var.set(False)
+        multiple = question_type == 'multiple_choice'
+        style = JUDGMENT_STYLE if question_type == 'judgment' else OPTION_STYLE
+        for i, letter in enumerate(OPTION_LETTERS):
+            row = self.rows[letter]
+            if i >= len(options):
+                if i < self.shown:
+                    row.frame.pack_forget()
+                continue
+            widget = row.check if multiple else row.radio
+            if row.widget is not widget:
+                if row.widget is not None:
+                    row.widget.pack_forget()
+                widget.pack(anchor=tk.W)
+                row.widget = widget
+                row.text = row.style = None
+            text = f"{letter}. {options[i]}"
+            if row.text != text or row.style is not style:
+                widget.config(text=text, font=self.fonts[style['font']], padx=style['padx'], pady=style['pady'],
+                              wraplength=style['wraplength'])
+                row.text = text
+                row.style = style
+            if i >= self.shown:
+                row.frame.pack(fill=tk.X, pady=2)
+        self.shown = len(options)
+
+    def hide(self):
+        """隐藏所有选项"""
+        self.clear_marks()
+        for letter in OPTION_LETTERS[:self.shown]:
+            self.rows[letter].frame.pack_forget()
+        self.shown = 0
+
+    def answer(self, question_type: str) -> str:
+        """当前选择的答案（多选题按字母顺序）"""
+        letters = OPTION_LETTERS[:self.shown]
+        if question_type == 'multiple_choice':
+            return ''.join(letter for letter in letters if self.checks[letter].get())
+        choice = self.choice.get()
+        return choice if choice in letters else ""
+
+    def highlight(self, user_answer: str, correct_answer: str):
+        """正确答案标绿，选错的标红"""
+        correct = set(correct_answer.upper().replace(' ', ''))
+        for letter in correct | set(user_answer.upper().replace(' ', '')):
+            row = self.rows.get(letter)
+            if row is None or OPTION_LETTERS.index(letter) >= self.shown:
+                continue
+            if letter in correct:
+                bg, fg = CORRECT_BG, self.colors['success']
+            else:
+                bg, fg = WRONG_BG, self.colors['error']
+            row.widget.config(bg=bg, fg=fg)
+            row.frame.config(bg=bg, bd=2)
+            self.painted.add(letter)
+
+    def clear_marks(self):
+        """恢复高亮过的行的颜色"""
+        for letter in self.painted:
+            row = self.rows[letter]
+            row.widget.config(bg=self.colors['white'], fg=self.colors['text'])
+            row.frame.config(bg=self.colors['white'], bd=1)
+        self.painted.clear()
+
 
 class ExamSystemGUI:
     def __init__(self):
@@ -27,10 +158,34 @@ class ExamSystemGUI:
         }
         self.current_question = None
         self.current_question_type = None
+        self.current_q_idx = None
         self.total_questions = 0
         self.correct_answers = 0
         self.answered_questions = 0  # 新增：已回答的题目数量
-        self.selected_answers = []
+        # 随机练习：按随机排列出题，一轮内不重复
+        self.sampler = None
+        # 间隔复习：答错的题按越来越长的间隔重新出现，进度保存在用户数据目录的 srs_state/ 下
+        self.srs_store = SRSStore(get_data_path(SRS_DIR))
+        self.srs_mode = False
+        # 作答记录：累计统计在重启后仍然保留（保存在用户数据目录）
+        self.answer_log = AnswerLog(get_data_path(ANSWER_DB))
+        # 累计统计 [已答题数, 答对题数]：后台线程读取一次，之后随作答在内存中累加，刷新统计栏不访问数据库
+        self.history = None
+        self.history_lock = threading.Lock()
+        threading.Thread(target=self.load_history, daemon=True).start()
+        self.shown_at = None
+        self.attempt = None
+        # 错题本练习：开始时取出错题，按随机顺序逐题练习
+        self.wrong_book = WrongBook(self.answer_log)
+        self.wrong_ids = None
+        self.wrong_pos = 0
+
+        # 试卷模式：按试卷顺序作答，按大题统计得分
+        self.papers = None
+        self.paper = None
+        self.paper_pos = 0
+        self.paper_correct = []
+        self.paper_answered = []
 
         # 创建主窗口
         self.root = tk.Tk()
@@ -204,9 +359,8 @@ class ExamSystemGUI:
         )
         self.options_frame.pack(fill=tk.X, pady=(0, 10))
 
-        # 用于存储选项变量
-        self.option_vars = []
-        self.option_widgets = []
+        # A–E 选项行只创建一次，换题时原地更新
+        self.option_rows = OptionRows(self.options_frame, self.colors, self.fonts)
 
     def create_buttons_area(self, parent):
         """创建按钮区域"""
@@ -264,6 +418,18 @@ class ExamSystemGUI:
         )
         self.next_btn.pack(side=tk.LEFT, padx=(0, 10))
 
+        # 练习模式选择：题库随机练习、错题间隔复习或某一套模拟试卷
+        self.mode_var = tk.StringVar(value=RANDOM_MODE)
+        self.mode_combo = ttk.Combobox(
+            top_buttons,
+            textvariable=self.mode_var,
+            values=[RANDOM_MODE, SRS_MODE, WRONG_MODE],
+            state='readonly',
+            font=self.fonts['normal'],
+            width=16
+        )
+        self.mode_combo.pack(side=tk.LEFT, padx=(0, 10))
+
         # 重新开始按钮
         self.restart_btn = tk.Button(
             top_buttons,
@@ -279,6 +445,21 @@ class ExamSystemGUI:
         )
         self.restart_btn.pack(side=tk.RIGHT)
 
+        # 第二行：题库搜索（双击结果直接打开该题）
+        search_bar = tk.Frame(buttons_frame, bg=self.colors['white'])
+        search_bar.pack(fill=tk.X)
+        self.search_var = tk.StringVar()
+        search_entry = tk.Entry(search_bar, textvariable=self.search_var, font=self.fonts['normal'])
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
+        search_entry.bind('<Return>', lambda event: self.search_questions())
+        tk.Button(
+            search_bar,
+            text="搜索题目",
+            font=self.fonts['normal'],
+            command=self.search_questions,
+            width=10
+        ).pack(side=tk.LEFT)
+
     def create_stats_area(self, parent):
         """创建统计信息区域 - 优化显示"""
         stats_frame = tk.LabelFrame(
@@ -350,20 +531,11 @@ class ExamSystemGUI:
     def load_questions(self):
         """加载题库文件"""
         try:
-            # 加载单选题
-            single_choice_path = get_resource_path('single_choice.json')
-            with open(single_choice_path, 'r', encoding='utf-8') as f:
-                self.questions['single_choice'] = json.load(f)
-
-            # 加载多选题
-            multiple_choice_path = get_resource_path('multiple_choice.json')
-            with open(multiple_choice_path, 'r', encoding='utf-8') as f:
-                self.questions['multiple_choice'] = json.load(f)
-
-            # 加载判断题
-            judgment_path = get_resource_path('judgment.json')
-            with open(judgment_path, 'r', encoding='utf-8') as f:
-                self.questions['judgment'] = json.load(f)
+            # 映射编译后的题库（打包版内置 question_bank.bin，无需解析JSON）
+            self.bank = load_bank(get_resource_path(''))
+            self.questions.update(self.bank.questions)
+            self.sampler = PermutationSampler(self.bank.counts())
+            self.search_index = SearchIndex(self.bank)
 
             # 更新统计信息
             single_count = len(self.questions['single_choice'])
@@ -374,39 +546,31 @@ class ExamSystemGUI:
             stats_text = f"📚 题库加载成功！单选题: {single_count}道 | 多选题: {multiple_count}道 | 判断题: {judgment_count}道 | 总计: {total_count}道"
             self.library_stats_label.config(text=stats_text, fg=self.colors['success'])
 
+            # 模拟试卷（可选，加载失败不影响题库练习）
+            try:
+                self.papers = PaperLibrary(get_resource_path(''))
+                self.mode_combo.config(values=[RANDOM_MODE, SRS_MODE, WRONG_MODE] + [p.title for p in self.papers.papers.values()])
+            except (OSError, PaperFormatError) as e:
+                print(f"模拟试卷加载失败: {e}")
+
             return True
 
-        except FileNotFoundError as e:
-            messagebox.showerror("错误", f"题库文件未找到: {e}")
+        except QuestionBankError as e:
+            messagebox.showerror("错误", f"题库加载失败: {e}")
             self.library_stats_label.config(text="❌ 题库加载失败", fg=self.colors['error'])
             return False
-        except json.JSONDecodeError as e:
-            messagebox.showerror("错误", f"题库文件格式错误: {e}")
-            self.library_stats_label.config(text="❌ 题库加载失败", fg=self.colors['error'])
-            return False
-
-    def get_random_question(self) -> Tuple[str, Dict[str, Any]]:
-        """随机获取一道题目"""
-        # 随机选择题型
-        question_types = ['single_choice', 'multiple_choice', 'judgment']
-        question_type = random.choice(question_types)
 
-        # 随机选择题目
-        questions = self.questions[question_type]
-        if not questions:
-            return None, None
+    def get_random_question(self) -> Tuple[str, int, Dict[str, Any]]:
+        """随机获取一道题目（每道题概率相同，全部出完前不重复）"""
+        question_id = self.sampler.next_id() if self.sampler is not None else None
+        if question_id is None:
+            return None, None, None
 
-        question = random.choice(questions)
-        return question_type, question
+        question_type, q_idx = self.bank.locate_id(question_id)
+        return question_type, q_idx, self.questions[question_type][q_idx]
 
     def display_question(self, question_type: str, question: Dict[str, Any]):
         """显示题目"""
-        # 清空之前的选项
-        self.clear_options()
-
-        # 重置选项颜色（为新题目准备）
-        self.reset_option_colors()
-
         # 设置题目类型标签
         type_names = {
             'single_choice': '【单选题】',
@@ -415,13 +579,19 @@ class ExamSystemGUI:
         }
         self.question_type_label.config(text=type_names[question_type])
 
-        # 设置题目序号
-        self.question_number_label.config(text=f"第 {self.total_questions} 题")
+        # 设置题目序号（全局题号，与Web版一致；试卷模式显示大题和卷内题号）
+        if self.paper is not None:
+            section = self.paper.sections[self.paper.locate(self.paper_pos)[0]]
+            self.question_number_label.config(
+                text=f"{section['name']} · 第 {self.paper_pos} 题 / 共 {self.paper.total} 题")
+        else:
+            question_number = self.bank.question_id(question_type, self.current_q_idx) + 1
+            self.question_number_label.config(text=f"第 {question_number} 题 / 共 {self.bank.id_index.total} 题")
 
         # 显示题目内容
         self.question_text.config(state=tk.NORMAL)
         self.question_text.delete(1.0, tk.END)
-        self.question_text.insert(1.0, question['Unnamed: 1'])
+        self.question_text.insert(1.0, question['text'])
         self.question_text.config(state=tk.DISABLED)
 
         # 显示选项
@@ -429,115 +599,12 @@ class ExamSystemGUI:
 
     def clear_options(self):
         """清空选项区域"""
-        for widget in self.option_widgets:
-            widget.destroy()
-        self.option_widgets.clear()
-        self.option_vars.clear()
+        self.option_rows.hide()
 
     def create_question_options(self, question_type: str, question: Dict[str, Any]):
-        """创建题目选项"""
-        # 选项容器
-        options_container = tk.Frame(self.options_frame, bg=self.colors['white'])
-        options_container.pack(fill=tk.X, padx=10, pady=10)
-        self.option_widgets.append(options_container)  # 将容器也加入到widget列表中
-
-        if question_type == 'single_choice':
-            # 单选题选项 - 确保默认未选中
-            self.selected_answer = tk.StringVar()
-            self.selected_answer.set(None)  # 设置为None确保未选中
-
-            options = [
-                ('A', question['Unnamed: 2']),
-                ('B', question['Unnamed: 3']),
-                ('C', question['Unnamed: 4']),
-                ('D', question['Unnamed: 5'])
-            ]
-
-            for value, text in options:
-                option_frame = tk.Frame(options_container, bg=self.colors['white'], relief=tk.RIDGE, bd=1)
-                option_frame.pack(fill=tk.X, pady=2)
-
-                rb = tk.Radiobutton(
-                    option_frame,
-                    text=f"{value}. {text}",
-                    variable=self.selected_answer,
-                    value=value,
-                    font=self.fonts['normal'],
-                    bg=self.colors['white'],
-                    wraplength=700,
-                    justify=tk.LEFT,
-                    padx=10,
-                    pady=5,
-                    indicatoron=1  # 确保显示单选按钮
-                )
-                rb.pack(anchor=tk.W)
-                self.option_widgets.append(rb)
-                self.option_widgets.append(option_frame)
-
-        elif question_type == 'multiple_choice':
-            # 多选题选项
-            self.selected_answers = {}
-            options = [
-                ('A', question['Unnamed: 2']),
-                ('B', question['Unnamed: 3']),
-                ('C', question['Unnamed: 4']),
-                ('D', question['Unnamed: 5']),
-                ('E', question['Unnamed: 6'])
-            ]
-
-            for value, text in options:
-                var = tk.BooleanVar()
-                var.set(False)  # 确保默认未选中
-                self.selected_answers[value] = var
-
-                option_frame = tk.Frame(options_container, bg=self.colors['white'], relief=tk.RIDGE, bd=1)
-                option_frame.pack(fill=tk.X, pady=2)
-
-                cb = tk.Checkbutton(
-                    option_frame,
-                    text=f"{value}. {text}",
-                    variable=var,
-                    font=self.fonts['normal'],
-                    bg=self.colors['white'],
-                    wraplength=700,
-                    justify=tk.LEFT,
-                    padx=10,
-                    pady=5
-                )
-                # 为了颜色标记功能，给checkbutton添加一个自定义属性
-                cb.option_value = value
-                cb.pack(anchor=tk.W)
-                self.option_widgets.append(cb)
-                self.option_widgets.append(option_frame)
-
-        elif question_type == 'judgment':
-            # 判断题选项 - 重点修复默认选中问题
-            self.selected_answer = tk.StringVar()
-            self.selected_answer.set(None)  # 设置为None确保未选中
-
-            options = [
-                ('A', '正确'),
-                ('B', '错误')
-            ]
-
-            for value, text in options:
-                option_frame = tk.Frame(options_container, bg=self.colors['white'], relief=tk.RIDGE, bd=1)
-                option_frame.pack(fill=tk.X, pady=2)
-
-                rb = tk.Radiobutton(
-                    option_frame,
-                    text=f"{value}. {text}",
-                    variable=self.selected_answer,
-                    value=value,
-                    font=self.fonts['large'],
-                    bg=self.colors['white'],
-                    padx=20,
-                    pady=8,
-                    indicatoron=1  # 确保显示为圆形按钮
-                )
-                rb.pack(anchor=tk.W)
-                self.option_widgets.append(rb)
-                self.option_widgets.append(option_frame)
+        """显示题目选项（判断题固定为 正确/错误）"""
+        options = ['正确', '错误'] if question_type == 'judgment' else question['options']
+        self.option_rows.show(question_type, options)
 
     def start_exam(self):
         """开始考试"""
@@ -549,9 +616,34 @@ class ExamSystemGUI:
         self.total_questions = 0
         self.correct_answers = 0
         self.answered_questions = 0  # 重置已回答题目计数
+        if self.sampler is not None:
+            self.sampler.reset()
+
+        # 错题本练习：错题本为空时不开始
+        self.wrong_ids = None
+        if self.mode_var.get() == WRONG_MODE:
+            ids = list(iter_ids(self.wrong_book.notebook(LEARNER)))
+            if not ids:
+                messagebox.showinfo("提示", "错题本中没有题目")
+                return
+            order = FeistelPermutation(len(ids), new_seed())
+            self.wrong_ids = [ids[order[i]] for i in range(len(ids))]
+            self.wrong_pos = 0
+
+        # 选择了试卷时进入试卷模式
+        self.srs_mode = self.mode_var.get() == SRS_MODE
+        self.attempt = int(time.time() * 1000)
+        self.paper = None
+        if self.papers is not None and self.mode_var.get() not in (RANDOM_MODE, SRS_MODE, WRONG_MODE):
+            self.paper = next((p for p in self.papers.papers.values() if p.title == self.mode_var.get()), None)
+        if self.paper is not None:
+            self.paper_pos = 0
+            self.paper_correct = [0] * len(self.paper.sections)
+            self.paper_answered = [0] * len(self.paper.sections)
 
         # 更新按钮状态
         self.start_btn.config(state=tk.DISABLED)
+        self.mode_combo.config(state=tk.DISABLED)
         self.submit_btn.config(state=tk.NORMAL)
 
         # 显示第一题
@@ -560,20 +652,63 @@ class ExamSystemGUI:
         # 更新结果显示
         self.result_label.config(text="🎯 考试已开始，请选择答案后点击提交", fg=self.colors['text'])
 
+    def get_paper_question(self) -> Tuple[str, int, Dict[str, Any]]:
+        """按试卷顺序获取下一题"""
+        if self.paper_pos >= self.paper.total:
+            return None, None, None
+        self.paper_pos += 1
+        _, question_type, q_idx = self.paper.locate(self.paper_pos)
+        return question_type, q_idx, self.paper.bank.questions[question_type][q_idx]
+
+    def get_srs_question(self) -> Tuple[str, int, Dict[str, Any]]:
+        """间隔复习：最早到期的题，没有到期的题时出新题"""
+        picked = self.srs_store.pick(LEARNER, self.bank.record_count)
+        if not picked:
+            return None, None, None
+        question_type, q_idx = self.bank.locate_id(picked[0])
+        return question_type, q_idx, self.questions[question_type][q_idx]
+
+    def get_wrong_question(self) -> Tuple[str, int, Dict[str, Any]]:
+        """错题本练习：按开始时打乱的顺序出下一道错题"""
+        if self.wrong_pos >= len(self.wrong_ids):
+            return None, None, None
+        question_type, q_idx = self.bank.locate_id(self.wrong_ids[self.wrong_pos])
+        self.wrong_pos += 1
+        return question_type, q_idx, self.questions[question_type][q_idx]
+
     def next_question(self):
         """显示下一题"""
-        question_type, question = self.get_random_question()
+        if self.paper is not None:
+            question_type, q_idx, question = self.get_paper_question()
+            if not question:
+                self.show_paper_result()
+                return
+        elif self.srs_mode:
+            question_type, q_idx, question = self.get_srs_question()
+        elif self.wrong_ids is not None:
+            question_type, q_idx, question = self.get_wrong_question()
+            if not question:
+                messagebox.showinfo("提示", f"错题本中的 {len(self.wrong_ids)} 道题已练习完")
+                return
+        else:
+            question_type, q_idx, question = self.get_random_question()
 
         if not question:
             messagebox.showwarning("提示", "没有可用的题目")
             return
 
+        self.show_question(question_type, q_idx, question)
+
+    def show_question(self, question_type: str, q_idx: int, question: Dict[str, Any]):
+        """显示一道题并进入作答状态"""
         self.current_question = question
         self.current_question_type = question_type
+        self.current_q_idx = q_idx
         self.total_questions += 1
 
         # 显示题目
         self.display_question(question_type, question)
+        self.shown_at = time.monotonic()
 
         # 更新按钮状态
         self.submit_btn.config(state=tk.NORMAL)
@@ -585,6 +720,46 @@ class ExamSystemGUI:
         # 更新统计信息（但此时还没有提交答案，所以正确率基于已完成的题目计算）
         self.update_stats()
 
+    def search_questions(self):
+        """搜索题干和选项，在弹出窗口中列出结果"""
+        query = self.search_var.get().strip()
+        if not query or getattr(self, 'search_index', None) is None:
+            return
+        hits = self.search_index.search(query)
+        if not hits:
+            messagebox.showinfo("搜索", f"没有找到包含“{query}”的题目")
+            return
+
+        window = tk.Toplevel(self.root)
+        window.title(f"搜索：{query}（{len(hits)} 题）")
+        window.geometry("700x400")
+        listbox = tk.Listbox(window, font=self.fonts['normal'])
+        listbox.pack(fill=tk.BOTH, expand=True)
+        type_names = {'single_choice': '单选', 'multiple_choice': '多选', 'judgment': '判断'}
+        for hit in hits:
+            listbox.insert(tk.END, f"第 {hit['question_id'] + 1} 题 [{type_names[hit['question_type']]}] {hit['snippet']}")
+
+        def open_selected(event=None):
+            selection = listbox.curselection()
+            if selection:
+                window.destroy()
+                self.open_search_hit(hits[selection[0]]['question_id'])
+
+        listbox.bind('<Double-Button-1>', open_selected)
+        listbox.bind('<Return>', open_selected)
+
+    def open_search_hit(self, question_id: int):
+        """打开搜索到的题目（按全局题目ID），之后继续按原模式出题"""
+        if self.paper is not None:
+            messagebox.showwarning("提示", "试卷模式中不能跳到题库题目")
+            return
+        if str(self.start_btn['state']) == tk.NORMAL:
+            self.start_exam()
+            if str(self.start_btn['state']) == tk.NORMAL:
+                return
+        question_type, q_idx = self.bank.locate_id(question_id)
+        self.show_question(question_type, q_idx, self.questions[question_type][q_idx])
+
     def submit_answer(self):
         """提交答案"""
         if not self.current_question:
@@ -597,7 +772,7 @@ class ExamSystemGUI:
             return
 
         # 获取正确答案
-        correct_answer = self.current_question['Unnamed: 7']
+        correct_answer = self.current_question['answer']
 
         # 检查答案
         is_correct = self.check_answer(user_answer, correct_answer)
@@ -608,9 +783,38 @@ class ExamSystemGUI:
         # 增加已回答题目计数
         self.answered_questions += 1
 
+        # 试卷模式按大题累计
+        if self.paper is not None:
+            section_idx = self.paper.locate(self.paper_pos)[0]
+            self.paper_answered[section_idx] += 1
+            self.paper_correct[section_idx] += is_correct
+
         # 显示结果
         self.show_answer_result(user_answer, correct_answer, is_correct)
 
+        # 作答记录（后台写入）
+        if self.paper is not None:
+            question_id = self.paper.bank.question_id(self.current_question_type, self.current_q_idx)
+            source = f'paper:{self.paper.id}'
+        else:
+            question_id = self.bank.question_id(self.current_question_type, self.current_q_idx)
+            source = None
+        latency_ms = int((time.monotonic() - self.shown_at) * 1000) if self.shown_at else None
+        with self.history_lock:
+            self.answer_log.record(LEARNER, question_id, user_answer, is_correct, latency_ms, source, self.attempt)
+            # 累计统计尚未读取时，这条记录会包含在读取结果中
+            if self.history is not None:
+                self.history[0] += 1
+                self.history[1] += is_correct
+
+        # 间隔复习：安排下次复习并保存进度
+        if self.srs_mode:
+            try:
+                interval = self.srs_store.answer(LEARNER, self.bank.record_count, question_id, is_correct)
+                self.result_label.config(text=self.result_label.cget('text') + f"\n⏰ {format_interval(interval)}后复习")
+            except OSError as e:
+                print(f"复习进度保存失败: {e}")
+
         # 更新按钮状态
         self.submit_btn.config(state=tk.DISABLED)
         self.next_btn.config(state=tk.NORMAL)
@@ -618,31 +822,27 @@ class ExamSystemGUI:
         # 更新统计
         self.update_stats()
 
+        if self.paper is not None and self.paper_pos >= self.paper.total:
+            self.next_btn.config(state=tk.DISABLED)
+            self.show_paper_result()
+
+    def show_paper_result(self):
+        """试卷答完：显示各大题得分"""
+        sections = self.paper.score_sections(self.paper_correct, self.paper_answered)
+        lines = [f"{s['name']}: {s['score']:g} / {s['max_score']:g} 分（答对 {s['correct']}/{s['count']} 题）"
+                 for s in sections]
+        score = sum(s['score'] for s in sections)
+        messagebox.showinfo("试卷完成",
+                            f"{self.paper.title}\n\n" + "\n".join(lines) +
+                            f"\n\n总分: {score:g} / {self.paper.max_score():g}")
+
     def get_user_answer(self) -> str:
         """获取用户答案"""
-        if self.current_question_type in ['single_choice', 'judgment']:
-            answer = self.selected_answer.get()
-            return answer if answer else ""
-        elif self.current_question_type == 'multiple_choice':
-            selected = []
-            for key, var in self.selected_answers.items():
-                if var.get():
-                    selected.append(key)
-            return ''.join(sorted(selected))
-        return ""
+        return self.option_rows.answer(self.current_question_type)
 
     def check_answer(self, user_answer: str, correct_answer: str) -> bool:
-        """检查答案是否正确"""
-        user_answer = user_answer.upper().strip()
-        correct_answer = correct_answer.upper().strip()
-
-        if self.current_question_type == 'multiple_choice':
-            # 多选题需要所有选项都正确
-            user_set = set(user_answer.replace(' ', ''))
-            correct_set = set(correct_answer.replace(' ', ''))
-            return user_set == correct_set
-        else:
-            return user_answer == correct_answer
+        """检查答案是否正确（掩码比较，见 grading 模块）"""
+        return grading.check_answer(self.current_question_type, user_answer, correct_answer)
 
     def show_answer_result(self, user_answer: str, correct_answer: str, is_correct: bool):
         """显示答题结果并标识选项颜色"""
@@ -661,56 +861,17 @@ class ExamSystemGUI:
 
     def highlight_answer_options(self, user_answer: str, correct_answer: str):
         """高亮显示答案选项：正确答案标绿，错误答案标红"""
-        user_answer_set = set(user_answer.upper().replace(' ', ''))
-        correct_answer_set = set(correct_answer.upper().replace(' ', ''))
-
-        # 遍历所有选项widget，找到RadioButton和Checkbutton进行颜色标识
-        for widget in self.option_widgets:
-            if isinstance(widget, (tk.Radiobutton, tk.Checkbutton)):
-                try:
-                    # 获取选项的值
-                    if isinstance(widget, tk.Radiobutton):
-                        # RadioButton使用value属性
-                        option_value = widget['value']
-                    elif isinstance(widget, tk.Checkbutton):
-                        # Checkbutton使用自定义的option_value属性
-                        option_value = getattr(widget, 'option_value', None)
-
-                    if option_value:
-                        option_value = option_value.upper()
-
-                        # 判断是否是正确答案
-                        if option_value in correct_answer_set:
-                            # 正确答案标绿
-                            widget.config(bg='#E8F5E8', fg=self.colors['success'])
-                            # 如果父框架存在，也改变背景色
-                            parent = widget.master
-                            if parent and isinstance(parent, tk.Frame):
-                                parent.config(bg='#E8F5E8', relief=tk.RIDGE, bd=2)
-                        elif option_value in user_answer_set:
-                            # 用户选择的错误答案标红
-                            widget.config(bg='#FFE8E8', fg=self.colors['error'])
-                            # 如果父框架存在，也改变背景色
-                            parent = widget.master
-                            if parent and isinstance(parent, tk.Frame):
-                                parent.config(bg='#FFE8E8', relief=tk.RIDGE, bd=2)
-                except (tk.TclError, KeyError, AttributeError):
-                    # 如果widget没有相应属性，跳过
-                    continue
+        self.option_rows.highlight(user_answer, correct_answer)
 
     def reset_option_colors(self):
         """重置选项颜色为默认状态"""
-        for widget in self.option_widgets:
-            if isinstance(widget, (tk.Radiobutton, tk.Checkbutton)):
-                try:
-                    widget.config(bg=self.colors['white'], fg=self.colors['text'])
-                    # 重置父框架颜色
-                    parent = widget.master
-                    if parent and isinstance(parent, tk.Frame):
-                        parent.config(bg=self.colors['white'], relief=tk.RIDGE, bd=1)
-                except tk.TclError:
-                    # 如果widget已被销毁，跳过
-                    continue
+        self.option_rows.clear_marks()
+
+    def load_history(self):
+        """读取累计统计（后台线程，避免查询数据库时界面卡顿）"""
+        with self.history_lock:
+            stats = self.answer_log.stats(LEARNER)
+            self.history = [stats['answered_questions'], stats['correct_answers']]
 
     def update_stats(self):
         """更新统计信息"""
@@ -721,6 +882,9 @@ class ExamSystemGUI:
         else:
             stats_text = f"📊 进度: 第 {self.total_questions} 题 | 🚀 准备答题..."
             color = self.colors['text']
+        history = self.history
+        if history is not None and history[0]:
+            stats_text += f" | 📚 累计: {history[0]} 题 {round(history[1] / history[0] * 100, 1)}%"
 
         self.progress_stats_label.config(text=stats_text, fg=color)
 
@@ -732,6 +896,10 @@ class ExamSystemGUI:
         self.answered_questions = 0  # 重置已回答题目计数
         self.current_question = None
         self.current_question_type = None
+        self.current_q_idx = None
+        self.paper = None
+        self.srs_mode = False
+        self.wrong_ids = None
 
         # 清空显示
         self.clear_options()
@@ -743,6 +911,7 @@ class ExamSystemGUI:
 
         # 重置按钮状态
         self.start_btn.config(state=tk.NORMAL)
+        self.mode_combo.config(state='readonly')
         self.submit_btn.config(state=tk.DISABLED)
         self.next_btn.config(state=tk.DISABLED)
 
@@ -767,16 +936,34 @@ def get_resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
+def get_data_path(relative_path):
+    """获取用户数据文件的路径（复习进度等）
+
+    打包后的程序目录可能只读、当前目录随启动方式变化，且同一台电脑的不同用户应各自保存，
+    因此放在用户数据目录下：Windows 为 %APPDATA%，macOS 为 ~/Library/Application Support，
+    其他系统为 $XDG_DATA_HOME（默认 ~/.local/share）；可用 EXAM_DATA_DIR 指定。
+    """
+    base_path = os.environ.get('EXAM_DATA_DIR')
+    if not base_path:
+        if sys.platform == 'win32':
+            root = os.environ.get('APPDATA') or os.path.expanduser('~')
+        elif sys.platform == 'darwin':
+            root = os.path.expanduser('~/Library/Application Support')
+        else:
+            root = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+        base_path = os.path.join(root, DATA_DIR_NAME)
+    os.makedirs(base_path, exist_ok=True)
+    return os.path.join(base_path, relative_path)
+
+
 def main():
     """主函数"""
-    # 检查题库文件是否存在（使用资源路径）
-    required_files = ['single_choice.json', 'multiple_choice.json', 'judgment.json']
+    # 检查题库文件是否存在（使用资源路径）：已编译题库或全部JSON源文件
     missing_files = []
-
-    for filename in required_files:
-        file_path = get_resource_path(filename)
-        if not os.path.exists(file_path):
-            missing_files.append(filename)
+    if not os.path.exists(get_resource_path(BANK_FILE)):
+        for _, filename in BANK_SOURCES:
+            if not os.path.exists(get_resource_path(filename)):
+                missing_files.append(filename)
 
     if missing_files:
         root = tk.Tk()
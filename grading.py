@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+判分模块（Web 版、GUI 共用）
+答案统一编码为 5 位掩码（A 为最低位，E 为第 5 位），单题判分是一次整数比较，
+整份答卷可用 NumPy 向量化批量判分（未安装 NumPy 时退回纯 Python 实现）。
+多选题可选部分得分：未选错任何选项时按选对的比例得分，选错得 0 分。
+"""
+
+from typing import Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖
+    np = None
+
+from question_bank import OPTION_LETTERS
+
+# 答案中出现 A–E 以外的字符时置位，保证与任何正确答案都不相等
+INVALID_BIT = 1 << len(OPTION_LETTERS)
+
+# 0..63 的二进制中 1 的个数（掩码最多 6 位）
+POPCOUNT = bytes(bin(i).count('1') for i in range(INVALID_BIT << 1))
+
+
+def encode_answer(answer: str) -> int:
+    """答案字符串 -> 掩码；忽略大小写和空白，非法字符置 INVALID_BIT"""
+    mask = 0
+    for ch in (answer or '').upper():
+        if ch.isspace():
+            continue
+        pos = OPTION_LETTERS.find(ch)
+        mask |= (1 << pos) if pos >= 0 else INVALID_BIT
+    return mask
+
+
+def grade_mask(user_mask: int, correct_mask: int) -> bool:
+    """单题判分：掩码完全一致才算正确"""
+    return user_mask == correct_mask and not user_mask & INVALID_BIT
+
+
+def score_mask(question_type: str, user_mask: int, correct_mask: int, partial_credit: bool = False) -> float:
+    """单题得分（0~1）；partial_credit 只对多选题生效"""
+    if grade_mask(user_mask, correct_mask):
+        return 1.0
+    if not partial_credit or question_type != 'multiple_choice' or not correct_mask:
+        return 0.0
+    if user_mask & ~correct_mask:
+        return 0.0
+    return POPCOUNT[user_mask] / POPCOUNT[correct_mask]
+
+
+def valid_answer(question_type: str, user_answer: str) -> bool:
+    """答案格式是否有效：只含 A–E，单选/判断题恰好一个字母"""
+    if question_type != 'multiple_choice' and len((user_answer or '').strip()) != 1:
+        return False
+    return not encode_answer(user_answer) & INVALID_BIT
+
+
+def check_answer(question_type: str, user_answer: str, correct_answer: str) -> bool:
+    """检查答案是否正确（兼容原 check_answer 的字符串接口）"""
+    if question_type != 'multiple_choice' and len((user_answer or '').strip()) != 1:
+        # 单选/判断题只能是一个字母
+        return False
+    return grade_mask(encode_answer(user_answer), encode_answer(correct_answer))
+
+
+def _as_masks(values):
+    """bytes / 序列 / ndarray -> uint8 数组（bytes 不复制）"""
+    if isinstance(values, (bytes, bytearray, memoryview)):
+        return np.frombuffer(values, dtype=np.uint8)
+    return np.asarray(values, dtype=np.uint8)
+
+
+def grade_sheet(user_masks: Sequence[int], correct_masks: Sequence[int],
+                multiple_flags: Optional[Sequence[bool]] = None, partial_credit: bool = False):
+    """整份答卷判分
+
+    user_masks / correct_masks 为等长的掩码序列（可直接传 bytes 或 NumPy 数组），
+    multiple_flags 标记哪些题是多选题（部分得分时需要）。
+    返回每题得分：未开启部分得分时为 0/1。安装了 NumPy 时返回 ndarray，否则返回 list。
+    """
+    if np is None:
+        if partial_credit and multiple_flags is not None:
+            return [score_mask('multiple_choice' if m else '', u, c, True)
+                    for u, c, m in zip(user_masks, correct_masks, multiple_flags)]
+        return [1.0 if grade_mask(u, c) else 0.0 for u, c in zip(user_masks, correct_masks)]
+
+    user = _as_masks(user_masks)
+    correct = _as_masks(correct_masks)
+    exact = (user == correct) & ((user & INVALID_BIT) == 0)
+    scores = exact.astype(np.float32)
+    if partial_credit and multiple_flags is not None:
+        popcount = np.frombuffer(POPCOUNT, dtype=np.uint8)
+        multiple = np.asarray(multiple_flags, dtype=bool)
+        no_wrong = (user & ~correct) == 0
+        ratio = popcount[user] / np.maximum(popcount[correct], 1)
+        partial = multiple & no_wrong & ~exact & (correct != 0)
+        scores = np.where(partial, ratio, scores).astype(np.float32)
+    return scores
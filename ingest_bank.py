@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+题库导入工具
+从官方题库表格（.xlsx / .xls）逐行读取题目，整理字段、校验答案后写出
+single_choice.json / multiple_choice.json / judgment.json 并编译 question_bank.bin。
+
+- .xlsx 使用 openpyxl 只读模式逐行读取；.xls 使用 xlrd 按需加载工作表（均不构建 DataFrame）
+- 源文件内容哈希未变化时跳过重建（--force 强制重建）
+- 与上一次导入（或 --diff 指定的另一版本）对比，报告新增/删除/修改的题目
+
+用法:
+    python ingest_bank.py [题库表格] [--force] [--dry-run]
+    python ingest_bank.py --diff 旧版本.xls 新版本.xlsx
+需要: pip install openpyxl xlrd
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from question_bank import BANK_FILE, BANK_SOURCES, OPTION_LETTERS, compile_bank
+
+DEFAULT_SOURCE = '2025年成都百万职工技能大赛人工智能工程技术人员比赛-理论题库（0923）.xlsx'
+MANIFEST_FILE = 'question_bank.manifest.json'
+
+TYPE_NAMES = {
+    '单选题': 'single_choice',
+    '多选题': 'multiple_choice',
+    '判断题': 'judgment',
+}
+HEADER_TYPE = '题型'
+HEADER_STEM = '题干'
+HEADER_ANSWER = '参考答案'
+HEADER_OPTIONS = tuple(f'选项{letter}' for letter in OPTION_LETTERS)
+
+
+class IngestError(Exception):
+    """题库表格无法识别"""
+
+
+def file_hash(path: str) -> str:
+    """分块计算文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_rows(path: str) -> Iterator[Sequence[Any]]:
+    """逐行读取表格第一个工作表"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.xlsx':
+        import openpyxl
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            for row in workbook.worksheets[0].iter_rows(values_only=True):
+                yield row
+        finally:
+            workbook.close()
+    elif ext == '.xls':
+        import xlrd
+        workbook = xlrd.open_workbook(path, on_demand=True)
+        try:
+            sheet = workbook.sheet_by_index(0)
+            for i in range(sheet.nrows):
+                yield sheet.row_values(i)
+        finally:
+            workbook.release_resources()
+    else:
+        raise IngestError(f'不支持的文件类型: {path}')
+
+
+def clean_cell(value: Any) -> Optional[str]:
+    """单元格 -> 去空白的字符串；空单元格返回 None，整数形式的浮点数去掉 .0"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value).strip()
+    return text or None
+
+
+def question_key(question_type: str, question: Dict[str, Any]) -> str:
+    """题目标识：题型 + 题干（用于版本对比）"""
+    return f"{question_type}:{question['text']}"
+
+
+def question_fingerprint(question: Dict[str, Any]) -> str:
+    data = json.dumps([question['text'], question['options'], question['answer']], ensure_ascii=False)
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def validate(question_type: str, question: Dict[str, Any]) -> Optional[str]:
+    """校验答案与选项，返回错误信息（合法时返回 None）"""
+    if not question['text']:
+        return '题干为空'
+    letters = OPTION_LETTERS[:len(question['options'])]
+    answer = question['answer']
+    if not answer:
+        return '缺少参考答案'
+    if any(ch not in letters for ch in answer):
+        return f'答案 {answer} 超出有效选项 {letters}'
+    if len(set(answer)) != len(answer):
+        return f'答案 {answer} 含重复选项'
+    if question_type == 'multiple_choice':
+        if len(answer) < 2:
+            return f'多选题答案至少两个选项: {answer}'
+    elif len(answer) != 1:
+        return f'单选/判断题答案只能有一个选项: {answer}'
+    if question_type == 'judgment' and len(question['options']) != 2:
+        return '判断题应只有两个选项'
+    return None
+
+
+def read_bank(path: str) -> Tuple[Dict[str, List[Dict[str, Any]]], List[str]]:
+    """读取并整理题库表格，返回 ({题型: [题目]}, 错误列表)"""
+    questions = {question_type: [] for question_type, _ in BANK_SOURCES}
+    errors = []
+    columns = None
+    for row_no, row in enumerate(iter_rows(path), start=1):
+        cells = [clean_cell(v) for v in row]
+        if columns is None:
+            # 表头之前是标题行
+            if HEADER_TYPE in cells and HEADER_STEM in cells:
+                columns = {name: cells.index(name) for name in cells if name}
+                missing = [h for h in (HEADER_STEM, HEADER_ANSWER) + HEADER_OPTIONS[:2] if h not in columns]
+                if missing:
+                    raise IngestError(f'表头缺少列: {", ".join(missing)}')
+            continue
+        if not any(cells):
+            continue
+
+        def cell(name):
+            pos = columns.get(name)
+            return cells[pos] if pos is not None and pos < len(cells) else None
+
+        question_type = TYPE_NAMES.get(cell(HEADER_TYPE) or '')
+        if question_type is None:
+            errors.append(f'第 {row_no} 行: 未知题型 {cell(HEADER_TYPE)}')
+            continue
+        options = []
+        for header in HEADER_OPTIONS:
+            value = cell(header)
+            if value is None:
+                break
+            options.append(value)
+        answer = ''.join(ch for ch in (cell(HEADER_ANSWER) or '').upper() if not ch.isspace())
+        question = {'text': cell(HEADER_STEM) or '', 'options': options, 'answer': answer}
+        error = validate(question_type, question)
+        if error:
+            errors.append(f'第 {row_no} 行: {error}')
+            continue
+        questions[question_type].append(question)
+    if columns is None:
+        raise IngestError(f'未找到表头（{HEADER_TYPE}/{HEADER_STEM}）: {path}')
+    return questions, errors
+
+
+def fingerprints(questions: Dict[str, List[Dict[str, Any]]]) -> Dict[str, str]:
+    return {question_key(t, q): question_fingerprint(q) for t, items in questions.items() for q in items}
+
+
+def diff_fingerprints(old: Dict[str, str], new: Dict[str, str]) -> Dict[str, List[str]]:
+    """对比两个版本：按 题型+题干 匹配，内容摘要不同视为修改"""
+    return {
+        'added': sorted(k for k in new if k not in old),
+        'removed': sorted(k for k in old if k not in new),
+        'changed': sorted(k for k in new if k in old and old[k] != new[k]),
+    }
+
+
+def print_diff(diff: Dict[str, List[str]], limit: int = 20):
+    labels = {'added': '新增', 'removed': '删除', 'changed': '修改'}
+    print(' | '.join(f"{labels[k]}: {len(v)}道" for k, v in diff.items()))
+    for kind, keys in diff.items():
+        for key in keys[:limit]:
+            print(f"  [{labels[kind]}] {key[:60]}")
+        if len(keys) > limit:
+            print(f"  ……另有 {len(keys) - limit} 道{labels[kind]}")
+
+
+def load_manifest(base_dir: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(base_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def write_bank(questions: Dict[str, List[Dict[str, Any]]], base_dir: str):
+    """写出三个 JSON 题库文件（整理后的 text/options/answer 字段）"""
+    for question_type, filename in BANK_SOURCES:
+        path = os.path.join(base_dir, filename)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(questions[question_type], f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+def ingest(source: str, base_dir: str = '.', force: bool = False, dry_run: bool = False) -> bool:
+    """导入题库表格；返回是否重建了题库"""
+    source_hash = file_hash(source)
+    manifest = load_manifest(base_dir)
+    outputs = [os.path.join(base_dir, f) for _, f in BANK_SOURCES] + [os.path.join(base_dir, BANK_FILE)]
+    if (not force and manifest.get('source_hash') == source_hash
+            and all(os.path.exists(p) for p in outputs)):
+        print(f"源文件未变化，跳过重建: {source}")
+        return False
+
+    questions, errors = read_bank(source)
+    for error in errors:
+        print(f"跳过 {error}")
+    counts = {t: len(items) for t, items in questions.items()}
+    print(f"读取 {os.path.basename(source)}: " + ' | '.join(f"{t}: {n}道" for t, n in counts.items()))
+
+    new_prints = fingerprints(questions)
+    if manifest.get('questions'):
+        print(f"与上次导入（{manifest.get('source', '?')}）对比:")
+        print_diff(diff_fingerprints(manifest['questions'], new_prints))
+
+    if dry_run:
+        return False
+
+    write_bank(questions, base_dir)
+    data = compile_bank(base_dir, os.path.join(base_dir, BANK_FILE))
+    with open(os.path.join(base_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump({
+            'source': os.path.basename(source),
+            'source_hash': source_hash,
+            'counts': counts,
+            'questions': new_prints,
+        }, f, ensure_ascii=False, indent=1)
+    print(f"题库已重建: {BANK_FILE}（{len(data)} 字节）")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='从官方题库表格导入题库')
+    parser.add_argument('source', nargs='?', default=DEFAULT_SOURCE, help='题库表格（.xlsx/.xls）')
+    parser.add_argument('--force', action='store_true', help='忽略内容哈希，强制重建')
+    parser.add_argument('--dry-run', action='store_true', help='只读取和对比，不写文件')
+    parser.add_argument('--diff', nargs=2, metavar=('OLD', 'NEW'), help='对比两个题库版本')
+    parser.add_argument('--base-dir', default='.', help='题库文件输出目录')
+    args = parser.parse_args()
+
+    try:
+        if args.diff:
+            old, old_errors = read_bank(args.diff[0])
+            new, new_errors = read_bank(args.diff[1])
+            for error in old_errors + new_errors:
+                print(f"跳过 {error}")
+            print_diff(diff_fingerprints(fingerprints(old), fingerprints(new)))
+        else:
+            ingest(args.source, args.base_dir, force=args.force, dry_run=args.dry_run)
+    except ImportError as e:
+        print(f"缺少依赖: {e.name}，请先安装: pip install openpyxl xlrd")
+        sys.exit(1)
+    except (IngestError, OSError) as e:
+        print(f"导入失败: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程内运行指标（Web 版同步/异步服务器共用），/metrics 以 Prometheus 文本格式输出
+- 各接口的请求数、耗时分布、响应大小（压缩后）
+- 请求 Cookie 大小、服务端会话数据大小
+- 按题型统计的出题数、判分结果（正确/错误/部分得分/无效答案）
+
+计数不加锁：每个线程只写自己的一份（threading.local），抓取 /metrics 时才加锁汇总所有线程的数据，
+已退出线程的数据并入累计值。记录一次计数只是一次字典查找和整数加法，直方图另加一次二分查找。
+多进程部署（serve_prod.py）时每个工作进程各自计数，/metrics 返回处理该请求的进程的数据。
+
+用法: python metrics.py   # 输出本进程当前的指标（示例格式）
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+METRICS_PATH = '/metrics'
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (128, 256, 512, 1024, 2048, 4096, 8192, 16384, 65536, 262144)
+SMALL_SIZE_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 4096)
+
+
+def _merge(total: dict, data: dict):
+    """把一份计数（值为数字或直方图数组）加到 total 上"""
+    for key, value in data.items():
+        if isinstance(value, list):
+            value = list(value)  # 写入线程可能同时在更新，先整体复制
+            current = total.get(key)
+            if current is None:
+                total[key] = value
+            else:
+                for i, v in enumerate(value):
+                    current[i] += v
+        else:
+            total[key] = total.get(key, 0) + value
+
+
+class _ThreadShards:
+    """每个线程一份计数（只有本线程写），读取时汇总"""
+
+    # 登记新线程时，已退出的线程超过这个数就先并入累计值（线程池之外每请求一个线程的服务器）
+    COMPACT_AT = 64
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[Tuple[threading.Thread, dict]] = []
+        self._retired = {}
+
+    def local(self) -> dict:
+        try:
+            return self._local.data
+        except AttributeError:
+            data = self._local.data = {}
+            with self._lock:
+                if len(self._shards) >= self.COMPACT_AT:
+                    self._compact()
+                self._shards.append((threading.current_thread(), data))
+            return data
+
+    def _compact(self):
+        alive = []
+        for thread, data in self._shards:
+            if thread.is_alive():
+                alive.append((thread, data))
+            else:
+                _merge(self._retired, data)
+        self._shards = alive
+
+    def snapshot(self) -> dict:
+        """所有线程的汇总（dict.copy 在持有 GIL 时完成，写入线程无需加锁）"""
+        with self._lock:
+            self._compact()
+            total = {}
+            _merge(total, self._retired)
+            for _, data in self._shards:
+                _merge(total, data.copy())
+        return total
+
+
+class Registry:
+    """指标注册表"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus 文本格式"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names: Sequence[str], values: Sequence, le: Optional[str] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        return repr(value) if value != int(value) else str(int(value))
+    return str(value)
+
+
+class Counter:
+    """只增的计数；inc 的位置参数为各标签的值（顺序同 labels）"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), registry: Optional[Registry] = REGISTRY):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._shards = _ThreadShards()
+        if registry is not None:
+            registry.register(self)
+
+    def inc(self, *label_values, amount=1):
+        data = self._shards.local()
+        data[label_values] = data.get(label_values, 0) + amount
+
+    def values(self) -> Dict[tuple, float]:
+        return self._shards.snapshot()
+
+    def samples(self) -> List[str]:
+        return [f'{self.name}{_labels(self.labels, key)} {_number(value)}'
+                for key, value in sorted(self.values().items())]
+
+
+class Histogram:
+    """分布：每个标签组合一个数组 [各桶计数（不累计）..., +Inf 桶, 总和]"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS,
+                 registry: Optional[Registry] = REGISTRY):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _ThreadShards()
+        if registry is not None:
+            registry.register(self)
+
+    def observe(self, value, *label_values):
+        data = self._shards.local()
+        counts = data.get(label_values)
+        if counts is None:
+            counts = data[label_values] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def values(self) -> Dict[tuple, list]:
+        return self._shards.snapshot()
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, counts in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else _number(bound)
+                lines.append(f'{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labels, key)} {_number(counts[-1])}')
+            lines.append(f'{self.name}_count{_labels(self.labels, key)} {cumulative}')
+        return lines
+
+
+# 接口
+REQUESTS = Counter('exam_http_requests_total', '请求数', ('route', 'method', 'status'))
+REQUEST_SECONDS = Histogram('exam_http_request_duration_seconds', '请求处理耗时（秒）', ('route', 'method'))
+RESPONSE_BYTES = Histogram('exam_http_response_bytes', '响应体大小（压缩后，字节）', ('route',), SIZE_BUCKETS)
+COOKIE_BYTES = Histogram('exam_http_cookie_bytes', '请求 Cookie 头大小（字节）', (), SMALL_SIZE_BUCKETS)
+SESSION_BYTES = Histogram('exam_session_bytes', '保存的会话数据大小（JSON，字节；内存后端为抽样）', (), SMALL_SIZE_BUCKETS)
+# 出题与判分
+QUESTIONS_SERVED = Counter('exam_questions_served_total', '出题数', ('question_type',))
+ANSWERS_GRADED = Counter('exam_answers_graded_total', '判分结果', ('question_type', 'outcome'))
+
+
+def observe_request(route: str, method: str, status: int, seconds: float, response_bytes: Optional[int],
+                    cookie: Optional[str]):
+    """记录一次请求（同步版 after_request、异步版发送响应后调用）"""
+    REQUESTS.inc(route, method, status)
+    REQUEST_SECONDS.observe(seconds, route, method)
+    if response_bytes is not None:
+        RESPONSE_BYTES.observe(response_bytes, route)
+    if cookie:
+        COOKIE_BYTES.observe(len(cookie))
+
+
+def grade_outcome(is_correct: bool, score: Optional[float] = None, invalid: bool = False) -> str:
+    if is_correct:
+        return 'correct'
+    if invalid:
+        return 'invalid'
+    return 'partial' if score else 'wrong'
+
+
+def init_app(app, registry: Registry = REGISTRY):
+    """Flask：记录每个请求并提供 /metrics
+
+    须在 compression.init_app 之前调用：after_request 按注册的相反顺序执行，这样记录的是压缩后的大小
+    """
+    from flask import Response, g, request
+
+    @app.before_request
+    def start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.get('metrics_started')
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            observe_request(route, request.method, response.status_code, time.perf_counter() - started,
+                            response.calculate_content_length(), request.headers.get('Cookie'))
+        return response
+
+    def metrics_view():
+        return Response(registry.render(), content_type=CONTENT_TYPE, headers={'Cache-Control': 'no-store'})
+
+    app.add_url_rule(METRICS_PATH, 'metrics', metrics_view, methods=['GET'])
+    return app
+
+
+def main():
+    print(REGISTRY.render(), end='')
+
+
+if __name__ == '__main__':
+    main()
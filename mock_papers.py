@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模拟试卷（第X套测试题.txt）解析与缓存
+逐行解析试卷文本：大题标题（题型、每题分值）、带编号的题干、A.–E. 选项和“答案：X”行，
+得到按大题分组的结构化试卷。每套试卷编译为与题库相同的二进制格式缓存在 paper_cache/ 下，
+大题信息保存在同名 .json 中；源文件变化（修改时间或大小）时自动重新解析。
+
+用法: python mock_papers.py   # 解析全部试卷并显示各大题题数
+"""
+
+import glob
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from ingest_bank import validate
+from question_bank import QuestionBank, compile_questions
+
+PAPER_PATTERN = '第*套测试题.txt'
+PAPER_CACHE_DIR = 'paper_cache'
+JUDGMENT_OPTIONS = ['正确', '错误']
+
+_TITLE_RE = re.compile(r'^=+\s*(.+?)\s*=+$')
+_SECTION_RE = re.compile(r'^[一二三四五六七八九十]+、\s*(.+?)(?:（(.*)）)?$')
+_POINTS_RE = re.compile(r'每题\s*([\d.]+)\s*分')
+_QUESTION_RE = re.compile(r'^(\d+)\s*[.．、]\s*(.*)$')
+_OPTION_RE = re.compile(r'^([A-E])\s*[.．、]\s*(.*)$')
+_ANSWER_RE = re.compile(r'^答案\s*[：:]\s*(\S+)')
+_PAPER_NO_RE = re.compile(r'第\s*(\d+)\s*套')
+
+_JUDGMENT_ANSWERS = {'√': 'A', '对': 'A', '正确': 'A', '×': 'B', '错': 'B', '错误': 'B'}
+
+
+class PaperFormatError(Exception):
+    """试卷文本无法解析"""
+
+
+def section_type(name: str) -> Optional[str]:
+    """大题名称 -> 题型"""
+    if '判断' in name:
+        return 'judgment'
+    if '多项' in name or '多选' in name:
+        return 'multiple_choice'
+    if '单项' in name or '单选' in name:
+        return 'single_choice'
+    return None
+
+
+def parse_paper(lines: Iterable[str], source: str = '') -> Dict[str, Any]:
+    """逐行解析一套试卷
+
+    返回 {'title': 标题, 'sections': [{'name', 'type', 'points', 'questions': [...]}], 'errors': [...]}，
+    题目格式与题库相同（text/options/answer），判断题补上“正确/错误”两个选项。
+    """
+    title = os.path.splitext(os.path.basename(source))[0]
+    sections = []
+    errors = []
+    section = None
+    question = None
+
+    def finish():
+        nonlocal question
+        if question is None:
+            return
+        if section['type'] == 'judgment' and not question['options']:
+            question['options'] = list(JUDGMENT_OPTIONS)
+        error = validate(section['type'], question)
+        if error:
+            errors.append(f"{section['name']} 第 {question.pop('no')} 题: {error}")
+        else:
+            question.pop('no')
+            section['questions'].append(question)
+        question = None
+
+    for line_no, raw in enumerate(lines, start=1):
+        line = raw.strip()
+        if not line:
+            continue
+        match = _TITLE_RE.match(line)
+        if match and not sections:
+            title = match.group(1)
+            continue
+        match = _SECTION_RE.match(line)
+        if match and section_type(match.group(1)):
+            finish()
+            points = _POINTS_RE.search(match.group(2) or '')
+            section = {
+                'name': match.group(1),
+                'type': section_type(match.group(1)),
+                'points': float(points.group(1)) if points else 1.0,
+                'questions': [],
+            }
+            sections.append(section)
+            continue
+        if section is None:
+            continue
+        match = _QUESTION_RE.match(line)
+        if match:
+            finish()
+            question = {'no': int(match.group(1)), 'text': match.group(2), 'options': [], 'answer': ''}
+            continue
+        if question is None:
+            # 大题说明文字
+            continue
+        match = _ANSWER_RE.match(line)
+        if match:
+            answer = match.group(1)
+            answer = _JUDGMENT_ANSWERS.get(answer, answer).upper()
+            question['answer'] = answer
+            finish()
+            continue
+        match = _OPTION_RE.match(line)
+        if match and match.group(1) == 'ABCDE'[len(question['options'])]:
+            question['options'].append(match.group(2))
+            continue
+        # 续行：接在最后一个选项或题干之后
+        if question['options']:
+            question['options'][-1] += line
+        else:
+            question['text'] += line
+    if section is not None:
+        finish()
+    if not sections:
+        raise PaperFormatError(f'未找到大题: {source}')
+    return {'title': title, 'sections': sections, 'errors': errors}
+
+
+def parse_paper_file(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return parse_paper(f, path)
+
+
+def paper_number(title: str, default: int) -> int:
+    match = _PAPER_NO_RE.search(title)
+    return int(match.group(1)) if match else default
+
+
+class Paper:
+    """一套已编译的试卷：题目在 bank 中，按大题顺序排列"""
+
+    def __init__(self, paper_id: int, title: str, sections: List[Dict[str, Any]], bank: QuestionBank, source: str):
+        self.id = paper_id
+        self.title = title
+        self.sections = sections  # [{'name', 'type', 'points', 'count'}]
+        self.bank = bank
+        self.source = source
+        self.index = bank.index([s['type'] for s in sections])
+        self.total = self.index.total
+
+    def locate(self, number: int):
+        """题号（1-based）-> (大题序号, 题型, 题内下标)"""
+        section_idx, q_idx = self.index.locate(number)
+        return section_idx, self.sections[section_idx]['type'], q_idx
+
+    def max_score(self) -> float:
+        return sum(s['points'] * s['count'] for s in self.sections)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'paper_id': self.id,
+            'title': self.title,
+            'total_count': self.total,
+            'max_score': self.max_score(),
+            'sections': [{k: s[k] for k in ('name', 'type', 'points', 'count')} for s in self.sections],
+        }
+
+    def score_sections(self, section_correct: List[int], section_answered: List[int]) -> List[Dict[str, Any]]:
+        """按大题汇总得分"""
+        results = []
+        for i, section in enumerate(self.sections):
+            correct = section_correct[i] if i < len(section_correct) else 0
+            answered = section_answered[i] if i < len(section_answered) else 0
+            results.append({
+                'name': section['name'],
+                'count': section['count'],
+                'answered': answered,
+                'correct': correct,
+                'score': correct * section['points'],
+                'max_score': section['count'] * section['points'],
+            })
+        return results
+
+
+def _source_stamp(path: str) -> List[int]:
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def load_paper(path: str, paper_id: int, cache_dir: Optional[str] = None) -> Paper:
+    """加载一套试卷：缓存有效时直接映射编译结果，否则重新解析并写入缓存"""
+    cache_dir = cache_dir or os.path.join(os.path.dirname(path) or '.', PAPER_CACHE_DIR)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    bin_path = os.path.join(cache_dir, stem + '.bin')
+    meta_path = os.path.join(cache_dir, stem + '.json')
+    stamp = _source_stamp(path)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('source_stamp') == stamp and os.path.exists(bin_path):
+            return Paper(paper_id, meta['title'], meta['sections'], QuestionBank.open(bin_path), path)
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        pass
+
+    parsed = parse_paper_file(path)
+    grouped = {}
+    for section in parsed['sections']:
+        grouped.setdefault(section['type'], []).extend(section['questions'])
+    sections = []
+    for section in parsed['sections']:
+        if section['type'] in (s['type'] for s in sections):
+            # 同一题型出现在多个大题中时合并为一个大题
+            continue
+        sections.append({'name': section['name'], 'type': section['type'],
+                         'points': section['points'], 'count': len(grouped[section['type']])})
+    data = compile_questions(grouped)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(bin_path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(bin_path + '.tmp', bin_path)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({'title': parsed['title'], 'sections': sections, 'source_stamp': stamp,
+                       'errors': parsed['errors']}, f, ensure_ascii=False, indent=1)
+        bank = QuestionBank.open(bin_path)
+    except OSError:
+        # 缓存目录不可写时直接使用内存中的编译结果
+        bank = QuestionBank(data)
+    return Paper(paper_id, parsed['title'], sections, bank, path)
+
+
+class PaperLibrary:
+    """全部模拟试卷；reload_if_changed 在源文件变化时重新加载（检查间隔 CHECK_INTERVAL 秒）"""
+
+    CHECK_INTERVAL = 1.0
+
+    def __init__(self, base_dir: str = '.', pattern: str = PAPER_PATTERN):
+        self.base_dir = base_dir
+        self.pattern = pattern
+        self.papers = {}
+        self._stamps = {}
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """重新扫描试卷文件，只重新加载新增或修改过的试卷"""
+        papers = {}
+        stamps = {}
+        loaded = {p.source: p for p in self.papers.values()}
+        for n, path in enumerate(sorted(glob.glob(os.path.join(self.base_dir, self.pattern))), start=1):
+            try:
+                stamp = _source_stamp(path)
+                paper = loaded.get(path)
+                if paper is None or self._stamps.get(path) != stamp:
+                    paper = load_paper(path, n)
+                    paper.id = paper_number(paper.title, n)
+            except (OSError, PaperFormatError) as e:
+                print(f"加载试卷失败 {path}: {e}")
+                continue
+            papers[paper.id] = paper
+            stamps[path] = stamp
+        self.papers = dict(sorted(papers.items()))
+        self._stamps = stamps
+        self._last_check = time.monotonic()
+
+    def reload_if_changed(self):
+        if time.monotonic() - self._last_check < self.CHECK_INTERVAL:
+            return
+        with self._lock:
+            if time.monotonic() - self._last_check < self.CHECK_INTERVAL:
+                return
+            self.reload()
+
+    def get(self, paper_id) -> Optional[Paper]:
+        self.reload_if_changed()
+        try:
+            return self.papers.get(int(paper_id))
+        except (TypeError, ValueError):
+            return None
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        self.reload_if_changed()
+        return [paper.summary() for paper in self.papers.values()]
+
+
+def main():
+    start = time.perf_counter()
+    parsed = {path: parse_paper_file(path) for path in sorted(glob.glob(PAPER_PATTERN))}
+    elapsed = (time.perf_counter() - start) * 1000
+    for path, paper in parsed.items():
+        counts = ' | '.join(f"{s['name']}: {len(s['questions'])}道({s['points']:g}分/题)" for s in paper['sections'])
+        print(f"{paper['title']}（{path}）: {counts}")
+        for error in paper['errors']:
+            print(f"  跳过 {error}")
+    print(f"解析 {len(parsed)} 套试卷耗时 {elapsed:.1f} ms")
+    library = PaperLibrary()
+    print(f"已编译缓存到 {PAPER_CACHE_DIR}/: " + ', '.join(p.title for p in library.papers.values()))
+
+
+if __name__ == '__main__':
+    main()
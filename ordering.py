@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+出题顺序策略（Web 版共用）
+每个会话在 /start_exam 时选择一种策略，所有策略共用同一份已加载的题库和预渲染响应：
+
+- random     随机出题：一轮内不重复，出完后重新打乱
+- sequential 固定顺序：按题型顺序（默认 单选 -> 多选 -> 判断）逐题出完
+- by_type    只练某一种题型，按题库顺序
+- shuffled   打乱顺序且不重复，全部题目出完为止
+  （random / shuffled 可通过 type_weights 按题型加权，见 sampler）
+- paper      模拟试卷，按试卷顺序作答并按大题计分（见 mock_papers）
+- srs        间隔复习，答错的题按越来越长的间隔重新出现，进度按学习者保存（见 srs）
+- wrong      错题本练习，只出错题本（或最近几次考试的错题）中的题（见 wrong_book）
+
+题号由策略的“题目来源”决定：sequential / by_type / paper 按各自顺序编号，random / shuffled / srs / wrong 使用全局题号。
+会话中只保存策略名和少量整数（指针、随机种子等）。
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import sampler
+import srs
+import wrong_book
+from mock_papers import PaperLibrary
+from question_bank import QUESTION_TYPES, QuestionIndex
+from question_payloads import QuestionPayloadCache
+
+DEFAULT_ORDERING = 'random'
+
+
+class OrderingError(ValueError):
+    """策略参数无效"""
+
+
+class QuestionSource:
+    """题目来源：题库 + 预渲染响应 + 题号索引（题号为 1-based）"""
+
+    def __init__(self, bank, payloads, index: QuestionIndex):
+        self.bank = bank
+        self.payloads = payloads
+        self.index = index
+
+    @property
+    def total(self) -> int:
+        return self.index.total
+
+    def locate(self, number: int) -> Tuple[str, int]:
+        """题号 -> (题型, 题内下标)，越界时抛出 IndexError"""
+        type_idx, q_idx = self.index.locate(number)
+        return self.index.type_order[type_idx], q_idx
+
+    def question(self, number: int) -> Dict[str, Any]:
+        question_type, q_idx = self.locate(number)
+        return self.bank.questions[question_type][q_idx]
+
+
+class Ordering:
+    """策略基类；exam 为 WebExamSystem（提供 bank 和 payloads）"""
+
+    name = ''
+    label = ''
+    # 题号是否按出题顺序连续编号（决定 /get_questions 的 start 参数是否有效）
+    numbered = True
+    # 出题是否与作答无关（客户端可以提前取一页）
+    prefetch = True
+    # 出题、交卷时是否读写文件（异步版据此放到线程池执行）
+    blocking = False
+
+    def __init__(self, exam):
+        self.exam = exam
+
+    def main_source(self, type_order: Optional[Sequence[str]] = None) -> QuestionSource:
+        bank = self.exam.bank
+        return QuestionSource(bank, self.exam.payloads, bank.index(type_order))
+
+    def start(self, session, options: Dict[str, Any]):
+        """/start_exam 时初始化会话中的策略状态"""
+        session['order_pos'] = 0
+
+    def source(self, session) -> QuestionSource:
+        return self.main_source()
+
+    def next_number(self, session) -> Optional[int]:
+        """出下一题并移动指针，返回题号；题目出完时返回 None"""
+        number = session.get('order_pos', 0) + 1
+        if number > self.source(session).total:
+            return None
+        session['order_pos'] = number
+        return number
+
+    def page_numbers(self, session, start: Optional[int], count: int) -> List[int]:
+        """一页题号（供客户端预取），指针移到本页之后"""
+        total = self.source(session).total
+        if start is None:
+            start = session.get('order_pos', 0) + 1
+        numbers = list(range(start, min(start + count - 1, total) + 1))
+        if numbers:
+            self.seek(session, numbers[-1])
+        return numbers
+
+    def seek(self, session, number: int):
+        """跳到指定题号，之后从下一题继续"""
+        session['order_pos'] = number
+
+    def question_fields(self, session, number: int) -> Dict[str, Any]:
+        """拼接到题目响应中的额外字段"""
+        return {}
+
+    def on_answer(self, session, number: int, is_correct: bool) -> Dict[str, Any]:
+        """提交答案后的额外处理，返回拼接到响应中的字段"""
+        return {}
+
+    def log_source(self, session) -> Optional[str]:
+        """作答记录中的题目来源：None 表示题库（题目ID为全局题目ID）"""
+        return None
+
+    def describe(self, session) -> Dict[str, Any]:
+        return {'name': self.name, 'label': self.label, 'numbered': self.numbered,
+                'prefetch': self.prefetch, 'total_count': self.source(session).total}
+
+
+class SequentialOrdering(Ordering):
+    name = 'sequential'
+    label = '顺序练习'
+
+    def start(self, session, options):
+        type_order = options.get('type_order') or list(QUESTION_TYPES)
+        if (not isinstance(type_order, list) or len(set(type_order)) != len(type_order)
+                or any(t not in self.exam.bank.types for t in type_order)):
+            raise OrderingError(f'题型顺序无效: {type_order}')
+        session['type_order'] = type_order
+        session['order_pos'] = 0
+
+    def source(self, session):
+        return self.main_source(session.get('type_order') or QUESTION_TYPES)
+
+
+class ByTypeOrdering(SequentialOrdering):
+    name = 'by_type'
+    label = '分题型练习'
+
+    def start(self, session, options):
+        question_type = options.get('question_type')
+        if question_type not in self.exam.bank.types:
+            raise OrderingError(f'题型无效: {question_type}')
+        super().start(session, {'type_order': [question_type]})
+
+
+class ShuffledOrdering(Ordering):
+    """按种子确定的随机排列出题（见 sampler 模块），会话中只保存 (order_seed, order_pos)
+
+    可传 type_weights（如 {"judgment": 2}）让某些题型更早出现，全部题目仍各出一次
+    """
+
+    name = 'shuffled'
+    label = '乱序不重复'
+    numbered = False
+
+    def start(self, session, options):
+        try:
+            weights = sampler.normalize_weights(options.get('type_weights'), self.exam.bank.types)
+        except ValueError as e:
+            raise OrderingError(str(e))
+        if weights:
+            session['order_weights'] = dict(weights)
+        else:
+            session.pop('order_weights', None)
+        session['order_seed'] = sampler.new_seed()
+        session['order_pos'] = 0
+
+    def permutation(self, session):
+        if 'order_seed' not in session:
+            session['order_seed'] = sampler.new_seed()
+        weights = session.get('order_weights')
+        bank = self.exam.bank
+        return sampler.permutation(bank.counts(), session['order_seed'],
+                                   tuple((t, weights[t]) for t in bank.types) if weights else None)
+
+    def next_number(self, session):
+        order = self.permutation(session)
+        pos = session.get('order_pos', 0)
+        if pos >= len(order):
+            return None
+        session['order_pos'] = pos + 1
+        return order[pos] + 1
+
+    def page_numbers(self, session, start, count):
+        # 题号是全局题号，不连续，start 忽略，从指针处继续
+        numbers = []
+        for _ in range(count):
+            number = self.next_number(session)
+            if number is None:
+                break
+            numbers.append(number)
+        return numbers
+
+    def seek(self, session, number):
+        session['order_pos'] = self.permutation(session).position(number - 1) + 1
+
+
+class RandomOrdering(ShuffledOrdering):
+    """随机练习：与乱序不重复相同，但一轮出完后换一个种子继续，不会结束"""
+
+    name = 'random'
+    label = '随机练习'
+
+    def next_number(self, session):
+        number = super().next_number(session)
+        if number is None and len(self.permutation(session)):
+            session['order_seed'] = sampler.new_seed()
+            session['order_pos'] = 0
+            number = super().next_number(session)
+        return number
+
+
+class WrongOrdering(ShuffledOrdering):
+    """错题本练习：开始时取出学习者的错题位集合保存在会话中（480 题为 120 个十六进制字符），
+    按随机排列出题并跳过不在集合中的题
+
+    选项 last=N 时改为最近 N 次考试的错题，mode 为 union（错过）或 intersection（每次都错）
+    """
+
+    name = 'wrong'
+    label = '错题本练习'
+
+    def start(self, session, options):
+        last = options.get('last') or 0
+        mode = options.get('mode') or 'union'
+        if not isinstance(last, int) or not 0 <= last <= wrong_book.KEEP_ATTEMPTS:
+            raise OrderingError(f'考试次数应在 0 到 {wrong_book.KEEP_ATTEMPTS} 之间')
+        if mode not in ('union', 'intersection'):
+            raise OrderingError(f'组合方式无效: {mode}')
+        bits = self.exam.wrong_book.select(session['learner'], last, mode)
+        if not bits:
+            raise OrderingError('错题本中没有题目')
+        super().start(session, {})
+        session['wrong_bits'] = format(bits, 'x')
+
+    def bits(self, session) -> int:
+        return int(session.get('wrong_bits') or '0', 16)
+
+    def next_number(self, session):
+        bits = self.bits(session)
+        while True:
+            number = super().next_number(session)
+            if number is None or bits >> (number - 1) & 1:
+                return number
+
+    def describe(self, session):
+        description = super().describe(session)
+        description['total_count'] = wrong_book.count(self.bits(session))
+        return description
+
+
+_library = None
+_paper_payloads = {}
+
+
+def get_library() -> PaperLibrary:
+    """试卷库在首次使用时加载"""
+    global _library
+    if _library is None:
+        _library = PaperLibrary()
+    return _library
+
+
+def paper_payloads(paper) -> QuestionPayloadCache:
+    """每套试卷的预渲染题目（试卷重新加载后重建）"""
+    cache = _paper_payloads.get(paper.id)
+    if cache is None or cache[0] is not paper:
+        # 试卷题目的 question_id 是试卷内的编号，加上试卷前缀与题库的全局题目ID区分
+        payloads = QuestionPayloadCache(paper.bank.questions, id_prefix=f'paper:{paper.id}/')
+        cache = _paper_payloads[paper.id] = (paper, payloads)
+    return cache[1]
+
+
+class PaperOrdering(Ordering):
+    name = 'paper'
+    label = '模拟试卷'
+    # 试卷库定时检查试卷文件是否修改
+    blocking = True
+
+    def paper(self, session):
+        paper = get_library().get(session.get('paper_id'))
+        if paper is None:
+            raise OrderingError('试卷不存在')
+        return paper
+
+    def start(self, session, options):
+        paper = get_library().get(options.get('paper_id'))
+        if paper is None:
+            raise OrderingError('试卷不存在')
+        session['paper_id'] = paper.id
+        session['paper_correct'] = [0] * len(paper.sections)
+        session['paper_answered'] = [0] * len(paper.sections)
+        # 已计分的题号位集合（十六进制，第 n-1 位为第 n 题）：每题只按第一次作答计分
+        session['paper_done'] = '0'
+        session['order_pos'] = 0
+
+    def source(self, session):
+        paper = self.paper(session)
+        return QuestionSource(paper.bank, paper_payloads(paper), paper.index)
+
+    def question_fields(self, session, number):
+        return {'section_index': self.paper(session).locate(number)[0]}
+
+    def log_source(self, session):
+        return f"paper:{session.get('paper_id')}"
+
+    def on_answer(self, session, number, is_correct):
+        paper = self.paper(session)
+        section_idx = paper.locate(number)[0]
+        answered = session.get('paper_answered') or [0] * len(paper.sections)
+        correct = session.get('paper_correct') or [0] * len(paper.sections)
+        done = int(session.get('paper_done') or '0', 16)
+        counted = not done >> (number - 1) & 1
+        if counted:
+            answered[section_idx] += 1
+            correct[section_idx] += is_correct
+            session['paper_answered'] = answered
+            session['paper_correct'] = correct
+            session['paper_done'] = format(done | 1 << (number - 1), 'x')
+        return {'section_index': section_idx, 'sections': paper.score_sections(correct, answered),
+                'counted': counted, 'finished': number >= paper.total}
+
+    def result(self, session) -> Dict[str, Any]:
+        """各大题得分汇总"""
+        paper = self.paper(session)
+        sections = paper.score_sections(session.get('paper_correct') or [], session.get('paper_answered') or [])
+        return {'title': paper.title, 'sections': sections, 'score': sum(s['score'] for s in sections),
+                'max_score': paper.max_score()}
+
+    def describe(self, session):
+        description = super().describe(session)
+        description['paper'] = self.paper(session).summary()
+        return description
+
+
+class SRSOrdering(Ordering):
+    """间隔复习：复习状态由 srs.SRSStore 按会话中的学习者ID（见 WebExamSystem.start）加载和保存"""
+
+    name = 'srs'
+    label = '错题间隔复习'
+    numbered = False
+    # 下一题取决于刚才的作答结果，不能提前取一页
+    prefetch = False
+    # 首次使用时读取、作答后保存复习进度文件
+    blocking = True
+
+    def __init__(self, exam):
+        super().__init__(exam)
+        self._store = None
+
+    @property
+    def store(self) -> srs.SRSStore:
+        if self._store is None:
+            self._store = srs.SRSStore(os.environ.get('EXAM_SRS_DIR', srs.SRS_DIR))
+        return self._store
+
+    def learner(self, session) -> str:
+        learner = session.get('learner')
+        if not learner:
+            raise OrderingError('请先开始间隔复习')
+        return learner
+
+    def start(self, session, options):
+        self.learner(session)
+
+    def next_number(self, session):
+        numbers = self.page_numbers(session, None, 1)
+        return numbers[0] if numbers else None
+
+    def page_numbers(self, session, start, count):
+        picked = self.store.pick(self.learner(session), self.exam.bank.record_count, count)
+        return [question_id + 1 for question_id in picked]
+
+    def seek(self, session, number):
+        pass
+
+    def on_answer(self, session, number, is_correct):
+        interval = self.store.answer(self.learner(session), self.exam.bank.record_count, number - 1, is_correct)
+        return {'review_in': interval}
+
+    def describe(self, session):
+        description = super().describe(session)
+        schedule = self.store.get(self.learner(session), self.exam.bank.record_count)
+        description.update(schedule.summary())
+        return description
+
+
+ORDERINGS = (RandomOrdering, SequentialOrdering, ByTypeOrdering, ShuffledOrdering, PaperOrdering, SRSOrdering,
+             WrongOrdering)
+
+
+def create_orderings(exam) -> Dict[str, Ordering]:
+    """为考试系统实例创建全部策略（名称 -> 策略）"""
+    return {cls.name: cls(exam) for cls in ORDERINGS}
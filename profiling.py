@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按请求的性能剖析（Web 版同步/异步服务器共用，默认关闭）
+开启后按采样比例、或请求带 X-Exam-Profile 头时，对选定接口的单个请求做剖析，结果写入本地目录：
+
+    profiles/20240601-120000-12345-7-jump_to.prof    cProfile 数据（确定性剖析，pstats 格式）
+    profiles/20240601-120000-12345-7-jump_to.folded  采样模式：折叠调用栈 "a;b;c 次数"（可直接生成火焰图）
+    profiles/20240601-120000-12345-7-jump_to.json    请求信息：接口、方法、路径、状态码、耗时、进程……
+
+同一进程同时只剖析一个请求（其余请求照常处理、不剖析），写满 EXAM_PROFILE_MAX 个后不再剖析。
+未开启时不注册任何钩子，请求路径上没有额外开销。
+
+配置项（均可用同名环境变量覆盖）：
+    EXAM_PROFILE          : 1 开启
+    EXAM_PROFILE_DIR      : 输出目录，默认 profiles
+    EXAM_PROFILE_RATE     : 采样比例 0~1，默认 0（只剖析带触发头的请求）
+    EXAM_PROFILE_ROUTES   : 只剖析这些接口（逗号分隔，如 /jump_to,/get_question），默认全部
+    EXAM_PROFILE_MODE     : cprofile（默认）或 sample（每 EXAM_PROFILE_INTERVAL 秒采样一次调用栈，开销更小）
+    EXAM_PROFILE_TOKEN    : 设置后触发头的值必须与之相同
+    EXAM_PROFILE_MAX      : 每个进程最多保存的剖析数，默认 1000
+
+异步版的请求在同一个事件循环中交替执行，两种模式都会把同时进行的其他请求在事件循环上执行的部分也计入；
+放到线程池执行的处理函数在工作线程中单独剖析（见 _Run.call），只计入本请求。需要排除其他请求时在并发低时触发。
+
+汇总: python profiling.py [目录] [--top 30] [--route /jump_to] [--sort tottime|cumtime]
+"""
+
+import argparse
+import cProfile
+import glob
+import itertools
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Mapping, Optional
+
+PROFILE_DIR = 'profiles'
+TRIGGER_HEADER = 'X-Exam-Profile'
+MODES = ('cprofile', 'sample')
+SAMPLE_INTERVAL = 0.001
+MAX_PROFILES = 1000
+
+
+def _frame_label(filename: str, lineno: int, name: str) -> str:
+    """函数标识：只保留路径的最后两级，便于阅读"""
+    parts = filename.replace('\\', '/').rsplit('/', 2)
+    return f"{'/'.join(parts[-2:])}:{lineno}({name})"
+
+
+class _Run:
+    """一次请求的剖析"""
+
+    suffix = ''
+
+    def __init__(self, route: str, reason: str):
+        self.route = route
+        self.reason = reason
+        self.started = time.time()
+        self.clock = time.perf_counter()
+
+    def call(self, func, *args):
+        """在当前线程（如线程池的工作线程）中执行 func，并计入本次剖析"""
+        return func(*args)
+
+
+class _CProfileRun(_Run):
+    suffix = '.prof'
+
+    def __init__(self, route: str, reason: str):
+        super().__init__(route, reason)
+        self.profile = cProfile.Profile()
+        self.threads = []
+
+    def start(self):
+        self.profile.enable()
+
+    def call(self, func, *args):
+        # cProfile 只剖析调用 enable 的线程，工作线程用单独的 Profile，保存时合并
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # Python 3.12+ 的剖析对所有线程生效，已经计入
+            return func(*args)
+        try:
+            return func(*args)
+        finally:
+            profile.disable()
+            self.threads.append(profile)
+
+    def stop(self):
+        self.profile.disable()
+
+    def dump(self, path: str):
+        stats = pstats.Stats(self.profile)
+        for profile in self.threads:
+            stats.add(profile)
+        stats.dump_stats(path)
+
+
+class _SampleRun(_Run):
+    """后台线程定时读取请求线程的调用栈"""
+
+    suffix = '.folded'
+
+    def __init__(self, route: str, reason: str, interval: float):
+        super().__init__(route, reason)
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name='exam-profile-sampler', daemon=True)
+
+    def start(self):
+        self._sampler.start()
+
+    def call(self, func, *args):
+        # 执行期间改为采样当前线程（请求所在的线程这时只是在等待）
+        previous, self.thread_id = self.thread_id, threading.get_ident()
+        try:
+            return func(*args)
+        finally:
+            self.thread_id = previous
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(_frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self._sampler.join()
+
+    def dump(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+
+
+class RequestProfiler:
+    """决定剖析哪些请求，并保存剖析结果"""
+
+    def __init__(self, directory: str = PROFILE_DIR, rate: float = 0.0, routes=(), mode: str = 'cprofile',
+                 token: Optional[str] = None, interval: float = SAMPLE_INTERVAL, max_profiles: int = MAX_PROFILES):
+        if mode not in MODES:
+            raise ValueError(f'未知的剖析模式: {mode}')
+        self.directory = directory
+        self.rate = rate
+        self.routes = frozenset(routes)
+        self.mode = mode
+        self.token = token
+        self.interval = interval
+        self.max_profiles = max_profiles
+        self._busy = threading.Lock()
+        self._seq = itertools.count(1)
+        self._saved = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def start(self, route: str, trigger: Optional[str] = None):
+        """需要剖析时开始并返回剖析句柄，否则返回 None"""
+        if self.routes and route not in self.routes:
+            return None
+        if trigger is not None and (self.token is None or trigger == self.token):
+            reason = 'header'
+        elif self.rate > 0 and random.random() < self.rate:
+            reason = 'sample'
+        else:
+            return None
+        if self._saved >= self.max_profiles or not self._busy.acquire(blocking=False):
+            return None
+        if self.mode == 'cprofile':
+            run = _CProfileRun(route, reason)
+        else:
+            run = _SampleRun(route, reason, self.interval)
+        try:
+            run.start()
+        except ValueError:  # 已有其他剖析器在运行
+            self._busy.release()
+            return None
+        return run
+
+    def finish(self, run, **info) -> Optional[str]:
+        """停止剖析并保存，返回剖析文件路径"""
+        try:
+            run.stop()
+            duration = time.perf_counter() - run.clock
+            slug = ''.join(c if c.isalnum() else '_' for c in run.route.strip('/')) or 'index'
+            stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(run.started))
+            base = os.path.join(self.directory, f'{stamp}-{os.getpid()}-{next(self._seq)}-{slug}')
+            run.dump(base + run.suffix)
+            meta = {'route': run.route, 'mode': self.mode, 'reason': run.reason, 'started': round(run.started, 3),
+                    'duration_ms': round(duration * 1000, 3), 'pid': os.getpid(),
+                    'file': os.path.basename(base + run.suffix)}
+            if self.mode == 'sample':
+                meta['interval'] = self.interval
+            meta.update(info)
+            with open(base + '.json', 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            self._saved += 1
+            return base + run.suffix
+        except OSError as e:
+            print(f'剖析结果写入失败: {e}')
+            return None
+        finally:
+            self._busy.release()
+
+
+def from_config(config: Mapping[str, Any]) -> Optional[RequestProfiler]:
+    """按配置创建剖析器；未开启时返回 None"""
+    def option(name, default=None):
+        return os.environ.get(name, config.get(name, default))
+
+    if str(option('EXAM_PROFILE', '')).lower() not in ('1', 'true', 'yes', 'on'):
+        return None
+    routes = [r.strip() for r in str(option('EXAM_PROFILE_ROUTES', '')).split(',') if r.strip()]
+    return RequestProfiler(
+        directory=option('EXAM_PROFILE_DIR', PROFILE_DIR),
+        rate=min(max(float(option('EXAM_PROFILE_RATE', 0)), 0.0), 1.0),
+        routes=routes,
+        mode=option('EXAM_PROFILE_MODE', 'cprofile'),
+        token=option('EXAM_PROFILE_TOKEN'),
+        interval=float(option('EXAM_PROFILE_INTERVAL', SAMPLE_INTERVAL)),
+        max_profiles=int(option('EXAM_PROFILE_MAX', MAX_PROFILES)),
+    )
+
+
+def init_app(app) -> Optional[RequestProfiler]:
+    """Flask：开启时注册剖析钩子（最先注册，剖析范围包括其他钩子、压缩和会话保存）"""
+    profiler = from_config(app.config)
+    if profiler is None:
+        return None
+    from flask import g, request
+
+    @app.before_request
+    def start_profile():
+        if request.url_rule is not None:
+            g.profile_run = profiler.start(request.url_rule.rule, request.headers.get(TRIGGER_HEADER))
+
+    @app.after_request
+    def profile_status(response):
+        g.profile_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def finish_profile(exc):
+        run = g.pop('profile_run', None)
+        if run is not None:
+            profiler.finish(run, method=request.method, path=request.path,
+                            query=request.query_string.decode('latin-1'), status=g.get('profile_status', 500))
+
+    app.extensions['exam_profiler'] = profiler
+    return profiler
+
+
+# ---------------------------------------------------------------- 汇总
+
+def load_profiles(directory: str, route: Optional[str] = None):
+    """[(请求信息, 剖析文件路径), ...]"""
+    profiles = []
+    for meta_path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        path = os.path.join(directory, meta.get('file', ''))
+        if os.path.exists(path) and (route is None or meta.get('route') == route):
+            profiles.append((meta, path))
+    return profiles
+
+
+def aggregate(profiles, sort: str = 'tottime') -> Dict[str, Dict[str, float]]:
+    """合并所有剖析：{函数: {'tottime': 自身耗时秒, 'cumtime': 含子调用耗时秒, 'calls': 调用次数}}
+
+    采样数据按 样本数 × 采样间隔 折算为秒（calls 为样本数）
+    """
+    functions = defaultdict(lambda: {'tottime': 0.0, 'cumtime': 0.0, 'calls': 0})
+    prof_files = [path for meta, path in profiles if path.endswith('.prof')]
+    if prof_files:
+        stats = pstats.Stats(*prof_files)
+        for (filename, lineno, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            entry = functions[_frame_label(filename, lineno, name)]
+            entry['tottime'] += tottime
+            entry['cumtime'] += cumtime
+            entry['calls'] += calls
+    for meta, path in profiles:
+        if not path.endswith('.folded'):
+            continue
+        interval = meta.get('interval', SAMPLE_INTERVAL)
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                frames = stack.split(';')
+                seconds = int(count) * interval
+                functions[frames[-1]]['tottime'] += seconds
+                functions[frames[-1]]['calls'] += int(count)
+                for frame in set(frames):  # 递归调用只计一次
+                    functions[frame]['cumtime'] += seconds
+    return dict(sorted(functions.items(), key=lambda item: item[1][sort], reverse=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='汇总保存的请求剖析，列出最耗时的函数')
+    parser.add_argument('directory', nargs='?', default=PROFILE_DIR, help='剖析目录（默认 profiles）')
+    parser.add_argument('--top', type=int, default=30, help='显示前 N 个函数')
+    parser.add_argument('--route', help='只汇总这个接口，如 /jump_to')
+    parser.add_argument('--sort', choices=('tottime', 'cumtime'), default='tottime',
+                        help='按自身耗时或含子调用的耗时排序')
+    args = parser.parse_args()
+
+    profiles = load_profiles(args.directory, args.route)
+    if not profiles:
+        print(f'{args.directory} 中没有剖析结果')
+        return
+
+    print(f"{'接口':<24} {'请求数':>6} {'平均耗时(毫秒)':>14} {'最长(毫秒)':>10}")
+    by_route = defaultdict(list)
+    for meta, _ in profiles:
+        by_route[meta.get('route')].append(meta.get('duration_ms', 0))
+    for route, durations in sorted(by_route.items(), key=lambda item: -sum(item[1])):
+        print(f'{route:<24} {len(durations):>6} {sum(durations) / len(durations):>14.3f} {max(durations):>10.3f}')
+
+    functions = aggregate(profiles, args.sort)
+    if not functions:
+        print('\n没有采样数据（请求短于采样间隔时取不到样本，可减小 EXAM_PROFILE_INTERVAL 或改用 cprofile 模式）')
+        return
+    count = len(profiles)
+    print(f"\n{'自身耗时(毫秒/请求)':>18} {'含子调用(毫秒/请求)':>18} {'调用次数':>10}  函数")
+    for name, entry in itertools.islice(functions.items(), args.top):
+        print(f"{entry['tottime'] * 1000 / count:>18.3f} {entry['cumtime'] * 1000 / count:>18.3f} "
+              f"{entry['calls']:>10}  {name}")
+
+
+if __name__ == '__main__':
+    main()
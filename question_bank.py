@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+题库编译与加载模块
+将 single_choice.json / multiple_choice.json / judgment.json 编译为一个紧凑的
+二进制题库文件（字符串表 + 定长记录 + 答案位掩码），运行时通过 mmap 只读映射，
+各前端（Web 多进程 / GUI 打包版）启动时无需解析 JSON，fork 出的子进程共享同一份页面。
+
+文件布局（小端序）：
+    文件头   : magic(4s) version(H) type_count(H) record_count(I)
+               types_offset(I) records_offset(I) str_index_offset(I)
+               str_data_offset(I) str_count(I)
+    题型表   : 每项 name_sid(I) first_record(I) count(I)
+    题目记录 : 每项 stem_sid(I) option_sid*5(I) answer_mask(B) option_count(B) 保留(2x)
+    字符串表 : (str_count + 1) 个偏移量(I) + UTF-8 数据区
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+BANK_FILE = 'question_bank.bin'
+BANK_MAGIC = b'QBNK'
+BANK_VERSION = 1
+
+# 题型与源文件（顺序即题库中的题型顺序）
+BANK_SOURCES = (
+    ('single_choice', 'single_choice.json'),
+    ('multiple_choice', 'multiple_choice.json'),
+    ('judgment', 'judgment.json'),
+)
+QUESTION_TYPES = tuple(t for t, _ in BANK_SOURCES)
+
+OPTION_LETTERS = 'ABCDE'
+MAX_OPTIONS = len(OPTION_LETTERS)
+NO_STRING = 0xFFFFFFFF
+
+_HEADER = struct.Struct('<4sHHIIIIII')
+_TYPE_ENTRY = struct.Struct('<III')
+_RECORD = struct.Struct('<IIIIIIBB2x')
+_OFFSET = struct.Struct('<I')
+_MASK_OFFSET = 24  # 记录中 answer_mask 字段的偏移
+
+
+class QuestionBankError(Exception):
+    """题库文件缺失或格式错误"""
+
+
+def answer_to_mask(answer: str) -> int:
+    """将答案字符串（如 'ACD'）转换为 5 位掩码，A 为最低位"""
+    mask = 0
+    for ch in (answer or '').upper():
+        pos = OPTION_LETTERS.find(ch)
+        if pos >= 0:
+            mask |= 1 << pos
+    return mask
+
+
+def mask_to_answer(mask: int) -> str:
+    """将 5 位掩码还原为按字母排序的答案字符串"""
+    return ''.join(OPTION_LETTERS[i] for i in range(MAX_OPTIONS) if mask & (1 << i))
+
+
+def normalize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """把原始 pandas 导出的记录（Unnamed: N 字段）整理为 text/options/answer"""
+    if 'text' in record:
+        options = [o for o in record.get('options', []) if o is not None]
+        return {'text': record['text'], 'options': options, 'answer': record.get('answer', '')}
+    options = []
+    for n in range(2, 2 + MAX_OPTIONS):
+        value = record.get(f'Unnamed: {n}')
+        if value is None:
+            continue
+        options.append(str(value))
+    return {
+        'text': str(record.get('Unnamed: 1', '') or ''),
+        'options': options,
+        'answer': str(record.get('Unnamed: 7', '') or ''),
+    }
+
+
+def format_options(question: Dict[str, Any]) -> List[Dict[str, str]]:
+    """生成接口使用的选项列表 [{'value': 'A', 'text': ...}, ...]"""
+    return [{'value': OPTION_LETTERS[i], 'text': text} for i, text in enumerate(question['options'])]
+
+
+class _StringTable:
+    """编译期字符串表（相同字符串只存一份）"""
+
+    def __init__(self):
+        self.ids = {}
+        self.items = []
+
+    def add(self, text: Optional[str]) -> int:
+        if text is None:
+            return NO_STRING
+        sid = self.ids.get(text)
+        if sid is None:
+            sid = len(self.items)
+            self.ids[text] = sid
+            self.items.append(text.encode('utf-8'))
+        return sid
+
+
+def compile_questions(questions: Dict[str, Sequence[Dict[str, Any]]]) -> bytes:
+    """将 {题型: [题目, ...]} 编译为二进制题库"""
+    strings = _StringTable()
+    type_entries = []
+    records = []
+    for question_type, items in questions.items():
+        type_entries.append((strings.add(question_type), len(records), len(items)))
+        for raw in items:
+            q = normalize_record(raw)
+            if len(q['options']) > MAX_OPTIONS:
+                raise QuestionBankError(f"选项数超过 {MAX_OPTIONS}: {q['text'][:20]}")
+            option_sids = [strings.add(o) for o in q['options']]
+            option_sids += [NO_STRING] * (MAX_OPTIONS - len(option_sids))
+            records.append((strings.add(q['text']), *option_sids,
+                            answer_to_mask(q['answer']), len(q['options'])))
+
+    types_offset = _HEADER.size
+    records_offset = types_offset + _TYPE_ENTRY.size * len(type_entries)
+    str_index_offset = records_offset + _RECORD.size * len(records)
+    str_data_offset = str_index_offset + _OFFSET.size * (len(strings.items) + 1)
+
+    out = bytearray(_HEADER.pack(
+        BANK_MAGIC, BANK_VERSION, len(type_entries), len(records),
+        types_offset, records_offset, str_index_offset, str_data_offset, len(strings.items)))
+    for entry in type_entries:
+        out += _TYPE_ENTRY.pack(*entry)
+    for record in records:
+        out += _RECORD.pack(*record)
+    pos = 0
+    for data in strings.items:
+        out += _OFFSET.pack(pos)
+        pos += len(data)
+    out += _OFFSET.pack(pos)
+    for data in strings.items:
+        out += data
+    return bytes(out)
+
+
+def read_sources(base_dir: str = '.') -> Dict[str, List[Dict[str, Any]]]:
+    """读取三个 JSON 源文件"""
+    questions = {}
+    for question_type, filename in BANK_SOURCES:
+        with open(os.path.join(base_dir, filename), 'r', encoding='utf-8') as f:
+            questions[question_type] = json.load(f)
+    return questions
+
+
+def compile_bank(base_dir: str = '.', output: Optional[str] = None) -> bytes:
+    """编译题库；指定 output 时写入文件（先写临时文件再原子替换）"""
+    data = compile_questions(read_sources(base_dir))
+    if output:
+        tmp_path = output + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, output)
+    return data
+
+
+class QuestionIndex:
+    """题号索引：按给定题型顺序对题库做前缀和
+
+    题号（1-based）与 (题型序号, 题内下标) 互相转换：
+    number_of 为 O(1)，locate 用二分查找为 O(log k)，k 为题型数。
+    """
+
+    def __init__(self, counts: Dict[str, int], type_order: Sequence[str]):
+        self.type_order = tuple(type_order)
+        self.counts = tuple(counts.get(t, 0) for t in self.type_order)
+        self.offsets = []  # 每个题型第一题之前的题目总数
+        total = 0
+        for count in self.counts:
+            self.offsets.append(total)
+            total += count
+        self.total = total
+        self._type_pos = {t: i for i, t in enumerate(self.type_order)}
+
+    def number_of(self, question_type: str, q_idx: int) -> int:
+        """(题型, 题内下标) -> 题号（1-based）"""
+        return self.offsets[self._type_pos[question_type]] + q_idx + 1
+
+    def locate(self, number: int) -> Tuple[int, int]:
+        """题号（1-based）-> (题型序号, 题内下标)"""
+        if not 1 <= number <= self.total:
+            raise IndexError(f'题号范围应在 1 到 {self.total} 之间')
+        pos = number - 1
+        # 最后一个 offset <= pos 的题型（空题型与下一题型 offset 相同，会被跳过）
+        type_idx = bisect.bisect_right(self.offsets, pos) - 1
+        return type_idx, pos - self.offsets[type_idx]
+
+
+class QuestionList(Sequence):
+    """某一题型的只读题目序列，按需从映射内存中解码"""
+
+    def __init__(self, bank: 'QuestionBank', question_type: str, first: int, count: int):
+        self._bank = bank
+        self.question_type = question_type
+        self._first = first
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('题目索引越界')
+        return self._bank.record(self._first + index)
+
+
+class QuestionBank:
+    """mmap 只读题库"""
+
+    def __init__(self, buffer, path: Optional[str] = None):
+        self._buf = buffer
+        self.path = path
+        if len(buffer) < _HEADER.size:
+            raise QuestionBankError('题库文件过短')
+        (magic, version, type_count, record_count, types_offset, records_offset,
+         str_index_offset, str_data_offset, str_count) = _HEADER.unpack_from(buffer, 0)
+        if magic != BANK_MAGIC:
+            raise QuestionBankError('不是有效的题库文件')
+        if version != BANK_VERSION:
+            raise QuestionBankError(f'题库版本不匹配: {version}')
+        self.record_count = record_count
+        self._records_offset = records_offset
+        self._str_index_offset = str_index_offset
+        self._str_data_offset = str_data_offset
+        self._str_count = str_count
+
+        self.questions = {}
+        for i in range(type_count):
+            name_sid, first, count = _TYPE_ENTRY.unpack_from(buffer, types_offset + i * _TYPE_ENTRY.size)
+            name = self.string(name_sid)
+            self.questions[name] = QuestionList(self, name, first, count)
+        self.types = tuple(self.questions)
+        self._indexes = {}
+        self._answer_masks = None
+        self.frozen = False
+        # 全局题目ID即题库中的记录下标（按题库自身的题型顺序编号）
+        self.id_index = self.index()
+
+    @classmethod
+    def open(cls, path: str) -> 'QuestionBank':
+        """以只读方式映射题库文件"""
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mm, path)
+
+    @property
+    def shared(self) -> bool:
+        """是否映射自文件（多进程共享操作系统页缓存，而不是各自持有一份）"""
+        return isinstance(self._buf, mmap.mmap)
+
+    def freeze(self, type_orders: Sequence[Sequence[str]] = ()):
+        """fork 工作进程前调用：确认数据只读，并预先构建延迟生成的缓存
+
+        答案掩码和题号索引在主进程中建好，工作进程只读不写，不会触发写时复制。
+        """
+        if not memoryview(self._buf).readonly:
+            raise QuestionBankError('题库缓冲区可写，不能在工作进程间共享')
+        self.answer_masks()
+        for type_order in type_orders:
+            self.index(type_order)
+        self.frozen = True
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+    def string(self, sid: int) -> Optional[str]:
+        if sid == NO_STRING:
+            return None
+        start, end = struct.unpack_from('<II', self._buf, self._str_index_offset + sid * _OFFSET.size)
+        base = self._str_data_offset
+        return self._buf[base + start:base + end].decode('utf-8')
+
+    def index(self, type_order: Optional[Sequence[str]] = None) -> QuestionIndex:
+        """按题型顺序获取题号索引（同一顺序只构建一次）"""
+        key = tuple(type_order) if type_order else self.types
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = QuestionIndex(self.counts(), key)
+        return index
+
+    def question_id(self, question_type: str, q_idx: int) -> int:
+        """(题型, 题内下标) -> 全局题目ID（0-based，所有前端一致）"""
+        return self.id_index.number_of(question_type, q_idx) - 1
+
+    def locate_id(self, question_id: int) -> Tuple[str, int]:
+        """全局题目ID -> (题型, 题内下标)"""
+        type_idx, q_idx = self.id_index.locate(question_id + 1)
+        return self.types[type_idx], q_idx
+
+    def record(self, record_index: int) -> Dict[str, Any]:
+        """解码第 record_index 条记录（跨题型的全局下标）"""
+        fields = _RECORD.unpack_from(self._buf, self._records_offset + record_index * _RECORD.size)
+        stem_sid = fields[0]
+        answer_mask, option_count = fields[6], fields[7]
+        return {
+            'id': record_index,
+            'type': self.locate_id(record_index)[0],
+            'text': self.string(stem_sid),
+            'options': [self.string(sid) for sid in fields[1:1 + option_count]],
+            'answer': mask_to_answer(answer_mask),
+            'answer_mask': answer_mask,
+        }
+
+    def answer_mask(self, record_index: int) -> int:
+        """只读取一条记录的答案掩码（不解码字符串）"""
+        return self._buf[self._records_offset + record_index * _RECORD.size + _MASK_OFFSET]
+
+    def answer_masks(self) -> bytes:
+        """全部记录的答案掩码（按全局题目ID排列），用于整卷批量判分"""
+        if self._answer_masks is None:
+            start = self._records_offset + _MASK_OFFSET
+            end = self._records_offset + self.record_count * _RECORD.size
+            self._answer_masks = bytes(self._buf[start:end:_RECORD.size])
+        return self._answer_masks
+
+    def counts(self) -> Dict[str, int]:
+        return {t: len(items) for t, items in self.questions.items()}
+
+
+def _is_stale(bank_path: str, base_dir: str) -> bool:
+    """源 JSON 比编译结果新时需要重新编译"""
+    bank_mtime = os.path.getmtime(bank_path)
+    for _, filename in BANK_SOURCES:
+        source = os.path.join(base_dir, filename)
+        if os.path.exists(source) and os.path.getmtime(source) > bank_mtime:
+            return True
+    return False
+
+
+def load_bank(base_dir: str = '.') -> QuestionBank:
+    """加载题库：优先映射已编译文件，缺失或过期时自动编译"""
+    bank_path = os.path.join(base_dir, BANK_FILE)
+    if os.path.exists(bank_path) and not _is_stale(bank_path, base_dir):
+        return QuestionBank.open(bank_path)
+    try:
+        data = compile_bank(base_dir, bank_path)
+    except FileNotFoundError as e:
+        raise QuestionBankError(f'题库文件未找到: {e.filename}') from e
+    except json.JSONDecodeError as e:
+        raise QuestionBankError(f'题库文件格式错误: {e}') from e
+    except OSError:
+        # 目录只读（如打包后的临时目录）时退回到内存中的编译结果
+        return QuestionBank(compile_questions(read_sources(base_dir)))
+    return QuestionBank.open(bank_path)
+
+
+def main():
+    """编译题库文件"""
+    base_dir = sys.argv[1] if len(sys.argv) > 1 else '.'
+    output = os.path.join(base_dir, BANK_FILE)
+    data = compile_bank(base_dir, output)
+    bank = QuestionBank(data)
+    counts = bank.counts()
+    source_size = sum(os.path.getsize(os.path.join(base_dir, f)) for _, f in BANK_SOURCES)
+    print(f"题库编译完成: {output}")
+    print(' | '.join(f"{t}: {n}道" for t, n in counts.items()) + f" | 总计: {sum(counts.values())}道")
+    print(f"JSON 源文件 {source_size} 字节 -> 编译结果 {len(data)} 字节")
+
+
+if __name__ == '__main__':
+    main()
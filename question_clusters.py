@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+近似重复题目检测（题库、各版本题库表格、模拟试卷）
+同一道题常在题库的不同版本和几套模拟试卷中反复出现，措辞略有差异。每道题的题干取字符三元组集合，
+用 MinHash 压缩成 NUM_PERM 个整数的签名，再按 LSH 分成 BANDS 段：任意一段完全相同的题才成为候选对，
+候选对按三元组集合的 Jaccard 相似度复核，题型相同且相似度不低于阈值的并入同一簇（并查集）。
+候选对只在同一个桶内产生，题目增多时耗时近似线性增长，不需要两两比较。
+
+每道题用 (来源, 题目ID) 标识，与作答记录一致：题库题目的来源为 None（全局题目ID），
+模拟试卷为 paper:N，题库表格为文件名（表格内按题型顺序编号）。结果写入 question_clusters.json，
+--stats 按簇合并某个学习者的作答统计（同一道题在题库和试卷中的作答合并计算）。
+簇内题干规范化后不同的题标为不同的 variant，措辞接近但意思相反的题（“属于”/“不属于”）需要人工确认。
+
+用法:
+    python question_clusters.py [额外的题库表格...] [--threshold 0.7] [--output question_clusters.json]
+    python question_clusters.py --stats 学习者ID
+可选: pip install numpy（签名计算向量化，未安装时使用纯 Python，结果相同）
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖
+    np = None
+
+from answer_log import ANSWER_DB, connect
+from ingest_bank import IngestError, read_bank
+from mock_papers import PaperLibrary
+from question_bank import BANK_SOURCES, load_bank
+from question_search import normalize
+
+CLUSTERS_FILE = 'question_clusters.json'
+BANK_PATTERNS = ('*.xls', '*.xlsx')
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+BANDS = 16                # 每段 NUM_PERM // BANDS 行；相似度约 0.5 以上的题大概率成为候选
+DEFAULT_THRESHOLD = 0.7
+_MASK64 = (1 << 64) - 1
+
+
+class Item(NamedTuple):
+    """参与检测的一道题"""
+    source: Optional[str]
+    question_id: int
+    question_type: str
+    text: str
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """规范化题干的字符 size 元组，哈希为 32 位整数"""
+    text = normalize(text)
+    if len(text) <= size:
+        grams = {text} if text else set()
+    else:
+        grams = {text[i:i + size] for i in range(len(text) - size + 1)}
+    return {int.from_bytes(hashlib.blake2b(g.encode('utf-8'), digest_size=4).digest(), 'little') for g in grams}
+
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """NUM_PERM 个乘移位哈希 h(x) = ((a * x + b) mod 2^64) >> 32，签名为每个哈希在集合上的最小值"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = random.Random(seed)
+        self.a = [rng.getrandbits(64) | 1 for _ in range(num_perm)]
+        self.b = [rng.getrandbits(64) for _ in range(num_perm)]
+        if np is not None:
+            self._a = np.array(self.a, dtype=np.uint64)[:, None]
+            self._b = np.array(self.b, dtype=np.uint64)[:, None]
+
+    def signature(self, values: Set[int]) -> Tuple[int, ...]:
+        if not values:
+            return (0,) * len(self.a)
+        if np is not None:
+            x = np.fromiter(values, dtype=np.uint64, count=len(values))
+            return tuple(((self._a * x + self._b) >> np.uint64(32)).min(axis=1).tolist())
+        return tuple(min(((a * x + b) & _MASK64) >> 32 for x in values) for a, b in zip(self.a, self.b))
+
+
+class _DisjointSet:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        i, j = self.find(i), self.find(j)
+        if i != j:
+            self.parent[max(i, j)] = min(i, j)
+
+
+def find_clusters(items: Sequence[Item], threshold: float = DEFAULT_THRESHOLD,
+                  num_perm: int = NUM_PERM, bands: int = BANDS) -> Tuple[List[List[int]], Dict[str, Any]]:
+    """近似重复的题目簇（每簇为 items 下标列表，至少两道题，按簇大小排序）和检测统计"""
+    started = time.perf_counter()
+    # 题型和规范化题干完全相同的题先合并为一个节点，重复出现的次数不影响后续的比较次数
+    nodes = {}
+    owner = [nodes.setdefault((item.question_type, normalize(item.text)), len(nodes)) for item in items]
+    keys = list(nodes)
+
+    hasher = MinHasher(num_perm)
+    rows = num_perm // bands
+    sets = [shingles(text) for _, text in keys]
+    buckets = {}
+    for i, values in enumerate(sets):
+        if not values:
+            continue
+        signature = hasher.signature(values)
+        for band in range(bands):
+            key = (band, signature[band * rows:(band + 1) * rows])
+            buckets.setdefault(key, []).append(i)
+
+    clusters = _DisjointSet(len(keys))
+    candidates = verified = 0
+    for members in buckets.values():
+        for pos, i in enumerate(members[1:], start=1):
+            for j in members[:pos]:
+                if clusters.find(i) == clusters.find(j):
+                    continue
+                candidates += 1
+                if keys[i][0] == keys[j][0] and jaccard(sets[i], sets[j]) >= threshold:
+                    clusters.union(i, j)
+                    verified += 1
+
+    groups = {}
+    for i, node in enumerate(owner):
+        groups.setdefault(clusters.find(node), []).append(i)
+    result = sorted((g for g in groups.values() if len(g) > 1), key=lambda g: (-len(g), g[0]))
+    info = {
+        'items': len(items),
+        'distinct_stems': len(keys),
+        'buckets': len(buckets),
+        'candidate_pairs': candidates,
+        'merged_pairs': verified,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+    return result, info
+
+
+def collect_items(base_dir: str = '.', tables: Iterable[str] = ()) -> List[Item]:
+    """题库（JSON 编译后的题库）、目录下的题库表格和额外指定的表格、全部模拟试卷"""
+    items = []
+    bank = load_bank(base_dir)
+    for question_type in bank.types:
+        for q_idx, question in enumerate(bank.questions[question_type]):
+            items.append(Item(None, bank.question_id(question_type, q_idx), question_type, question['text']))
+
+    paths = sorted({p for pattern in BANK_PATTERNS for p in glob.glob(os.path.join(base_dir, pattern))})
+    for path in paths + [p for p in tables if p not in paths]:
+        try:
+            questions, _ = read_bank(path)
+        except ImportError as e:
+            print(f'跳过 {path}: 缺少依赖 {e.name}（pip install openpyxl xlrd）')
+            continue
+        except (OSError, IngestError) as e:
+            print(f'跳过 {path}: {e}')
+            continue
+        question_id = 0
+        for question_type, _ in BANK_SOURCES:
+            for question in questions[question_type]:
+                items.append(Item(os.path.basename(path), question_id, question_type, question['text']))
+                question_id += 1
+
+    for paper in PaperLibrary(base_dir).papers.values():
+        for question_type in paper.bank.types:
+            for q_idx, question in enumerate(paper.bank.questions[question_type]):
+                items.append(Item(f'paper:{paper.id}', paper.bank.question_id(question_type, q_idx),
+                                  question_type, question['text']))
+    return items
+
+
+def save_clusters(path: str, items: Sequence[Item], clusters: List[List[int]], info: Dict[str, Any],
+                  threshold: float):
+    def members(indexes):
+        # 同一簇内题干规范化后相同的为同一 variant
+        variants = {}
+        return [dict(items[i]._asdict(), variant=variants.setdefault(normalize(items[i].text), len(variants)))
+                for i in indexes]
+
+    data = {
+        'threshold': threshold,
+        'num_perm': NUM_PERM,
+        'bands': BANDS,
+        'info': info,
+        'clusters': [{'cluster': n, 'members': members(indexes)} for n, indexes in enumerate(clusters)],
+    }
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def load_cluster_map(path: str = CLUSTERS_FILE) -> Dict[Tuple[Optional[str], int], int]:
+    """(来源, 题目ID) -> 簇编号"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {(m['source'], m['question_id']): c['cluster'] for c in data['clusters'] for m in c['members']}
+
+
+def merge_stats(conn, learner: str, cluster_map: Dict[Tuple[Optional[str], int], int]) -> List[Dict[str, Any]]:
+    """按簇合并学习者的作答记录：同一簇中各来源的作答一起统计（只列出有作答的簇）"""
+    totals = {}
+    for source, question_id, correct in conn.execute(
+            'SELECT source, question_id, correct FROM answers WHERE learner = ?', (learner,)):
+        cluster = cluster_map.get((source, question_id))
+        if cluster is None:
+            continue
+        entry = totals.setdefault(cluster, {'cluster': cluster, 'answered': 0, 'correct': 0, 'sources': set()})
+        entry['answered'] += 1
+        entry['correct'] += correct
+        entry['sources'].add(source or '题库')
+    result = []
+    for entry in sorted(totals.values(), key=lambda e: (-e['answered'], e['cluster'])):
+        entry['accuracy'] = round(entry['correct'] / entry['answered'] * 100, 1)
+        entry['sources'] = sorted(entry['sources'])
+        result.append(entry)
+    return result
+
+
+def _show_stats(learner: str, clusters_path: str):
+    if not os.path.exists(clusters_path):
+        print(f'没有题目簇文件: {clusters_path}（先运行 python question_clusters.py）')
+        sys.exit(1)
+    path = os.environ.get('EXAM_ANSWER_DB', ANSWER_DB)
+    if not os.path.exists(path):
+        print(f'没有作答记录: {path}')
+        sys.exit(1)
+    merged = merge_stats(connect(path), learner, load_cluster_map(clusters_path))
+    print(f'学习者 {learner}: {len(merged)} 个重复题目簇有作答')
+    for entry in merged[:30]:
+        print(f"  簇 {entry['cluster']}: 作答 {entry['answered']} 次，正确率 {entry['accuracy']}%"
+              f"（{', '.join(entry['sources'])}）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='近似重复题目检测')
+    parser.add_argument('tables', nargs='*', help='额外的题库表格（目录下的 .xls/.xlsx 总会参与）')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Jaccard 相似度阈值')
+    parser.add_argument('--output', default=CLUSTERS_FILE, help='结果文件')
+    parser.add_argument('--stats', metavar='学习者ID', help='按簇合并该学习者的作答统计')
+    args = parser.parse_args()
+    if args.stats:
+        _show_stats(args.stats, args.output)
+        return
+
+    items = collect_items('.', args.tables)
+    clusters, info = find_clusters(items, args.threshold)
+    save_clusters(args.output, items, clusters, info, args.threshold)
+
+    sources = {}
+    for item in items:
+        sources[item.source or '题库'] = sources.get(item.source or '题库', 0) + 1
+    print(f"共 {len(items)} 道题：" + '，'.join(f'{name} {n}' for name, n in sources.items()))
+    variants = [c for c in clusters if len({normalize(items[i].text) for i in c}) > 1]
+    print(f"找到 {len(clusters)} 个重复题目簇（{sum(len(c) for c in clusters)} 道题），其中 {len(variants)} 个措辞不同（请人工确认）；"
+          f"候选对 {info['candidate_pairs']}，耗时 {info['elapsed_ms']} ms，已写入 {args.output}")
+    for members in variants[:10]:
+        print(f'- {len(members)} 道:')
+        shown = set()
+        for i in members:
+            item = items[i]
+            if normalize(item.text) in shown:
+                continue
+            shown.add(normalize(item.text))
+            print(f"    [{item.source or '题库'} #{item.question_id}] {item.text[:60]}")
+
+
+if __name__ == '__main__':
+    main()
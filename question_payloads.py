@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+题目响应预渲染缓存
+题库是静态的，每道题对外公开的 JSON（全局题目ID、题型、题干、选项、答案）在加载时序列化一次，
+接口直接返回缓存的字节，只拼接与会话相关的字段（题号、总题数等），并附带强 ETag，
+客户端重复请求同一内容时返回 304。
+
+JSON 直接输出 UTF-8（中文每字 3 字节，不再转义为 6 字节的 \\uXXXX）；静态部分同时预压缩为 deflate 片段，
+单题响应在客户端接受 gzip 时只压缩会话字段并拼接（见 compression.gzip_join）。
+一页多题时各片段互相独立、压缩率差，整体实时压缩（python bench_compression.py 对比两种方式）。
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from flask import Response, request
+
+from compression import ENCODINGS, MIN_SIZE, Deflated, choose_encoding, compress, gzip_join
+from question_bank import format_options
+
+# 题目响应优先使用可拼接预压缩片段的 gzip，br 只能实时压缩
+PAYLOAD_ENCODINGS = ('gzip', 'br') if 'br' in ENCODINGS else ('gzip',)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _page_header(fields: Dict[str, Any]) -> str:
+    return ''.join(f',{_dumps(key)}:{_dumps(value)}' for key, value in fields.items())
+
+
+def encode(parts: Sequence[Any], encoding: str) -> bytes:
+    """按编码输出由预压缩片段（Deflated）和原文片段组成的响应体"""
+    if encoding == 'gzip':
+        return gzip_join(parts)
+    body = b''.join(part.raw if isinstance(part, Deflated) else part for part in parts)
+    return compress(body, encoding)
+
+
+class QuestionPayloadCache:
+    """按 (题型, 题目下标) 缓存预序列化（并预压缩）的响应体
+
+    id_prefix 不为 None 时 question_id 输出为带前缀的字符串（如模拟试卷的 "paper:1/0"），
+    与题库的全局题目ID区分，不会被 /submit_answers 等按全局ID判分的接口误用。
+    """
+
+    def __init__(self, questions: Dict[str, Sequence[Dict[str, Any]]], id_prefix: Optional[str] = None):
+        self._bodies = {}
+        self._digests = {}
+        for question_type, items in questions.items():
+            bodies = []
+            digests = []
+            for question in items:
+                body = self.render_static(question_type, question, id_prefix)
+                bodies.append(Deflated(body))
+                digests.append(hashlib.blake2b(body, digest_size=8).hexdigest())
+            self._bodies[question_type] = bodies
+            self._digests[question_type] = digests
+
+    @staticmethod
+    def render_static(question_type: str, question: Dict[str, Any], id_prefix: Optional[str] = None) -> bytes:
+        """序列化题目的静态部分（不含结尾的右花括号，便于拼接会话字段）"""
+        payload = {
+            'status': 'success',
+            'question_id': question['id'] if id_prefix is None else f"{id_prefix}{question['id']}",
+            'question_type': question_type,
+            'question_text': question['text'],
+            'options': format_options(question),
+            'correct_answer': question['answer'],
+        }
+        return _dumps(payload)[:-1].encode('utf-8')
+
+    def _parts(self, question_type: str, q_idx: int, **fields) -> List[Any]:
+        tail = ''.join(f',{_dumps(key)}:{_dumps(value)}' for key, value in fields.items())
+        return [self._bodies[question_type][q_idx], tail.encode('utf-8') + b'}']
+
+    def _page_parts(self, items: Sequence[Tuple[str, int, Dict[str, Any]]], header: str) -> List[Any]:
+        parts = [b'{"status":"success"' + header.encode('utf-8') + b',"questions":[']
+        for n, (t, i, f) in enumerate(items):
+            if n:
+                parts.append(b',')
+            parts.extend(self._parts(t, i, **f))
+        parts.append(b']}')
+        return parts
+
+    def body(self, question_type: str, q_idx: int, **fields) -> bytes:
+        """拼接会话字段，生成完整响应体（未压缩）"""
+        return encode(self._parts(question_type, q_idx, **fields), 'identity')
+
+    def encoded_body(self, question_type: str, q_idx: int, encoding: str, **fields) -> bytes:
+        return encode(self._parts(question_type, q_idx, **fields), encoding)
+
+    def negotiate(self, accept_encoding: Optional[str], items: Sequence[Tuple[str, int, Any]],
+                  available: Sequence[str] = PAYLOAD_ENCODINGS) -> str:
+        """选择响应编码：静态部分合计小于 MIN_SIZE 时不压缩"""
+        size = sum(len(self._bodies[t][i].raw) for t, i, _ in items)
+        if size < MIN_SIZE:
+            return 'identity'
+        return choose_encoding(accept_encoding, available)
+
+    def etag(self, question_type: str, q_idx: int, **fields) -> str:
+        """强 ETag：静态部分摘要 + 会话字段（未压缩的表示）"""
+        suffix = '-'.join(str(value) for value in fields.values())
+        digest = self._digests[question_type][q_idx]
+        return f'{digest}-{suffix}' if suffix else digest
+
+    def response(self, question_type: str, q_idx: int, **fields) -> Response:
+        """返回题目响应；If-None-Match 命中时返回 304"""
+        encoding = self.negotiate(request.headers.get('Accept-Encoding'), [(question_type, q_idx, fields)])
+        etag = encoded_etag(self.etag(question_type, q_idx, **fields), encoding)
+        return _conditional_response(etag, encoding,
+                                     lambda: self.encoded_body(question_type, q_idx, encoding, **fields))
+
+    def page_etag(self, items: Sequence[Tuple[str, int, Dict[str, Any]]], **fields) -> str:
+        """一页的强 ETag，由各题 ETag 和页字段组合而成"""
+        etags = [self.etag(t, i, **f) for t, i, f in items]
+        etags.append(_page_header(fields))
+        return hashlib.blake2b('|'.join(etags).encode('utf-8'), digest_size=12).hexdigest()
+
+    def page_body(self, items: Sequence[Tuple[str, int, Dict[str, Any]]], encoding: str, **fields) -> bytes:
+        """一页的响应体（各片段互相独立，整体实时压缩）"""
+        return compress(encode(self._page_parts(items, _page_header(fields)), 'identity'), encoding)
+
+    def page_response(self, items: Sequence[Tuple[str, int, Dict[str, Any]]], **fields) -> Response:
+        """返回一页题目 {"status", 页字段..., "questions": [...]}
+
+        items 为 (题型, 题目下标, 该题的会话字段) 列表。
+        """
+        encoding = self.negotiate(request.headers.get('Accept-Encoding'), items, ENCODINGS)
+        return _conditional_response(encoded_etag(self.page_etag(items, **fields), encoding), encoding,
+                                     lambda: self.page_body(items, encoding, **fields))
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """每种编码是不同的表示，强 ETag 各不相同"""
+    return etag if encoding == 'identity' else f'{etag}-{encoding}'
+
+
+def _conditional_response(etag: str, encoding: str, render) -> Response:
+    """带强 ETag 的 JSON 响应，GET/HEAD 请求命中 If-None-Match 时返回 304（不渲染响应体）"""
+    if request.method in ('GET', 'HEAD') and request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(render(), mimetype='application/json')
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
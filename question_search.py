@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+题库全文搜索（Web 版和 GUI 共用）
+对题干和选项建立字符二元组（bigram）倒排索引，不需要中文分词：
+“决策树”拆成“决策”“策树”，两个倒排表求交集即为候选题，再按匹配程度排序。
+索引在加载题库时构建（480 道题约 50 毫秒），单次查询通常在 1 毫秒以内。
+
+用法: python question_search.py 决策树
+"""
+
+import sys
+import time
+import unicodedata
+from array import array
+from typing import Any, Dict, List, Tuple
+
+from question_bank import load_bank
+
+MAX_RESULTS = 20
+SNIPPET_RADIUS = 20
+
+
+def normalize(text: str) -> str:
+    """全角转半角、英文小写，去掉空白和标点（只保留文字和数字）"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return ''.join(ch for ch in text if ch.isalnum())
+
+
+def grams(text: str) -> List[str]:
+    """规范化文本的二元组（单字时为该字本身）"""
+    if len(text) < 2:
+        return [text] if text else []
+    return [text[i:i + 2] for i in range(len(text) - 1)]
+
+
+class SearchIndex:
+    """题库的倒排索引：二元组/单字 -> 题目ID有序数组"""
+
+    def __init__(self, bank):
+        started = time.perf_counter()
+        self.bank = bank
+        self._stems = []     # 规范化后的题干
+        self._options = []   # 规范化后的选项（拼接）
+        postings = {}
+        for question_type in bank.types:
+            for q_idx, question in enumerate(bank.questions[question_type]):
+                question_id = bank.question_id(question_type, q_idx)
+                stem = normalize(question['text'])
+                options = normalize(''.join(question.get('options') or []))
+                self._stems.append(stem)
+                self._options.append(options)
+                keys = set(stem) | set(options) | set(grams(stem)) | set(grams(options))
+                for key in keys:
+                    postings.setdefault(key, []).append(question_id)
+        self._postings = {key: array('I', sorted(ids)) for key, ids in postings.items()}
+        self.build_ms = (time.perf_counter() - started) * 1000
+
+    def __len__(self):
+        return len(self._postings)
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> List[Dict[str, Any]]:
+        """按匹配程度排序的命中结果
+
+        先要求包含全部二元组；一个都没有时退回到按命中二元组数排序（容忍错别字）
+        """
+        text = normalize(query)
+        keys = list(dict.fromkeys(grams(text)))
+        if not keys:
+            return []
+        lists = sorted((self._postings.get(key, ()) for key in keys), key=len)
+        if lists[0]:
+            candidates = set(lists[0])
+            for ids in lists[1:]:
+                candidates.intersection_update(ids)
+                if not candidates:
+                    break
+        else:
+            candidates = set()
+        if candidates:
+            matched = dict.fromkeys(candidates, len(keys))
+        else:
+            matched = {}
+            for ids in lists:
+                for question_id in ids:
+                    matched[question_id] = matched.get(question_id, 0) + 1
+            # 至少命中一半的二元组
+            threshold = max(1, (len(keys) + 1) // 2)
+            matched = {qid: n for qid, n in matched.items() if n >= threshold}
+
+        ranked = sorted(matched.items(), key=lambda item: self._rank(item[0], item[1], text))
+        return [self._hit(question_id, hits, len(keys), text) for question_id, hits in ranked[:limit]]
+
+    def _rank(self, question_id: int, hits: int, text: str) -> Tuple:
+        stem = self._stems[question_id]
+        # 命中多的在前；题干中完整出现的优先于只在选项中出现的；位置越靠前、题干越短越好
+        position = stem.find(text)
+        return (-hits, position < 0, text not in self._options[question_id],
+                position if position >= 0 else len(stem), len(stem), question_id)
+
+    def _hit(self, question_id: int, hits: int, total: int, text: str) -> Dict[str, Any]:
+        question_type, q_idx = self.bank.locate_id(question_id)
+        question = self.bank.questions[question_type][q_idx]
+        return {
+            'question_id': question_id,
+            'question_type': question_type,
+            'snippet': snippet(question['text'], text),
+            'in_options': text not in self._stems[question_id] and text in self._options[question_id],
+            'score': round(hits / total, 3),
+        }
+
+
+def snippet(raw: str, text: str, radius: int = SNIPPET_RADIUS) -> str:
+    """题干中命中位置附近的片段（找不到时取开头）"""
+    raw = raw or ''
+    position = raw.lower().find(text[:2]) if text else -1
+    if position < 0:
+        return raw[:radius * 2] + ('…' if len(raw) > radius * 2 else '')
+    start = max(0, position - radius)
+    end = min(len(raw), position + len(text) + radius)
+    return ('…' if start else '') + raw[start:end] + ('…' if end < len(raw) else '')
+
+
+def main():
+    if len(sys.argv) < 2:
+        print('用法: python question_search.py 关键词')
+        sys.exit(1)
+    index = SearchIndex(load_bank())
+    query = ' '.join(sys.argv[1:])
+    started = time.perf_counter()
+    results = index.search(query)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f'索引 {len(index)} 个词条（构建 {index.build_ms:.1f} ms），'
+          f'“{query}” 命中 {len(results)} 题，用时 {elapsed:.3f} ms')
+    for hit in results:
+        print(f"  第 {hit['question_id'] + 1} 题 [{hit['question_type']}] {hit['snippet']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+无重复随机抽题（Web 版和 GUI 共用）
+按种子确定的伪随机排列遍历全部题目（全局题目ID），调用方只需保存 (种子, 游标) 两个整数：
+每道题出现的概率相同、全部出完之前不会重复，也不需要记录已出过的题。
+
+- 不加权：4 轮 Feistel 网络 + 循环游走，直接算出排列中的第 k 个元素及其逆，不生成整个排列
+- 按题型加权：Efraimidis–Spirakis 加权无放回抽样，权重大的题型排在前面的概率大；
+  每个 (种子, 权重) 生成一次排列并缓存
+"""
+
+import functools
+import random
+import secrets
+from typing import Dict, Optional, Sequence, Tuple
+
+_MASK64 = (1 << 64) - 1
+_ROUNDS = 4
+
+
+def new_seed() -> int:
+    return secrets.randbits(32)
+
+
+def _mix(value: int) -> int:
+    """splitmix64 终结函数：64 位整数 -> 均匀分布的 64 位整数"""
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+class FeistelPermutation:
+    """[0, n) 上由种子决定的伪随机排列，按下标随机访问，O(1) 内存"""
+
+    def __init__(self, n: int, seed: int):
+        self.n = n
+        # 定义域取不小于 n 的 4 的幂，超出 n 的结果继续置换（循环游走），平均不超过 4 次
+        self.half_bits = max(1, ((max(n, 2) - 1).bit_length() + 1) // 2)
+        self.half_mask = (1 << self.half_bits) - 1
+        self.keys = [_mix((seed << 8 | r) & _MASK64) for r in range(_ROUNDS)]
+
+    def __len__(self):
+        return self.n
+
+    def _round(self, key: int, half: int) -> int:
+        return _mix(key ^ half) & self.half_mask
+
+    def _encrypt(self, x: int) -> int:
+        left, right = x >> self.half_bits, x & self.half_mask
+        for key in self.keys:
+            left, right = right, left ^ self._round(key, right)
+        return left << self.half_bits | right
+
+    def _decrypt(self, y: int) -> int:
+        left, right = y >> self.half_bits, y & self.half_mask
+        for key in reversed(self.keys):
+            left, right = right ^ self._round(key, left), left
+        return left << self.half_bits | right
+
+    def __getitem__(self, cursor: int) -> int:
+        if not 0 <= cursor < self.n:
+            raise IndexError(cursor)
+        value = self._encrypt(cursor)
+        while value >= self.n:
+            value = self._encrypt(value)
+        return value
+
+    def position(self, value: int) -> int:
+        """元素 -> 在排列中的下标"""
+        if not 0 <= value < self.n:
+            raise IndexError(value)
+        cursor = self._decrypt(value)
+        while cursor >= self.n:
+            cursor = self._decrypt(cursor)
+        return cursor
+
+
+class WeightedPermutation:
+    """按题型加权的随机排列：每道题的排序键为 u ** (1 / 权重)，按键从大到小排列"""
+
+    def __init__(self, counts: Sequence[Tuple[str, int]], seed: int, weights: Dict[str, float]):
+        rng = random.Random(seed)
+        keys = []
+        for question_type, count in counts:
+            exponent = 1.0 / weights.get(question_type, 1.0)
+            keys.extend(rng.random() ** exponent for _ in range(count))
+        self.order = sorted(range(len(keys)), key=keys.__getitem__, reverse=True)
+        self.positions = {qid: pos for pos, qid in enumerate(self.order)}
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, cursor: int) -> int:
+        return self.order[cursor]
+
+    def position(self, value: int) -> int:
+        return self.positions[value]
+
+
+def normalize_weights(weights, types: Sequence[str]) -> Optional[Tuple[Tuple[str, float], ...]]:
+    """校验题型权重 {"judgment": 2, ...}（未列出的题型权重为 1），全部相同时返回 None（不加权）
+
+    权重无效时抛出 ValueError
+    """
+    if not weights:
+        return None
+    if not isinstance(weights, dict) or any(t not in types for t in weights):
+        raise ValueError(f'题型权重无效: {weights}')
+    normalized = []
+    for question_type in types:
+        weight = weights.get(question_type, 1)
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not 0 < weight < 1e6:
+            raise ValueError(f'题型权重应为正数: {question_type}={weight}')
+        normalized.append((question_type, float(weight)))
+    if len({w for _, w in normalized}) == 1:
+        return None
+    return tuple(normalized)
+
+
+@functools.lru_cache(maxsize=64)
+def _weighted(counts: Tuple[Tuple[str, int], ...], seed: int, weights: Tuple[Tuple[str, float], ...]):
+    return WeightedPermutation(counts, seed, dict(weights))
+
+
+def permutation(counts: Dict[str, int], seed: int, weights=None):
+    """全部题目（按全局题目ID，即 counts 的题型顺序编号）的随机排列
+
+    weights 为 normalize_weights 的结果，None 表示不加权
+    """
+    if weights:
+        return _weighted(tuple(counts.items()), seed, tuple(weights))
+    return FeistelPermutation(sum(counts.values()), seed)
+
+
+class PermutationSampler:
+    """本地使用的抽题器（GUI）：保存 (种子, 游标)，出完一轮后换种子重新开始"""
+
+    def __init__(self, counts: Dict[str, int], weights=None, seed: Optional[int] = None):
+        self.counts = dict(counts)
+        self.weights = weights
+        self.reset(seed)
+
+    def reset(self, seed: Optional[int] = None):
+        self.seed = new_seed() if seed is None else seed
+        self.cursor = 0
+        self.order = permutation(self.counts, self.seed, self.weights)
+
+    def next_id(self) -> Optional[int]:
+        """下一道题的全局题目ID；题库为空时返回 None"""
+        if not len(self.order):
+            return None
+        if self.cursor >= len(self.order):
+            self.reset()
+        question_id = self.order[self.cursor]
+        self.cursor += 1
+        return question_id
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Web 版生产部署启动器（预加载 + 多进程）
+主进程加载题库（mmap 只读映射）并检查题库已冻结，然后 fork 出 N 个工作进程，
+每个工作进程用固定大小的线程池处理请求，题库页面由所有进程共享（写时复制不会发生）。
+
+- 会话：多进程时各进程不共享内存，默认改用 SQLite 会话存储（EXAM_SESSION_BACKEND=sqlite）
+- kill -HUP <主进程>  平滑重启：重新加载题库，启动新一批工作进程后让旧进程处理完手头请求再退出；
+  新题库加载失败时保留原题库，现有工作进程继续服务
+- kill -TERM <主进程> 平滑停止
+- 工作进程异常退出时自动补齐
+- Windows 不支持 fork，退化为单进程多线程
+
+用法:
+    python serve_prod.py --app v2 --workers 4 --threads 8 --port 5000
+"""
+
+import argparse
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from question_bank import QuestionBankError
+
+APPS = {
+    'random': 'web_exam_system',
+    'v2': 'web_exam_system_v2',
+}
+GRACEFUL_TIMEOUT = 30  # 平滑停止时等待工作进程处理完请求的秒数
+
+
+class PooledRequestHandler(WSGIRequestHandler):
+    # 每个连接只处理一个请求：空闲的长连接不会占住线程池中的线程
+    protocol_version = 'HTTP/1.0'
+
+    def log_request(self, *args, **kwargs):
+        # 生产模式不输出逐请求访问日志
+        pass
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """固定线程数的 WSGI 服务器"""
+
+    multithread = True
+
+    def __init__(self, host, port, app, threads, fd=None):
+        super().__init__(host, port, app, handler=PooledRequestHandler, fd=fd)
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='exam-worker')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def drain(self):
+        """等待线程池中的请求处理完毕后关闭套接字"""
+        self.pool.shutdown(wait=True)
+        self.server_close()
+
+
+def load_app(name: str):
+    """导入 Web 应用（模块导入时加载题库）并冻结题库"""
+    module = importlib.import_module(APPS[name])
+    freeze_bank(module)
+    return module
+
+
+def flush_answer_log(module):
+    """退出前写完队列中的作答记录（工作进程用 os._exit 退出，不会执行 atexit）"""
+    answer_log = getattr(module.exam_system, 'answer_log', None)
+    if answer_log is not None:
+        answer_log.close()
+
+
+def freeze_bank(module):
+    """启动检查：题库必须是只读共享映射，延迟生成的缓存在 fork 前建好"""
+    bank = getattr(module.exam_system, 'bank', None)
+    if bank is None:
+        raise SystemExit('题库加载失败，无法启动')
+    type_orders = [getattr(module, 'DEFAULT_TYPE_ORDER', bank.types)]
+    bank.freeze(type_orders)
+    if not bank.shared:
+        print('⚠️ 题库未映射自文件（目录不可写？），各工作进程将通过写时复制共享内存中的副本')
+    # 把已加载的对象移出垃圾回收跟踪，避免 GC 扫描时修改引用计数导致页面被复制
+    if hasattr(gc, 'freeze'):
+        gc.collect()
+        gc.freeze()
+
+
+class PreforkServer:
+    """主进程：持有监听套接字，管理工作进程"""
+
+    def __init__(self, module, host: str, port: int, workers: int, threads: int):
+        self.module = module
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threads = threads
+        self.children = {}     # pid -> 代数
+        self.generation = 0
+        self.stopping = False
+        self.reloading = False
+
+    def run(self):
+        self.sock = socket.create_server((self.host, self.port), backlog=2048)
+        self.sock.set_inheritable(True)
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+        print(f'主进程 {os.getpid()}：{self.workers} 个工作进程 × {self.threads} 线程，'
+              f'监听 http://{self.host}:{self.port}')
+        self.spawn_generation()
+        while not self.stopping:
+            if self.reloading:
+                self.reloading = False
+                self.reload()
+            self.reap()
+            live = sum(1 for g in self.children.values() if g == self.generation)
+            for _ in range(self.workers - live):
+                self.spawn_worker()
+            time.sleep(0.5)
+        self.stop_workers(list(self.children))
+        self.sock.close()
+        print('服务器已停止')
+
+    def _on_stop(self, signum, frame):
+        self.stopping = True
+
+    def _on_reload(self, signum, frame):
+        self.reloading = True
+
+    def spawn_generation(self):
+        self.generation += 1
+        for _ in range(self.workers):
+            self.spawn_worker()
+
+    def spawn_worker(self):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = self.generation
+            return
+        # 子进程
+        code = 0
+        try:
+            self.worker_main()
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)
+
+    def worker_main(self):
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        server = PooledWSGIServer(self.host, self.port, self.module.app, self.threads, fd=self.sock.fileno())
+
+        def on_term(signum, frame):
+            # shutdown 会等待 serve_forever 退出，必须在其他线程中调用
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, on_term)
+        server.serve_forever()
+        server.drain()
+        flush_answer_log(self.module)
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            generation = self.children.pop(pid, None)
+            if generation == self.generation and not self.stopping:
+                print(f'工作进程 {pid} 意外退出（状态 {status}），重新启动')
+
+    def reload(self):
+        """平滑重启：重新加载题库，新一批工作进程就绪后停止旧进程"""
+        print('重新加载题库...')
+        if hasattr(gc, 'unfreeze'):
+            gc.unfreeze()
+        try:
+            self.module.exam_system.load_questions()
+        except QuestionBankError as e:
+            # 新题库有问题时保留原题库，现有工作进程继续服务
+            print(f'❌ 重新加载题库失败，继续使用原题库: {e}')
+            if hasattr(gc, 'freeze'):
+                gc.freeze()
+            return
+        freeze_bank(self.module)
+        old = list(self.children)
+        self.spawn_generation()
+        self.stop_workers(old)
+        print(f'已切换到第 {self.generation} 代工作进程')
+
+    def stop_workers(self, pids):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT
+        while any(pid in self.children for pid in pids) and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in pids:
+            if pid in self.children:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+        self.reap()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Web 版生产部署（预加载题库 + 多进程）')
+    parser.add_argument('--app', choices=sorted(APPS), default='v2', help='random: 随机出题；v2: 固定顺序')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='工作进程数')
+    parser.add_argument('--threads', type=int, default=8, help='每个工作进程的线程数')
+    args = parser.parse_args()
+
+    can_fork = hasattr(os, 'fork')
+    if args.workers > 1 and can_fork:
+        backend = os.environ.setdefault('EXAM_SESSION_BACKEND', 'sqlite')
+        if backend != 'sqlite':
+            print(f'多进程部署需要共享会话存储，EXAM_SESSION_BACKEND={backend} 不可用（请使用 sqlite）')
+            sys.exit(1)
+
+    module = load_app(args.app)
+    if args.workers > 1 and can_fork:
+        PreforkServer(module, args.host, args.port, args.workers, args.threads).run()
+        return
+
+    if args.workers > 1:
+        print('当前平台不支持 fork，以单进程多线程方式运行')
+    server = PooledWSGIServer(args.host, args.port, module.app, args.threads)
+    print(f'单进程 × {args.threads} 线程，监听 http://{args.host}:{args.port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.drain()
+        flush_answer_log(module)
+
+
+if __name__ == '__main__':
+    main()
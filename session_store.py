@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+服务端会话存储
+浏览器 Cookie 中只保存一个随机会话ID，会话数据（题型、题目下标、计数等整数）保存在服务端。
+提供两种后端：
+- memory : 进程内 LRU + TTL，适合单机单进程
+- sqlite : SQLite 持久化，重启后会话仍然有效，可被多个进程共享
+"""
+
+import itertools
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+import metrics
+
+DEFAULT_TTL = 2 * 60 * 60  # 会话有效期（秒）
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class MemorySessionStore:
+    """进程内 LRU 会话存储（带过期时间）"""
+
+    # 保存时本不需要序列化：会话大小指标每保存这么多次才序列化统计一次
+    SIZE_SAMPLE_INTERVAL = 64
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: int = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._saves = itertools.count()
+
+    def get(self, sid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._data.get(sid)
+            if entry is None:
+                return None
+            expires, data = entry
+            if expires < time.time():
+                del self._data[sid]
+                return None
+            self._data.move_to_end(sid)
+            return dict(data)
+
+    def save(self, sid: str, data: Dict[str, Any]):
+        if next(self._saves) % self.SIZE_SAMPLE_INTERVAL == 0:
+            metrics.SESSION_BYTES.observe(len(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')))
+        with self._lock:
+            self._data[sid] = (time.time() + self.ttl, dict(data))
+            self._data.move_to_end(sid)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, sid: str):
+        with self._lock:
+            self._data.pop(sid, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteSessionStore:
+    """SQLite 持久化会话存储"""
+
+    PURGE_INTERVAL = 500  # 每保存多少次清理一次过期会话
+
+    def __init__(self, path: str = 'sessions.db', ttl: int = DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._saves = 0
+        self._connect()
+
+    def _connect(self):
+        # 连接属于创建它的进程；多进程部署时 fork 出的工作进程各自重新连接
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS sessions ('
+            'sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)')
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            self._connect()
+
+    def get(self, sid: str) -> Optional[Dict[str, Any]]:
+        self._check_pid()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data, expires FROM sessions WHERE sid = ?', (sid,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def save(self, sid: str, data: Dict[str, Any]):
+        payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        metrics.SESSION_BYTES.observe(len(payload.encode('utf-8')))
+        now = time.time()
+        self._check_pid()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO sessions (sid, data, expires) VALUES (?, ?, ?)',
+                (sid, payload, now + self.ttl))
+            self._saves += 1
+            if self._saves % self.PURGE_INTERVAL == 0:
+                self._conn.execute('DELETE FROM sessions WHERE expires < ?', (now,))
+
+    def delete(self, sid: str):
+        self._check_pid()
+        with self._lock:
+            self._conn.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+    def __len__(self):
+        self._check_pid()
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """只在服务端保存数据的会话对象"""
+
+    def __init__(self, initial=None, sid: Optional[str] = None, new: bool = False):
+        def on_update(self):
+            self.modified = True
+            self.accessed = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.accessed = False
+
+    def __getitem__(self, key):
+        self.accessed = True
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.accessed = True
+        return super().get(key, default)
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask 会话接口：Cookie 只携带会话ID"""
+
+    def __init__(self, store):
+        self.store = store
+
+    @staticmethod
+    def generate_sid() -> str:
+        return secrets.token_urlsafe(16)
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            data = self.store.get(sid)
+            if data is not None:
+                return ServerSideSession(data, sid=sid)
+        return ServerSideSession(sid=self.generate_sid(), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if session.modified or session.new:
+            self.store.save(session.sid, dict(session))
+
+        if session.new or self.should_set_cookie(app, session):
+            response.set_cookie(
+                name,
+                session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+
+
+def create_session_store(backend: str = 'memory', **options):
+    """按名称创建会话存储后端"""
+    if backend == 'memory':
+        return MemorySessionStore(**options)
+    if backend == 'sqlite':
+        return SQLiteSessionStore(**options)
+    raise ValueError(f'未知的会话后端: {backend}')
+
+
+def init_app(app):
+    """为 Flask 应用启用服务端会话
+
+    配置项（均可用同名环境变量覆盖）：
+        EXAM_SESSION_BACKEND : memory / sqlite，默认 memory
+        EXAM_SESSION_DB      : sqlite 后端的数据库路径，默认 sessions.db
+        EXAM_SESSION_TTL     : 会话有效期（秒）
+    """
+    backend = os.environ.get('EXAM_SESSION_BACKEND', app.config.get('EXAM_SESSION_BACKEND', 'memory'))
+    ttl = int(os.environ.get('EXAM_SESSION_TTL', app.config.get('EXAM_SESSION_TTL', DEFAULT_TTL)))
+    options = {'ttl': ttl}
+    if backend == 'sqlite':
+        options['path'] = os.environ.get('EXAM_SESSION_DB', app.config.get('EXAM_SESSION_DB', 'sessions.db'))
+    app.session_interface = ServerSideSessionInterface(create_session_store(backend, **options))
+    return app.session_interface
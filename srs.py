@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+间隔复习调度（Leitner / SM-2 简化版，Web 版和 GUI 共用）
+答错的题按越来越长的间隔重新出现：答错后 1 分钟 -> 答对后 10 分钟 -> 1 天 -> 之后每次乘以难度系数。
+
+每个学习者的状态是按全局题目ID排列的三个数组（难度系数、间隔、到期时间），每题 12 字节，
+保存在 srs_state/<学习者>.srs，首次使用时才加载。出过的题按到期时间放进堆里，取下一题 O(log n)；
+没有到期的题时按随机排列引入新题（见 sampler），新题也出完后提前复习最早到期的题。
+
+用法: python srs.py 学习者ID   # 显示该学习者的复习进度
+"""
+
+import heapq
+import os
+import re
+import secrets
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from sampler import FeistelPermutation, new_seed
+
+SRS_DIR = 'srs_state'
+SRS_MAGIC = b'QSRS'
+SRS_VERSION = 1
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+EASE_PENALTY = 0.2              # 答错时难度系数的降低量
+RELEARN_INTERVAL = 60           # 答错后重新出现的间隔（秒）
+LEARN_INTERVAL = 10 * 60        # 答错后再答对的间隔
+GRADUATE_INTERVAL = 24 * 60 * 60
+MAX_INTERVAL = 365 * 24 * 60 * 60
+
+_HEADER = struct.Struct('<4sHHIII')  # magic, version, 保留, 题目数, 新题排列种子, 新题游标
+_LEARNER_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def new_learner_id() -> str:
+    return secrets.token_hex(8)
+
+
+def check_learner(learner) -> str:
+    """学习者ID只允许字母、数字、下划线和连字符（用作文件名），无效时抛出 ValueError"""
+    if not isinstance(learner, str) or not _LEARNER_RE.match(learner):
+        raise ValueError(f'学习者ID无效: {learner}')
+    return learner
+
+
+class LearnerSchedule:
+    """一个学习者的复习状态；due 为 0 表示还没出过"""
+
+    def __init__(self, record_count: int, seed: Optional[int] = None):
+        self.ease = array('f', [DEFAULT_EASE]) * record_count
+        self.interval = array('I', [0]) * record_count
+        self.due = array('I', [0]) * record_count
+        self.seed = new_seed() if seed is None else seed
+        self.new_cursor = 0
+        self.lock = threading.Lock()
+        self._heap = None
+        self._new_order = None
+
+    @property
+    def record_count(self) -> int:
+        return len(self.due)
+
+    @property
+    def heap(self) -> list:
+        """(到期时间, 题目ID) 小顶堆，首次取题时构建；答题后压入新项，旧项取出时按 due 校验丢弃"""
+        if self._heap is None:
+            self._heap = [(due, qid) for qid, due in enumerate(self.due) if due]
+            heapq.heapify(self._heap)
+        return self._heap
+
+    def resize(self, record_count: int):
+        """题库题数变化（重新导入）后补齐或截断数组"""
+        if record_count == self.record_count:
+            return
+        extra = record_count - self.record_count
+        if extra > 0:
+            self.ease.extend(array('f', [DEFAULT_EASE]) * extra)
+            self.interval.extend(array('I', [0]) * extra)
+            self.due.extend(array('I', [0]) * extra)
+        else:
+            del self.ease[record_count:], self.interval[record_count:], self.due[record_count:]
+        self.new_cursor = 0
+        self._heap = None
+        self._new_order = None
+
+    def _pop_valid(self) -> Optional[tuple]:
+        heap = self.heap
+        while heap:
+            due, qid = heap[0]
+            if qid < self.record_count and self.due[qid] == due:
+                return heapq.heappop(heap)
+            heapq.heappop(heap)
+        return None
+
+    def pick(self, count: int = 1, now: Optional[float] = None) -> List[int]:
+        """选出最多 count 道互不相同的题（全局题目ID）：先到期的，再新题，最后提前复习"""
+        now = int(now or time.time())
+        picked, popped = [], []
+        while len(picked) < count:
+            entry = self._pop_valid()
+            if entry is None:
+                break
+            popped.append(entry)
+            if entry[0] > now:
+                break
+            picked.append(entry[1])
+        # 没到期的题放回去，先引入新题
+        ahead = popped[len(picked):]
+        popped = popped[:len(picked)]
+
+        if self._new_order is None:
+            self._new_order = FeistelPermutation(self.record_count, self.seed)
+        while len(picked) < count and self.new_cursor < self.record_count:
+            qid = self._new_order[self.new_cursor]
+            self.new_cursor += 1
+            if self.due[qid]:
+                continue
+            # 出过即进入复习队列，没作答的题下次仍然到期
+            self.due[qid] = now
+            popped.append((now, qid))
+            picked.append(qid)
+
+        for entry in ahead:
+            heapq.heappush(self.heap, entry)
+        while len(picked) < count:
+            entry = self._pop_valid()
+            if entry is None:
+                break
+            popped.append(entry)
+            picked.append(entry[1])
+        for entry in popped:
+            heapq.heappush(self.heap, entry)
+        return picked
+
+    def answer(self, question_id: int, is_correct: bool, now: Optional[float] = None) -> int:
+        """记录一次作答并安排下次复习，返回间隔（秒）"""
+        now = int(now or time.time())
+        interval = self.interval[question_id]
+        if not is_correct:
+            self.ease[question_id] = max(MIN_EASE, self.ease[question_id] - EASE_PENALTY)
+            interval = RELEARN_INTERVAL
+        elif interval == 0 or LEARN_INTERVAL <= interval < GRADUATE_INTERVAL:
+            interval = GRADUATE_INTERVAL
+        elif interval < LEARN_INTERVAL:
+            interval = LEARN_INTERVAL
+        else:
+            interval = min(MAX_INTERVAL, int(interval * self.ease[question_id]))
+        self.interval[question_id] = interval
+        self.due[question_id] = now + interval
+        heap = self.heap
+        heapq.heappush(heap, (now + interval, question_id))
+        # 过期项太多时重建堆
+        if len(heap) > 2 * self.record_count + 64:
+            self._heap = None
+        return interval
+
+    def summary(self, now: Optional[float] = None) -> Dict[str, int]:
+        now = int(now or time.time())
+        seen = sum(1 for due in self.due if due)
+        due_now = sum(1 for due in self.due if 0 < due <= now)
+        learning = sum(1 for i in self.interval if 0 < i < GRADUATE_INTERVAL)
+        return {'total_count': self.record_count, 'seen_count': seen, 'due_count': due_now,
+                'learning_count': learning, 'new_count': self.record_count - seen}
+
+    def to_bytes(self) -> bytes:
+        arrays = [self.ease, self.interval, self.due]
+        if sys.byteorder == 'big':
+            arrays = [array(a.typecode, a) for a in arrays]
+            for a in arrays:
+                a.byteswap()
+        header = _HEADER.pack(SRS_MAGIC, SRS_VERSION, 0, self.record_count, self.seed, self.new_cursor)
+        return header + b''.join(a.tobytes() for a in arrays)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'LearnerSchedule':
+        magic, version, _, record_count, seed, new_cursor = _HEADER.unpack_from(data, 0)
+        if magic != SRS_MAGIC or version != SRS_VERSION:
+            raise ValueError('不是有效的复习状态文件')
+        schedule = cls(0, seed)
+        offset = _HEADER.size
+        for name in ('ease', 'interval', 'due'):
+            values = getattr(schedule, name)
+            size = record_count * values.itemsize
+            if len(data) < offset + size:
+                raise ValueError('复习状态文件不完整')
+            values.frombytes(data[offset:offset + size])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            offset += size
+        schedule.new_cursor = new_cursor
+        return schedule
+
+
+class SRSStore:
+    """按学习者延迟加载复习状态（进程内 LRU 缓存），作答后立即写回文件
+
+    多个进程共用同一目录时，按文件修改时间发现其他进程的写入并重新加载
+    """
+
+    def __init__(self, directory: str = SRS_DIR, max_cached: int = 1000):
+        self.directory = directory
+        self.max_cached = max_cached
+        self._cache = OrderedDict()  # 学习者 -> (文件修改时间, LearnerSchedule)
+        self._lock = threading.Lock()
+
+    def path(self, learner: str) -> str:
+        return os.path.join(self.directory, check_learner(learner) + '.srs')
+
+    def _mtime(self, path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, learner: str, record_count: int) -> LearnerSchedule:
+        path = self.path(learner)
+        mtime = self._mtime(path)
+        with self._lock:
+            cached = self._cache.get(learner)
+            if cached is not None and cached[0] == mtime:
+                self._cache.move_to_end(learner)
+                schedule = cached[1]
+            else:
+                schedule = None
+        if schedule is None:
+            schedule = self._load(path, record_count)
+            with self._lock:
+                self._cache[learner] = (mtime, schedule)
+                while len(self._cache) > self.max_cached:
+                    self._cache.popitem(last=False)
+        if schedule.record_count != record_count:
+            with schedule.lock:
+                schedule.resize(record_count)
+        return schedule
+
+    def _load(self, path: str, record_count: int) -> LearnerSchedule:
+        try:
+            with open(path, 'rb') as f:
+                return LearnerSchedule.from_bytes(f.read())
+        except FileNotFoundError:
+            return LearnerSchedule(record_count)
+        except (OSError, ValueError, struct.error) as e:
+            print(f'复习状态读取失败，重新开始: {path}: {e}')
+            return LearnerSchedule(record_count)
+
+    def save(self, learner: str, schedule: LearnerSchedule):
+        path = self.path(learner)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(schedule.to_bytes())
+        os.replace(tmp, path)
+        with self._lock:
+            self._cache[learner] = (self._mtime(path), schedule)
+
+    def pick(self, learner: str, record_count: int, count: int = 1) -> List[int]:
+        schedule = self.get(learner, record_count)
+        with schedule.lock:
+            return schedule.pick(count)
+
+    def answer(self, learner: str, record_count: int, question_id: int, is_correct: bool) -> int:
+        """记录作答并写回文件，返回下次复习的间隔（秒）"""
+        schedule = self.get(learner, record_count)
+        with schedule.lock:
+            interval = schedule.answer(question_id, is_correct)
+            self.save(learner, schedule)
+        return interval
+
+
+def format_interval(seconds: int) -> str:
+    if seconds < 60 * 60:
+        return f'{max(1, seconds // 60)} 分钟'
+    if seconds < GRADUATE_INTERVAL:
+        return f'{seconds // 3600} 小时'
+    return f'{seconds // GRADUATE_INTERVAL} 天'
+
+
+def main():
+    if len(sys.argv) != 2:
+        print('用法: python srs.py 学习者ID')
+        sys.exit(1)
+    store = SRSStore(os.environ.get('EXAM_SRS_DIR', SRS_DIR))
+    path = store.path(sys.argv[1])
+    if not os.path.exists(path):
+        print(f'没有复习记录: {path}')
+        sys.exit(1)
+    with open(path, 'rb') as f:
+        schedule = LearnerSchedule.from_bytes(f.read())
+    summary = schedule.summary()
+    print(f"学习者 {sys.argv[1]}: 共 {summary['total_count']} 题，已学 {summary['seen_count']} 题，"
+          f"待复习 {summary['due_count']} 题，学习中 {summary['learning_count']} 题，未学 {summary['new_count']} 题")
+
+
+if __name__ == '__main__':
+    main()
@@ -16,9 +16,10 @@ def main():
         print("错误: 需要Python 3.6或更高版本")
         return
 
-    # 检查必要文件
+    # 检查必要文件（题库启动时自动编译为 question_bank.bin）
     required_files = [
         'exam_system_gui.py',
+        'question_bank.py',
         'single_choice.json',
         'multiple_choice.json',
         'judgment.json'
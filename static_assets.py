@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+前端页面的预渲染与预压缩（Web 版同步/异步服务器共用）
+启动时读取一次 templates/index.html，把内联的 <style> 和 <script> 拆成独立文件，文件名带内容摘要
+（如 app.3f2a9c1e.js），页面改为引用这些文件。页面和资源各自预先压缩为 gzip 和 brotli（安装了 brotli 时），
+请求时按 Accept-Encoding 选择，直接返回内存中的字节。
+
+- 资源文件名随内容变化，长期缓存（max-age 一年，immutable），页面更新后引用新的文件名
+- 页面地址固定，使用 no-cache + 强 ETag（每种编码各自的 ETag），再次访问只需一次 304
+- 模板不含动态内容；修改模板后重启服务生效
+- 离线模式（PWA）：/sw.js、/manifest.webmanifest、/icon.svg 取自同目录的模板，地址固定、no-cache；
+  sw.js 中的缓存版本由页面和资源的摘要计算，页面更新后 Service Worker 随之更新并清理旧缓存
+
+用法: python static_assets.py   # 显示各文件原始/压缩后大小
+可选: pip install brotli
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from werkzeug.http import parse_etags
+
+from compression import ENCODINGS, choose_encoding, compress
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+TEMPLATE_PATH = os.path.join(TEMPLATE_DIR, 'index.html')
+ASSET_PREFIX = '/assets/'
+ASSET_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+PAGE_CACHE_CONTROL = 'no-cache'
+# 根路径下的固定文件：(模板文件名, Content-Type)
+ROOT_FILES = {
+    '/sw.js': ('sw.js', 'application/javascript; charset=utf-8'),
+    '/manifest.webmanifest': ('manifest.webmanifest', 'application/manifest+json; charset=utf-8'),
+    '/icon.svg': ('icon.svg', 'image/svg+xml'),
+}
+
+_STYLE_RE = re.compile(r'[ \t]*<style>(.*?)</style>[ \t]*', re.S)
+_SCRIPT_RE = re.compile(r'[ \t]*<script>(.*?)</script>[ \t]*', re.S)
+
+
+class Asset:
+    """一个预压缩的静态文件：各编码的响应体和强 ETag"""
+
+    def __init__(self, name: str, content_type: str, body: bytes, cache_control: str):
+        self.name = name
+        self.content_type = content_type
+        self.cache_control = cache_control
+        digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self.bodies = {'identity': body}
+        self.etags = {'identity': digest}
+        for encoding in ENCODINGS:
+            data = compress(body, encoding, best=True)
+            # 压缩后没有变小的编码不使用
+            if len(data) < len(body):
+                self.bodies[encoding] = data
+                self.etags[encoding] = f'{digest}-{encoding}'
+
+    def negotiate(self, accept_encoding: Optional[str]) -> str:
+        return choose_encoding(accept_encoding, [e for e in ENCODINGS if e in self.bodies])
+
+    def respond(self, method: str, accept_encoding: Optional[str],
+                if_none_match: Optional[str]) -> Tuple[int, bytes, List[Tuple[str, str]]]:
+        """(状态码, 响应体, 响应头)；GET/HEAD 命中 If-None-Match 时返回 304"""
+        encoding = self.negotiate(accept_encoding)
+        etag = self.etags[encoding]
+        headers = [('ETag', f'"{etag}"'), ('Cache-Control', self.cache_control), ('Vary', 'Accept-Encoding')]
+        if method in ('GET', 'HEAD') and parse_etags(if_none_match).contains(etag):
+            return 304, b'', headers
+        headers.append(('Content-Type', self.content_type))
+        if encoding != 'identity':
+            headers.append(('Content-Encoding', encoding))
+        return 200, self.bodies[encoding], headers
+
+
+def split_page(html: str) -> Tuple[str, Dict[str, Tuple[str, bytes]]]:
+    """拆出内联样式和脚本：返回 (页面, {文件名: (Content-Type, 内容)})，文件名带内容摘要"""
+    files = {}
+
+    def extract(pattern, suffix, content_type, tag):
+        def replace(match):
+            body = match.group(1).strip('\n').encode('utf-8') + b'\n'
+            name = f'app.{hashlib.blake2b(body, digest_size=4).hexdigest()}.{suffix}'
+            files[name] = (content_type, body)
+            return tag.format(ASSET_PREFIX + name)
+        return pattern.sub(replace, html, count=1)
+
+    html = extract(_STYLE_RE, 'css', 'text/css; charset=utf-8', '    <link rel="stylesheet" href="{}">')
+    html = extract(_SCRIPT_RE, 'js', 'application/javascript; charset=utf-8', '    <script src="{}"></script>')
+    return html, files
+
+
+class StaticPages:
+    """首页和拆出的资源文件（启动时构建一次）"""
+
+    def __init__(self, template_path: str = TEMPLATE_PATH):
+        with open(template_path, 'r', encoding='utf-8-sig') as f:
+            page, files = split_page(f.read())
+        self.index = Asset('index.html', 'text/html; charset=utf-8', page.encode('utf-8'), PAGE_CACHE_CONTROL)
+        self.assets = {name: Asset(name, content_type, body, ASSET_CACHE_CONTROL)
+                       for name, (content_type, body) in files.items()}
+        self.root_files = self._root_files(os.path.dirname(template_path))
+
+    def _root_files(self, template_dir: str) -> Dict[str, Asset]:
+        """Service Worker、应用清单和图标；sw.js 填入缓存版本和预缓存列表"""
+        bodies = {}
+        for path, (filename, content_type) in ROOT_FILES.items():
+            with open(os.path.join(template_dir, filename), 'r', encoding='utf-8-sig') as f:
+                bodies[path] = f.read()
+        precache = ['/'] + [ASSET_PREFIX + name for name in self.assets] + [p for p in ROOT_FILES if p != '/sw.js']
+        digests = [self.index.etags['identity']] + [asset.etags['identity'] for asset in self.assets.values()]
+        digests += [hashlib.blake2b(bodies[p].encode('utf-8'), digest_size=8).hexdigest() for p in precache[1:]
+                    if p in bodies]
+        version = hashlib.blake2b(''.join(digests).encode('ascii'), digest_size=6).hexdigest()
+        bodies['/sw.js'] = (bodies['/sw.js'].replace('__CACHE_VERSION__', version)
+                            .replace('__PRECACHE__', json.dumps(precache)))
+        return {path: Asset(ROOT_FILES[path][0], ROOT_FILES[path][1], body.encode('utf-8'), PAGE_CACHE_CONTROL)
+                for path, body in bodies.items()}
+
+    def asset(self, path: str) -> Optional[Asset]:
+        """/assets/<文件名> -> Asset，不存在时返回 None"""
+        if not path.startswith(ASSET_PREFIX):
+            return None
+        return self.assets.get(path[len(ASSET_PREFIX):])
+
+
+def main():
+    pages = StaticPages()
+    for asset in [pages.index] + list(pages.assets.values()) + list(pages.root_files.values()):
+        sizes = ' | '.join(f'{encoding} {len(body)} B' for encoding, body in asset.bodies.items())
+        print(f'{asset.name}: {sizes}')
+    if 'br' not in ENCODINGS:
+        print('未安装 brotli，只提供 gzip（pip install brotli）')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+// 离线模式 Service Worker（static_assets.py 启动时填入缓存版本和预缓存列表）
+const SHELL_CACHE = 'exam-shell-__CACHE_VERSION__';
+const BANK_CACHE = 'exam-bank';
+const PRECACHE = __PRECACHE__;
+
+self.addEventListener('install', event => {
+    event.waitUntil(caches.open(SHELL_CACHE).then(cache => cache.addAll(PRECACHE)).then(() => self.skipWaiting()));
+});
+
+// 新版本生效后删除旧版本的页面缓存（题库缓存由页面自己维护）
+self.addEventListener('activate', event => {
+    event.waitUntil(caches.keys()
+        .then(keys => Promise.all(keys.filter(key => key.startsWith('exam-shell-') && key !== SHELL_CACHE)
+                                      .map(key => caches.delete(key))))
+        .then(() => self.clients.claim()));
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+
+    if (url.pathname === '/') {
+        // 页面：优先联网（no-cache + ETag，通常只是一次 304），离线时用缓存
+        event.respondWith(fetch(request)
+            .then(response => {
+                if (response.ok) {
+                    const copy = response.clone();
+                    caches.open(SHELL_CACHE).then(cache => cache.put('/', copy));
+                }
+                return response;
+            })
+            .catch(() => caches.match('/')));
+    } else if (url.pathname === '/bank_export') {
+        // 题库：联网获取增量，离线时返回页面上次合并保存的整份题库
+        event.respondWith(fetch(request).catch(() =>
+            caches.open(BANK_CACHE).then(cache => cache.match('/bank_export'))
+                .then(response => response || Response.error())));
+    } else if (PRECACHE.includes(url.pathname)) {
+        // 带摘要的资源文件内容不变，直接用缓存
+        event.respondWith(caches.match(url.pathname).then(response => response || fetch(request)));
+    }
+});
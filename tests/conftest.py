@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+测试公共配置：作答记录、间隔复习进度、题库版本记录写到临时目录，不动工作目录下的 answers.db / srs_state/ 等
+（须在导入 web_exam_system 之前设置环境变量）
+
+运行: python -m pytest -q
+"""
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+_TMP = tempfile.mkdtemp(prefix='exam_test_')
+os.environ.setdefault('EXAM_ANSWER_DB', os.path.join(_TMP, 'answers.db'))
+os.environ.setdefault('EXAM_SRS_DIR', os.path.join(_TMP, 'srs_state'))
+os.environ.setdefault('EXAM_BANK_VERSIONS', os.path.join(_TMP, 'bank_versions.json'))
+os.environ.setdefault('EXAM_SESSION_BACKEND', 'memory')
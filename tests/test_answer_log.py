@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""作答记录：后台批量写入、累计统计（含未写入的记录）、派生数据、离线同步去重"""
+
+import sqlite3
+
+import pytest
+
+import answer_log
+from answer_log import AnswerLog
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = AnswerLog(str(tmp_path / 'answers.db'), batch_size=2)
+    yield log
+    log.close()
+
+
+def test_stats_include_pending_and_written_rows(log):
+    log.record('alice', 1, 'A', True, latency_ms=1000)
+    log.record('alice', 2, 'B', False, latency_ms=3000)
+    log.record('alice', 3, 'C', True)
+    log.record('bob', 1, 'D', False)
+    # 不等待写入：未写入的记录也计入统计
+    expected = {'answered_questions': 3, 'correct_answers': 2, 'accuracy': 66.7, 'avg_latency_ms': 2000}
+    assert log.stats('alice') == expected
+    log.flush()
+    assert log.stats('alice') == expected
+    assert log.stats('bob')['answered_questions'] == 1
+    assert log.stats('nobody') == {'answered_questions': 0, 'correct_answers': 0, 'accuracy': 0,
+                                   'avg_latency_ms': None}
+    assert log._pending == {}
+
+
+def test_rows_persist_across_instances(log, tmp_path):
+    for qid in range(5):
+        log.record('alice', qid, 'A', qid % 2 == 0, source='paper-1', attempt=42)
+    log.close()
+
+    reopened = AnswerLog(log.path)
+    try:
+        assert reopened.stats('alice')['answered_questions'] == 5
+        history = reopened.history('alice', limit=2)
+        assert [h['question_id'] for h in history] == [4, 3]
+        assert history[0]['source'] == 'paper-1' and history[0]['attempt'] == 42
+        assert history[0]['is_correct'] is True
+    finally:
+        reopened.close()
+
+
+def test_recorded_ts_sees_pending_and_stored(log):
+    log.record('alice', 1, 'A', True, ts=100.0)
+    log.flush()
+    log.record('alice', 2, 'A', True, ts=200.0)
+    assert log.recorded_ts('alice', [100.0, 200.0, 300.0]) == {100.0, 200.0}
+    assert log.recorded_ts('bob', [100.0]) == set()
+    assert log.recorded_ts('alice', []) == set()
+
+
+class CountingAggregate:
+    def init(self, conn):
+        conn.execute('CREATE TABLE IF NOT EXISTS per_question (question_id INTEGER PRIMARY KEY, n INTEGER)')
+
+    def apply(self, conn, rows):
+        conn.executemany('INSERT INTO per_question VALUES (?, 1) ON CONFLICT(question_id) DO UPDATE SET n = n + 1',
+                         [(row[2],) for row in rows])
+
+
+def test_aggregates_update_in_the_write_transaction(log):
+    log.add_aggregate(CountingAggregate())
+    for qid in (1, 1, 2):
+        log.record('alice', qid, 'A', True)
+    log.flush()
+    counts = dict(log._reader.execute('SELECT question_id, n FROM per_question'))
+    assert counts == {1: 2, 2: 1}
+
+
+class FailingAggregate:
+    def init(self, conn):
+        pass
+
+    def apply(self, conn, rows):
+        raise sqlite3.OperationalError('boom')
+
+
+def test_failed_batch_is_rolled_back_and_dropped(log, capsys):
+    log.add_aggregate(FailingAggregate())
+    log.record('alice', 1, 'A', True)
+    log.flush()
+    assert '作答记录写入失败' in capsys.readouterr().out
+    assert log.stats('alice')['answered_questions'] == 0
+    assert log._reader.execute('SELECT COUNT(*) FROM answers').fetchone()[0] == 0
+
+
+def test_connect_migrates_old_schema(tmp_path):
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE answers (id INTEGER PRIMARY KEY, learner TEXT NOT NULL, source TEXT, '
+                 'question_id INTEGER NOT NULL, answer TEXT NOT NULL, correct INTEGER NOT NULL, '
+                 'ts REAL NOT NULL, latency_ms INTEGER)')
+    conn.close()
+    columns = [row[1] for row in answer_log.connect(path).execute('PRAGMA table_info(answers)')]
+    assert columns[-1] == 'attempt'
+
+
+def test_normalize_latency():
+    assert answer_log.normalize_latency(1500) == 1500
+    assert answer_log.normalize_latency(12.7) == 12
+    for bad in (None, True, '100', -1, answer_log.LATENCY_MAX_MS + 1):
+        assert answer_log.normalize_latency(bad) is None
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""异步版（ASGI）：接口与同步版一致、阻塞调用放到线程池、异常时返回 500"""
+
+import asyncio
+import gzip
+import json
+import time
+from urllib.parse import urlencode
+
+import pytest
+
+import web_exam_system_async as async_app
+import web_exam_system_v2 as sync_app
+import profiling
+from profiling import RequestProfiler
+from static_assets import ASSET_PREFIX
+from web_exam_system import SESSION_ROUTES, exam_system, static_pages
+
+
+class AsyncClient:
+    """直接调用 ASGI 入口，按 Cookie 保持会话"""
+
+    def __init__(self):
+        self.cookie = None
+
+    def request(self, method, path, query='', body=None, headers=()):
+        scope_headers = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+        if self.cookie:
+            scope_headers.append((b'cookie', self.cookie.encode('latin-1')))
+        raw = json.dumps(body).encode('utf-8') if body is not None else b''
+        if body is not None:
+            scope_headers.append((b'content-type', b'application/json'))
+        scope = {'type': 'http', 'method': method, 'path': path, 'query_string': query.encode('latin-1'),
+                 'headers': scope_headers}
+        sent = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': raw, 'more_body': False}
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(async_app.app(scope, receive, send))
+        start, body_message = sent
+        response_headers = {k.decode('latin-1'): v.decode('latin-1') for k, v in start['headers']}
+        if 'set-cookie' in response_headers:
+            self.cookie = response_headers['set-cookie'].split(';')[0]
+        return start['status'], response_headers, body_message['body']
+
+    def json(self, method, path, query='', body=None):
+        status, _, content = self.request(method, path, query, body)
+        return status, json.loads(content)
+
+
+def test_routes_match_the_flask_app():
+    flask_rules = {rule.rule for rule in sync_app.app.url_map.iter_rules()
+                   if '<' not in rule.rule and rule.endpoint != 'static'}
+    static_paths = set(static_pages.root_files) | {'/bank_export'}
+    assert flask_rules - static_paths == set(async_app.ROUTES)
+    for path, route in SESSION_ROUTES.items():
+        flask_methods = {m for rule in sync_app.app.url_map.iter_rules() if rule.rule == path
+                         for m in rule.methods} - {'OPTIONS'}
+        assert set(async_app.ROUTES[path][0]) == flask_methods, path
+
+
+def strip(body):
+    """去掉与会话身份有关、两次运行必然不同的字段"""
+    if isinstance(body, dict):
+        return {k: strip(v) for k, v in body.items() if k not in ('learner', 'history', 'attempt')}
+    if isinstance(body, list):
+        return [strip(v) for v in body]
+    return body
+
+
+SCRIPT = [
+    ('GET', '/orderings', '', None),
+    ('POST', '/start_exam', '', {'ordering': 'sequential'}),
+    ('GET', '/get_question', '', None),
+    ('POST', '/submit_answer', '', {'answer': 'A'}),
+    ('GET', '/get_questions', 'start=2&count=3', None),
+    ('GET', '/get_questions', 'start=x', None),
+    ('POST', '/submit_answer', '', {'answer': 'B', 'question_number': 3}),
+    ('POST', '/submit_answers', '', {'answers': [{'question_id': 0, 'answer': 'A'}, {'question_id': -5}]}),
+    ('GET', '/get_stats', '', None),
+    ('GET', '/jump_to', 'question_number=7', None),
+    ('POST', '/jump_to', '', {'question_number': 9}),
+    ('GET', '/search', urlencode({'q': '神经网络', 'limit': 2}), None),
+    ('GET', '/wrong_book', 'last=x', None),
+    ('GET', '/papers', '', None),
+    ('GET', '/paper/get_question', '', None),
+    ('POST', '/paper/start', '', {'paper_id': 1}),
+    ('GET', '/paper/get_question', '', None),
+    ('POST', '/paper/submit_answer', '', {'answer': 'A'}),
+    ('POST', '/paper/submit_answer', '', {'answer': 'A', 'question_number': 1}),
+    ('GET', '/paper/result', '', None),
+]
+
+
+def test_same_responses_as_flask():
+    flask_client = sync_app.app.test_client()
+    client = AsyncClient()
+    for method, path, query, body in SCRIPT:
+        exam_system.answer_log.flush()
+        expected = flask_client.open(path, method=method, query_string=query, json=body)
+        status, actual = client.json(method, path, query, body)
+        assert status == expected.status_code, path
+        assert strip(actual) == strip(expected.get_json()), path
+
+
+def test_question_page_etag_and_304():
+    client = AsyncClient()
+    client.json('POST', '/start_exam', body={'ordering': 'sequential'})
+    status, headers, body = client.request('GET', '/get_questions', 'start=1&count=5',
+                                           headers=[('Accept-Encoding', 'gzip')])
+    assert status == 200 and headers['content-encoding'] == 'gzip'
+    page = json.loads(gzip.decompress(body))
+    assert [q['question_number'] for q in page['questions']] == [1, 2, 3, 4, 5]
+    status, _, body = client.request('GET', '/get_questions', 'start=1&count=5',
+                                     headers=[('Accept-Encoding', 'gzip'), ('If-None-Match', headers['etag'])])
+    assert status == 304 and body == b''
+
+
+def test_blocking_handlers_run_in_a_thread(monkeypatch):
+    calls = []
+
+    async def to_thread(func, *args):
+        calls.append(func.__name__)
+        return func(*args)
+
+    monkeypatch.setattr(async_app.asyncio, 'to_thread', to_thread)
+    client = AsyncClient()
+    client.json('POST', '/start_exam', body={'ordering': 'sequential'})
+    client.json('GET', '/get_question')
+    client.json('GET', '/get_stats')
+    client.json('GET', '/wrong_book')
+    assert calls == ['start_exam', 'get_stats', 'get_wrong_book']
+    client.json('POST', '/start_exam', body={'ordering': 'srs'})
+    client.json('GET', '/get_question')
+    assert calls[-1] == 'get_question'
+
+
+def test_handler_error_returns_500_and_releases_profiler(monkeypatch, tmp_path):
+    def broken(session):
+        raise RuntimeError('boom')
+
+    profiler = RequestProfiler(str(tmp_path), rate=1.0)
+    monkeypatch.setattr(async_app, '_profiler', profiler)
+    monkeypatch.setattr(exam_system, 'stats', broken)
+    client = AsyncClient()
+    for _ in range(2):
+        status, headers, body = client.request('GET', '/get_stats')
+        assert status == 500
+        assert profiler._busy.acquire(blocking=False)
+        profiler._busy.release()
+    assert client.json('GET', '/orderings')[0] == 200
+
+
+
+@pytest.mark.parametrize('mode', ['cprofile', 'sample'])
+def test_blocking_handlers_are_profiled_in_the_worker_thread(monkeypatch, tmp_path, mode):
+    real_stats = exam_system.stats
+
+    def slow_stats(session):
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            sum(i * i for i in range(1000))
+        return real_stats(session)
+
+    monkeypatch.setattr(async_app, '_profiler', RequestProfiler(str(tmp_path), mode=mode, interval=0.001))
+    monkeypatch.setattr(exam_system, 'stats', slow_stats)
+    status, _, _ = AsyncClient().request('GET', '/get_stats', headers=[(profiling.TRIGGER_HEADER, '1')])
+    assert status == 200
+    functions = profiling.aggregate(profiling.load_profiles(str(tmp_path)), 'cumtime')
+    label = next(name for name in functions if name.endswith('(slow_stats)'))
+    assert functions[label]['cumtime'] > 0
+
+def test_static_and_unknown_paths():
+    client = AsyncClient()
+    assert client.request('GET', '/nope')[0] == 404
+    assert client.request('POST', '/get_question')[0] == 405
+    assert client.request('GET', '/')[0] == 200
+    name = next(iter(static_pages.assets))
+    assert client.request('GET', ASSET_PREFIX + name)[0] == 200
+
+
+@pytest.mark.parametrize('path', ['/get_stats', '/orderings'])
+def test_head_has_no_body(path):
+    status, headers, body = AsyncClient().request('HEAD', path)
+    assert status == 200 and body == b'' and int(headers['content-length']) > 0
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""离线练习：题库导出与增量、离线作答同步（重发不重复记录）"""
+
+import gzip
+import json
+import time
+
+from bank_export import BANK_VERSIONS_FILE, BankExport
+from question_bank import BANK_FILE, QuestionBank, compile_questions
+
+SAMPLE = {
+    'single_choice': [{'text': '单选一', 'options': ['甲', '乙'], 'answer': 'A'},
+                      {'text': '单选二', 'options': ['甲', '乙'], 'answer': 'B'}],
+    'judgment': [{'text': '判断一', 'options': ['正确', '错误'], 'answer': 'A'}],
+}
+
+
+def export_of(questions, path):
+    return BankExport(QuestionBank(compile_questions(questions)), path and str(path))
+
+
+def body(asset):
+    return json.loads(asset.bodies['identity'])
+
+
+def test_full_export_is_compact_and_versioned(tmp_path):
+    export = export_of(SAMPLE, tmp_path / 'versions.json')
+    full = body(export.export())
+    assert full['version'] == export.version
+    assert full['types'] == ['single_choice', 'judgment'] and full['total'] == 3
+    assert full['questions'][2] == [1, '判断一', ['正确', '错误'], 'A']
+    # 题库不变时版本号不变
+    assert export_of(SAMPLE, tmp_path / 'other.json').version == export.version
+    assert export.export('unknown') is export.full
+
+
+def test_delta_lists_changed_questions(tmp_path):
+    path = tmp_path / 'versions.json'
+    old = export_of(SAMPLE, path)
+    changed = json.loads(json.dumps(SAMPLE))
+    changed['single_choice'][1]['answer'] = 'A'
+    changed['judgment'].append({'text': '判断二', 'options': ['正确', '错误'], 'answer': 'B'})
+    new = export_of(changed, path)
+    assert new.version != old.version
+    assert set(json.loads(path.read_text())) == {old.version, new.version}
+
+    delta = new.export(old.version)
+    assert delta is new.export(old.version)  # 只序列化一次
+    data = body(delta)
+    assert data['base'] == old.version and data['version'] == new.version
+    assert [change[0] for change in data['changes']] == [1, 3]
+    assert body(new.export(new.version))['changes'] == []
+
+
+def test_history_keeps_recent_versions(tmp_path):
+    path = tmp_path / 'versions.json'
+    versions = []
+    for n in range(4):
+        questions = {'judgment': [{'text': f'判断{n}', 'options': ['正确', '错误'], 'answer': 'A'}]}
+        versions.append(BankExport(QuestionBank(compile_questions(questions)), str(path), keep=2).version)
+    assert list(json.loads(path.read_text())) == versions[-2:]
+
+
+def test_unwritable_history_still_exports(tmp_path, capsys):
+    export = export_of(SAMPLE, tmp_path / 'missing' / 'versions.json')
+    assert '题库版本记录写入失败' in capsys.readouterr().out
+    assert export.export(export.version) is not export.full
+
+
+def test_history_is_kept_next_to_the_bank_file(tmp_path, monkeypatch):
+    bank_dir = tmp_path / 'bank'
+    bank_dir.mkdir()
+    (bank_dir / BANK_FILE).write_bytes(compile_questions(SAMPLE))
+    monkeypatch.chdir(tmp_path)
+    bank = QuestionBank.open(str(bank_dir / BANK_FILE))
+    try:
+        export = BankExport(bank)
+    finally:
+        bank.close()
+    assert list(json.loads((bank_dir / BANK_VERSIONS_FILE).read_text())) == [export.version]
+    assert not (tmp_path / BANK_VERSIONS_FILE).exists()
+
+    # 内存中的题库没有文件位置：只在内存中记录当前版本
+    in_memory = export_of(SAMPLE, None)
+    assert in_memory.versions_path is None and list(in_memory.history) == [in_memory.version]
+    assert not (tmp_path / BANK_VERSIONS_FILE).exists()
+
+def test_bank_export_route_uses_etags():
+    from web_exam_system_v2 import app
+
+    client = app.test_client()
+    first = client.get('/bank_export', headers={'Accept-Encoding': 'gzip'})
+    assert first.status_code == 200 and first.headers['Content-Encoding'] == 'gzip'
+    version = json.loads(gzip.decompress(first.data))['version']
+    assert client.get('/bank_export', headers={'Accept-Encoding': 'gzip',
+                                               'If-None-Match': first.headers['ETag']}).status_code == 304
+    assert client.get(f'/bank_export?since={version}').get_json()['changes'] == []
+
+
+def test_sync_answers_is_idempotent():
+    from web_exam_system import exam_system
+    from web_exam_system_v2 import app
+
+    client = app.test_client()
+    learner = 'sync_test_learner'
+    correct = exam_system.bank.questions['single_choice'][0]['answer']
+    now_ms = int(time.time() * 1000)
+    answers = [
+        {'question_id': 0, 'answer': correct, 'ts': now_ms - 2000, 'latency_ms': 1500, 'attempt': 7},
+        {'question_id': 0, 'answer': correct, 'ts': now_ms - 1000},
+        {'question_id': 0, 'answer': correct, 'ts': now_ms + 3600 * 1000},  # 未来时间
+        {'question_id': 0, 'answer': correct},                              # 缺少时间
+        {'question_id': 10 ** 6, 'answer': 'A', 'ts': now_ms},              # 题目不存在
+    ]
+    first = client.post('/sync_answers', json={'learner': learner, 'answers': answers}).get_json()
+    assert (first['synced'], first['duplicates'], len(first['errors'])) == (2, 0, 3)
+    again = client.post('/sync_answers', json={'learner': learner, 'answers': answers[:2]}).get_json()
+    assert (again['synced'], again['duplicates']) == (0, 2)
+    exam_system.answer_log.flush()
+    assert exam_system.answer_log.stats(learner)['answered_questions'] == 2
+
+    assert client.post('/sync_answers', json={'learner': learner, 'answers': []}).status_code == 400
+    assert client.post('/sync_answers', json={'learner': '../x', 'answers': answers}).status_code == 400
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""负载测试工具：百分位数、汇总、对本地服务器的一次小规模运行"""
+
+import bench_load
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert bench_load.percentile(values, 50) == 50
+    assert bench_load.percentile(values, 99) == 99
+    assert bench_load.percentile(values, 100) == 100
+    assert bench_load.percentile([5.0], 95) == 5.0
+    assert bench_load.percentile([], 50) is None
+
+
+def test_summarize():
+    recorder = bench_load.Recorder()
+    for ms in (1, 2, 3, 4):
+        recorder.add('/get_question', ms / 1000, 100 * ms, ok=ms != 4)
+    recorder.add_cookie(40)
+    result = bench_load.summarize(recorder, wall=2.0)
+    route = result['routes']['/get_question']
+    assert result['requests'] == 4 and result['throughput_rps'] == 2.0
+    assert (route['count'], route['errors'], route['max_bytes']) == (4, 1, 400)
+    assert route['p50_ms'] == 2.0 and route['mean_ms'] == 2.5
+    assert result['cookie_bytes'] == {'avg': 40.0, 'max': 40}
+
+
+def test_small_run_against_a_local_server():
+    proc, url = bench_load.start_server(bench_load.SERVERS['v2'])
+    try:
+        result = bench_load.run_load(url, users=2, iterations=3, duration=None, pid=proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait(10)
+    routes = result['routes']
+    assert routes['/get_question']['count'] == 6
+    assert all(stats['errors'] == 0 for stats in routes.values())
+    assert result['cookie_bytes']['max'] < 100
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""响应压缩：Accept-Encoding 协商、预压缩片段拼接成合法 gzip 流、Flask 实时压缩 JSON"""
+
+import gzip
+import zlib
+
+import pytest
+
+import compression
+from compression import Deflated, accepted_encodings, choose_encoding, gzip_join
+
+
+def test_accepted_encodings_parses_q_values():
+    assert accepted_encodings('gzip, br;q=0.5, identity ; q=0, x;q=.') == {
+        'gzip': 1.0, 'br': 0.5, 'identity': 0.0, 'x': 0.0}
+    assert accepted_encodings(None) == {}
+    assert accepted_encodings(' , ') == {}
+
+
+@pytest.mark.parametrize('header, available, expected', [
+    ('gzip, br', ('br', 'gzip'), 'br'),
+    ('gzip, br;q=0', ('br', 'gzip'), 'gzip'),
+    ('*', ('br', 'gzip'), 'br'),
+    ('*;q=0, gzip', ('br', 'gzip'), 'gzip'),
+    ('deflate', ('br', 'gzip'), 'identity'),
+    (None, ('gzip',), 'identity'),
+    ('GZIP', ('gzip',), 'gzip'),
+])
+def test_choose_encoding(header, available, expected):
+    assert choose_encoding(header, available) == expected
+
+
+@pytest.mark.parametrize('parts', [
+    [],
+    [b''],
+    [b'{"a": 1}'],
+    [Deflated(b'static part')],
+    [b'{"status":"success",', Deflated('"题干":"决策树"'.encode('utf-8')), b',"n":1', b'}'],
+    [Deflated(b'x' * 5000), Deflated(b''), b'', Deflated(b'y' * 70000)],
+])
+def test_gzip_join_produces_a_valid_stream(parts):
+    raw = b''.join(p.raw if isinstance(p, Deflated) else p for p in parts)
+    data = gzip_join(parts)
+    assert gzip.decompress(data) == raw
+    # 单成员 gzip 流：zlib 一次解完，没有多余数据
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decompressor.decompress(data) == raw and decompressor.eof and not decompressor.unused_data
+
+
+def test_compress_round_trip():
+    data = '题目'.encode('utf-8') * 100
+    assert gzip.decompress(compression.compress(data, 'gzip')) == data
+    assert compression.compress(data, 'identity') is data
+    if 'br' in compression.ENCODINGS:
+        assert compression.brotli.decompress(compression.compress(data, 'br')) == data
+
+
+def test_should_compress():
+    big = b'x' * compression.MIN_SIZE
+    assert compression.should_compress(big, 'application/json')
+    assert compression.should_compress(big, 'text/plain; charset=utf-8')
+    assert not compression.should_compress(big[:-1], 'application/json')
+    assert not compression.should_compress(big, 'image/png')
+    assert not compression.should_compress(big, None)
+
+
+def test_flask_compresses_large_json_only():
+    from web_exam_system_v2 import app
+
+    client = app.test_client()
+    client.post('/start_exam', json={'ordering': 'sequential'})
+    # 不带 ETag 的大响应：按 Accept-Encoding 压缩
+    page = client.get('/search?q=的&limit=50', headers={'Accept-Encoding': 'gzip'})
+    assert page.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in page.headers['Vary']
+    text = gzip.decompress(page.data).decode('utf-8')
+    assert '\\u' not in text  # UTF-8 输出，不转义中文
+    plain = client.get('/search?q=的&limit=50')
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.data.decode('utf-8') == text
+
+    small = client.get('/get_stats', headers={'Accept-Encoding': 'gzip'})
+    assert len(small.data) < compression.MIN_SIZE
+    assert 'Content-Encoding' not in small.headers
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""判分：答案掩码、整卷向量化判分、/submit_answers 批量判分"""
+
+import random
+
+import pytest
+
+import grading
+from question_bank import mask_to_answer
+from web_exam_system import exam_system
+
+
+def test_encode_answer():
+    assert grading.encode_answer('A') == 0b1
+    assert grading.encode_answer(' c a ') == 0b101
+    assert grading.encode_answer('AE') == 0b10001
+    assert grading.encode_answer('AF') & grading.INVALID_BIT
+    assert grading.encode_answer('') == 0
+
+
+@pytest.mark.parametrize('question_type, user, correct, expected', [
+    ('single_choice', 'b', 'B', True),
+    ('single_choice', 'BB', 'B', False),
+    ('multiple_choice', 'CAB', 'ABC', True),
+    ('multiple_choice', 'AB', 'ABC', False),
+    ('judgment', 'A', 'A', True),
+    ('judgment', '正确', 'A', False),
+])
+def test_check_answer(question_type, user, correct, expected):
+    assert grading.check_answer(question_type, user, correct) is expected
+
+
+def test_score_mask_partial_credit():
+    abc = grading.encode_answer('ABC')
+    assert grading.score_mask('multiple_choice', grading.encode_answer('AB'), abc, True) == pytest.approx(2 / 3)
+    assert grading.score_mask('multiple_choice', grading.encode_answer('AD'), abc, True) == 0.0
+    assert grading.score_mask('multiple_choice', grading.encode_answer('AB'), abc) == 0.0
+    assert grading.score_mask('single_choice', 0, grading.encode_answer('A'), True) == 0.0
+
+
+def random_sheet(n, seed=7):
+    rng = random.Random(seed)
+    correct = [rng.randrange(1, 32) for _ in range(n)]
+    user = [c if rng.random() < 0.5 else rng.choice([rng.randrange(0, 32), c & rng.randrange(32),
+                                                     grading.INVALID_BIT | c]) for c in correct]
+    multiple = [rng.random() < 0.5 for _ in range(n)]
+    return user, correct, multiple
+
+
+@pytest.mark.parametrize('partial_credit', [False, True])
+def test_grade_sheet_matches_score_mask(partial_credit):
+    user, correct, multiple = random_sheet(2000)
+    scores = grading.grade_sheet(bytes(user), bytes(correct), multiple, partial_credit)
+    expected = [grading.score_mask('multiple_choice' if m else 'single_choice', u, c, partial_credit)
+                for u, c, m in zip(user, correct, multiple)]
+    assert [round(float(s), 5) for s in scores] == [round(e, 5) for e in expected]
+
+
+def test_grade_sheet_without_numpy(monkeypatch):
+    user, correct, multiple = random_sheet(300)
+    with_numpy = [float(s) for s in grading.grade_sheet(user, correct, multiple, True)]
+    monkeypatch.setattr(grading, 'np', None)
+    without = grading.grade_sheet(user, correct, multiple, True)
+    assert [round(s, 5) for s in without] == [round(s, 5) for s in with_numpy]
+
+
+def reference_grade(items, partial_credit):
+    """逐题判分（与 grade_answers 应得到相同结果）"""
+    bank = exam_system.bank
+    results = []
+    for item in items:
+        question_type, _ = bank.locate_id(item['question_id'])
+        answer = item['answer'].strip()
+        mask = grading.INVALID_BIT if question_type != 'multiple_choice' and len(answer) != 1 \
+            else grading.encode_answer(answer)
+        results.append(grading.score_mask(question_type, mask, bank.answer_mask(item['question_id']), partial_credit))
+    return results
+
+
+@pytest.mark.parametrize('partial_credit', [False, True])
+def test_grade_answers_matches_per_item_grading(partial_credit):
+    bank = exam_system.bank
+    rng = random.Random(11)
+    items = []
+    for _ in range(300):
+        question_id = rng.randrange(bank.record_count)
+        correct = mask_to_answer(bank.answer_mask(question_id))
+        answer = rng.choice([correct, correct[:1], 'A', 'AB', 'X', ' ' + correct.lower()])
+        items.append({'question_id': question_id, 'answer': answer})
+    results, answered, correct_count, total_score = exam_system.grade_answers(items, partial_credit)
+    expected = reference_grade(items, partial_credit)
+    assert answered == len(items)
+    assert correct_count == sum(score == 1.0 for score in expected)
+    assert total_score == pytest.approx(sum(expected), abs=1e-4)
+    for result, score in zip(results, expected):
+        assert result['is_correct'] == (score == 1.0)
+        assert result['correct_answer'] == mask_to_answer(bank.answer_mask(result['question_id']))
+        if partial_credit:
+            assert result['score'] == round(score, 3)
+
+
+def test_grade_answers_reports_invalid_items_in_place():
+    items = ['x', {'question_id': 'abc', 'answer': 'A'}, {'question_id': 0, 'answer': ''},
+             {'question_id': 10 ** 6, 'answer': 'A'}, {'question_id': 0, 'answer': 'A'}]
+    results, answered, _, _ = exam_system.grade_answers(items)
+    assert [r['status'] for r in results] == ['error', 'error', 'error', 'error', 'success']
+    assert results[1]['question_id'] == 'abc'
+    assert answered == 1
+    assert exam_system.grade_answers([]) == ([], 0, 0, 0.0)
+
+
+def test_submit_answers_route():
+    from web_exam_system import app
+    client = app.test_client()
+    bank = exam_system.bank
+    answers = [{'question_id': i, 'answer': mask_to_answer(bank.answer_mask(i))} for i in range(5)]
+    body = client.post('/submit_answers', json={'answers': answers + [{'question_id': -1, 'answer': 'A'}]}).get_json()
+    assert body['graded'] == 5 and body['correct_answers'] == 5
+    assert body['results'][-1]['status'] == 'error'
+    assert client.post('/submit_answers', json={'answers': []}).status_code == 400
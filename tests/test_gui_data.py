@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""GUI 的用户数据（复习进度、作答记录）保存在用户数据目录；刷新统计栏不访问数据库"""
+
+import os
+import sys
+import threading
+import types
+
+import pytest
+
+from answer_log import AnswerLog
+from exam_system_gui import DATA_DIR_NAME, LEARNER, ExamSystemGUI, get_data_path
+
+
+def test_data_path_honours_override(monkeypatch, tmp_path):
+    monkeypatch.setenv('EXAM_DATA_DIR', str(tmp_path / 'data'))
+    assert get_data_path('srs_state') == str(tmp_path / 'data' / 'srs_state')
+    assert (tmp_path / 'data').is_dir()
+
+
+@pytest.mark.skipif(sys.platform in ('win32', 'darwin'), reason='XDG 目录只用于 Linux 等系统')
+def test_data_path_defaults_to_per_user_dir(monkeypatch, tmp_path):
+    monkeypatch.delenv('EXAM_DATA_DIR', raising=False)
+    monkeypatch.setenv('XDG_DATA_HOME', str(tmp_path))
+    assert get_data_path('srs_state') == os.path.join(str(tmp_path), DATA_DIR_NAME, 'srs_state')
+    assert (tmp_path / DATA_DIR_NAME).is_dir()
+
+
+class Label:
+    def config(self, text, fg):
+        self.text = text
+
+
+def test_stats_bar_uses_in_memory_history(tmp_path):
+    log = AnswerLog(str(tmp_path / 'answers.db'))
+    try:
+        log.record(LEARNER, 1, 'A', True)
+        log.record(LEARNER, 2, 'B', False)
+        gui = types.SimpleNamespace(answer_log=log, history=None, history_lock=threading.Lock(),
+                                    total_questions=1, answered_questions=0, correct_answers=0,
+                                    colors={'text': '#333333'}, progress_stats_label=Label())
+        ExamSystemGUI.load_history(gui)
+        assert gui.history == [2, 1]
+
+        def no_query(learner):
+            raise AssertionError('统计栏不应查询数据库')
+
+        log.stats = no_query
+        gui.history[0] += 1
+        gui.history[1] += True
+        ExamSystemGUI.update_stats(gui)
+        assert '累计: 3 题 66.7%' in gui.progress_stats_label.text
+    finally:
+        log.close()
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""GUI 选项区域：A–E 行只创建一次，换题时原地更新；高亮只涉及答案中的字母
+
+默认用不需要显示器的控件替身运行；有显示器时再用真实的 Tk 控件跑一遍（Linux 服务器可用 xvfb-run python -m pytest）
+"""
+
+import tkinter as tk
+from types import SimpleNamespace
+
+import pytest
+
+from exam_system_gui import CORRECT_BG, NO_CHOICE, WRONG_BG, OptionRows
+from question_bank import OPTION_LETTERS
+
+COLORS = {'white': '#FFFFFF', 'text': '#333333', 'success': '#4CAF50', 'error': '#F44336'}
+FONTS = {'normal': ('TkDefaultFont', 10), 'large': ('TkDefaultFont', 11)}
+
+
+class FakeWidget:
+    """只记录选项和布局状态的控件"""
+
+    created = 0
+
+    def __init__(self, parent=None, **options):
+        FakeWidget.created += 1
+        self.options = options
+        self.manager = ''
+        self.configured = 0
+
+    def config(self, **options):
+        self.options.update(options)
+        self.configured += 1
+
+    def cget(self, name):
+        return self.options[name]
+
+    def pack(self, **options):
+        self.manager = 'pack'
+
+    def pack_forget(self):
+        self.manager = ''
+
+    def winfo_manager(self):
+        return self.manager
+
+
+class FakeVar:
+    def __init__(self, value=None):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+FAKE_WIDGETS = SimpleNamespace(Frame=FakeWidget, Radiobutton=FakeWidget, Checkbutton=FakeWidget,
+                               StringVar=FakeVar, BooleanVar=FakeVar)
+
+
+@pytest.fixture(params=['fake', 'tk'])
+def rows(request):
+    if request.param == 'fake':
+        yield OptionRows(None, COLORS, FONTS, FAKE_WIDGETS)
+        return
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        pytest.skip(f'无法创建窗口: {e}')
+    options = OptionRows(root, COLORS, FONTS)
+    yield options
+    root.destroy()
+
+
+def visible(options):
+    return [letter for letter in OPTION_LETTERS if options.rows[letter].frame.winfo_manager()]
+
+
+def test_rows_are_reused_across_questions(rows):
+    frames = {letter: row.frame for letter, row in rows.rows.items()}
+    rows.show('single_choice', ['甲', '乙', '丙', '丁'])
+    assert visible(rows) == list('ABCD')
+    assert rows.rows['A'].widget is rows.rows['A'].radio
+    rows.show('multiple_choice', ['甲', '乙', '丙', '丁', '戊'])
+    assert visible(rows) == list('ABCDE')
+    assert rows.rows['A'].widget is rows.rows['A'].check
+    assert rows.rows['E'].widget.cget('text') == 'E. 戊'
+    rows.show('judgment', ['正确', '错误'])
+    assert visible(rows) == ['A', 'B']
+    assert {letter: row.frame for letter, row in rows.rows.items()} == frames
+    rows.hide()
+    assert visible(rows) == [] and rows.shown == 0
+
+
+def test_answer_resets_between_questions(rows):
+    rows.show('multiple_choice', ['甲', '乙', '丙'])
+    rows.checks['C'].set(True)
+    rows.checks['A'].set(True)
+    assert rows.answer('multiple_choice') == 'AC'
+    rows.show('single_choice', ['甲', '乙'])
+    assert rows.answer('single_choice') == ''
+    assert rows.choice.get() == NO_CHOICE
+    rows.choice.set('B')
+    assert rows.answer('single_choice') == 'B'
+    # 上一题留下的字母超出本题选项范围时不算作答
+    rows.choice.set('E')
+    assert rows.answer('single_choice') == ''
+
+
+def test_highlight_and_clear_only_touch_marked_rows(rows):
+    rows.show('single_choice', ['甲', '乙', '丙', '丁'])
+    rows.highlight('b', 'D')
+    assert rows.painted == {'B', 'D'}
+    assert rows.rows['D'].frame.cget('bg') == CORRECT_BG
+    assert rows.rows['B'].frame.cget('bg') == WRONG_BG
+    assert rows.rows['A'].frame.cget('bg') == COLORS['white']
+    # 换题时恢复颜色
+    rows.show('judgment', ['正确', '错误'])
+    assert rows.painted == set()
+    assert rows.rows['B'].frame.cget('bg') == COLORS['white']
+    assert rows.rows['B'].widget.cget('fg') == COLORS['text']
+    # 不在本题选项范围内的字母忽略
+    rows.highlight('E', 'A')
+    assert rows.painted == {'A'}
+
+
+
+def test_switching_questions_creates_no_widgets():
+    options = OptionRows(None, COLORS, FONTS, FAKE_WIDGETS)
+    created = FakeWidget.created
+    options.show('single_choice', ['甲', '乙', '丙', '丁'])
+    options.highlight('A', 'B')
+    options.show('single_choice', ['甲', '乙', '丙', '丁'])
+    assert FakeWidget.created == created
+    # 文字和样式没有变化的行不再设置
+    assert options.rows['C'].radio.configured == 1
+
+def test_bench_sequence_is_reproducible():
+    import bench_gui
+    from question_bank import load_bank
+
+    bank = load_bank()
+    sequence = bench_gui.make_sequence(bank, 50)
+    assert sequence == bench_gui.make_sequence(bank, 50)
+    assert len({question_type for question_type, *_ in sequence}) > 1
+    for question_type, q_idx, question, options, answer in sequence:
+        assert question == bank.questions[question_type][q_idx]
+        assert answer in OPTION_LETTERS[:len(options)]
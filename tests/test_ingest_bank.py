@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""从官方题库表格导入：字段整理、答案校验、未变化时跳过、版本对比"""
+
+import json
+
+import pytest
+
+from ingest_bank import (IngestError, clean_cell, diff_fingerprints, fingerprints, ingest, read_bank,
+                         validate)
+from question_bank import BANK_FILE, QuestionBank
+
+openpyxl = pytest.importorskip('openpyxl')
+
+HEADER = ['序号', '题型', '题干', '选项A', '选项B', '选项C', '选项D', '选项E', '参考答案']
+ROWS = [
+    [1, '单选题', '单选题干', '甲', '乙', '丙', '丁', None, 'b'],
+    [2, '多选题', '多选题干', '甲', '乙', '丙', None, None, 'A C'],
+    [3, '判断题', '判断题干', '正确', '错误', None, None, None, 'A'],
+    [4, '单选题', '答案超出选项', '甲', '乙', None, None, None, 'D'],
+    [5, '填空题', '未知题型', None, None, None, None, None, 'A'],
+    [None] * 9,
+]
+
+
+def write_sheet(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(['2025年理论题库'])  # 表头之前的标题行
+    sheet.append(HEADER)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def test_read_bank(tmp_path):
+    path = tmp_path / 'bank.xlsx'
+    write_sheet(path, ROWS)
+    questions, errors = read_bank(str(path))
+    assert questions['single_choice'] == [{'text': '单选题干', 'options': ['甲', '乙', '丙', '丁'], 'answer': 'B'}]
+    assert questions['multiple_choice'][0]['answer'] == 'AC'
+    assert questions['judgment'][0]['options'] == ['正确', '错误']
+    assert len(errors) == 2
+    assert '第 6 行' in errors[0] and '第 7 行' in errors[1]
+
+
+def test_missing_header(tmp_path):
+    path = tmp_path / 'bank.xlsx'
+    workbook = openpyxl.Workbook()
+    workbook.active.append(['没有表头'])
+    workbook.save(path)
+    with pytest.raises(IngestError):
+        read_bank(str(path))
+    with pytest.raises(IngestError):
+        list(read_bank(str(tmp_path / 'bank.csv')))
+
+
+@pytest.mark.parametrize('question_type, options, answer, ok', [
+    ('single_choice', ['甲', '乙'], 'A', True),
+    ('single_choice', ['甲', '乙'], 'AB', False),
+    ('multiple_choice', ['甲', '乙', '丙'], 'A', False),
+    ('multiple_choice', ['甲', '乙', '丙'], 'AA', False),
+    ('judgment', ['正确', '错误', '不确定'], 'A', False),
+    ('single_choice', ['甲', '乙'], '', False),
+])
+def test_validate(question_type, options, answer, ok):
+    error = validate(question_type, {'text': '题干', 'options': options, 'answer': answer})
+    assert (error is None) is ok
+
+
+def test_clean_cell():
+    assert clean_cell(3.0) == '3'
+    assert clean_cell('  ') is None
+    assert clean_cell(None) is None
+
+
+def test_ingest_writes_bank_and_skips_unchanged(tmp_path, capsys):
+    source = tmp_path / 'bank.xlsx'
+    write_sheet(source, ROWS)
+    assert ingest(str(source), str(tmp_path)) is True
+    bank = QuestionBank.open(str(tmp_path / BANK_FILE))
+    assert bank.counts() == {'single_choice': 1, 'multiple_choice': 1, 'judgment': 1}
+    bank.close()
+    assert json.loads((tmp_path / 'judgment.json').read_text(encoding='utf-8'))[0]['text'] == '判断题干'
+
+    assert ingest(str(source), str(tmp_path)) is False
+    assert '跳过重建' in capsys.readouterr().out
+
+    rows = [list(row) for row in ROWS]
+    rows[0][8] = 'C'
+    rows.append([7, '判断题', '新增判断', '正确', '错误', None, None, None, 'B'])
+    write_sheet(source, rows)
+    assert ingest(str(source), str(tmp_path), dry_run=True) is False
+    output = capsys.readouterr().out
+    assert '新增: 1道' in output and '修改: 1道' in output
+
+
+def test_diff_fingerprints():
+    old = fingerprints({'judgment': [{'text': '甲', 'options': ['正确', '错误'], 'answer': 'A'},
+                                     {'text': '乙', 'options': ['正确', '错误'], 'answer': 'A'}]})
+    new = fingerprints({'judgment': [{'text': '甲', 'options': ['正确', '错误'], 'answer': 'B'},
+                                     {'text': '丙', 'options': ['正确', '错误'], 'answer': 'A'}]})
+    assert diff_fingerprints(old, new) == {'added': ['judgment:丙'], 'removed': ['judgment:乙'],
+                                           'changed': ['judgment:甲']}
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""运行指标：分线程计数、Prometheus 文本格式、/metrics、会话大小抽样"""
+
+import threading
+
+import metrics
+from session_store import MemorySessionStore, SQLiteSessionStore
+
+
+def session_bytes_count():
+    return sum(sum(counts[:-1]) for counts in metrics.SESSION_BYTES.values().values())
+
+
+def test_counter_merges_thread_shards():
+    counter = metrics.Counter('test_total', '测试', ('kind',), registry=None)
+
+    def work():
+        for _ in range(1000):
+            counter.inc('a')
+
+    threads = [threading.Thread(target=work) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc('b', amount=5)
+    assert counter.values() == {('a',): 20000, ('b',): 5}
+
+
+def test_histogram_render():
+    registry = metrics.Registry()
+    histogram = metrics.Histogram('test_seconds', '耗时', ('route',), buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, '/x')
+    text = registry.render()
+    assert '# TYPE test_seconds histogram' in text
+    assert 'test_seconds_bucket{route="/x",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{route="/x",le="1"} 2' in text
+    assert 'test_seconds_bucket{route="/x",le="+Inf"} 3' in text
+    assert 'test_seconds_count{route="/x"} 3' in text
+    assert 'test_seconds_sum{route="/x"} 5.55' in text
+
+
+def test_label_escaping():
+    assert metrics._labels(('q',), ['a"b\\c\n']) == '{q="a\\"b\\\\c\\n"}'
+
+
+def test_grade_outcome():
+    assert metrics.grade_outcome(True) == 'correct'
+    assert metrics.grade_outcome(False, 0.5) == 'partial'
+    assert metrics.grade_outcome(False, 0.0, invalid=True) == 'invalid'
+    assert metrics.grade_outcome(False) == 'wrong'
+
+
+def test_metrics_endpoint_counts_routes():
+    from web_exam_system import app
+    client = app.test_client()
+    client.get('/orderings')
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'exam_http_requests_total{route="/orderings",method="GET",status="200"}' in body
+    assert 'exam_http_request_duration_seconds_bucket{route="/orderings",method="GET",le="+Inf"}' in body
+
+
+def test_memory_store_samples_session_size():
+    store = MemorySessionStore()
+    before = session_bytes_count()
+    for n in range(store.SIZE_SAMPLE_INTERVAL * 2):
+        store.save(f's{n}', {'n': n})
+    assert session_bytes_count() - before == 2
+    assert store.get('s5') == {'n': 5}
+
+
+def test_sqlite_store_measures_every_save(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / 'sessions.db'))
+    before = session_bytes_count()
+    for n in range(3):
+        store.save(f's{n}', {'n': n})
+    assert session_bytes_count() - before == 3
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""模拟试卷：文本解析、试卷模式的按大题计分"""
+
+import pytest
+
+from ordering import get_library
+from mock_papers import PaperFormatError, parse_paper, section_type
+
+SAMPLE = """\
+=== 第9套测试题 ===
+
+一、单项选择题（共2题，每题1分，共2分）
+从下列各题的四个选项中选择一个最佳答案。
+1. 第一题题干
+   A. 甲
+   B. 乙
+   C. 丙
+   D. 丁
+   答案：B
+2. 第二题题干
+续行
+   A. 甲
+   B. 乙
+   答案：A
+
+二、判断题（共2题，每题0.5分）
+1. 判断一
+   答案：√
+2. 判断二
+   答案：错
+
+三、多项选择题（每题2分）
+1. 多选一
+   A. 甲
+   B. 乙
+   C. 丙
+   答案：AC
+2. 缺少答案的题
+   A. 甲
+   B. 乙
+"""
+
+
+def test_parse_sections_and_answers():
+    paper = parse_paper(SAMPLE.splitlines(), '第9套测试题.txt')
+    assert paper['title'] == '第9套测试题'
+    assert [(s['type'], s['points']) for s in paper['sections']] == [
+        ('single_choice', 1.0), ('judgment', 0.5), ('multiple_choice', 2.0)]
+    single, judgment, multiple = (s['questions'] for s in paper['sections'])
+    assert single[0] == {'text': '第一题题干', 'options': ['甲', '乙', '丙', '丁'], 'answer': 'B'}
+    assert single[1]['text'] == '第二题题干续行'
+    assert [q['answer'] for q in judgment] == ['A', 'B']
+    assert judgment[0]['options'] == ['正确', '错误']
+    assert multiple[0]['answer'] == 'AC'
+    # 缺少答案的题被跳过并报告
+    assert len(multiple) == 1
+    assert len(paper['errors']) == 1 and '第 2 题' in paper['errors'][0]
+
+
+def test_parse_without_sections():
+    with pytest.raises(PaperFormatError):
+        parse_paper(['只有一行文字'], 'x.txt')
+
+
+def test_section_type():
+    assert section_type('多项选择题') == 'multiple_choice'
+    assert section_type('判断题') == 'judgment'
+    assert section_type('简答题') is None
+
+
+@pytest.fixture
+def paper():
+    library = get_library()
+    summaries = library.summaries()
+    if not summaries:
+        pytest.skip('没有试卷文件')
+    return library.get(summaries[0]['paper_id'])
+
+
+@pytest.fixture
+def client():
+    from web_exam_system import app
+    return app.test_client()
+
+
+def section_of(result, paper, number):
+    return result['sections'][paper.locate(number)[0]]
+
+
+def test_paper_repeat_submit_counts_once(client, paper):
+    assert client.post('/paper/start', json={'paper_id': paper.id}).status_code == 200
+    question = client.get('/paper/get_question').get_json()
+    number = question['question_number']
+    answer = paper.bank.questions[paper.locate(number)[1]][paper.locate(number)[2]]['answer']
+
+    first = client.post('/paper/submit_answer', json={'answer': answer}).get_json()
+    assert first['is_correct'] and first['counted']
+    for _ in range(3):
+        again = client.post('/paper/submit_answer', json={'answer': answer, 'question_number': number}).get_json()
+        assert again['is_correct'] and not again['counted']
+    section = section_of(again, paper, number)
+    assert (section['answered'], section['correct']) == (1, 1)
+
+    result = client.get('/paper/result').get_json()
+    assert result['score'] == paper.sections[paper.locate(number)[0]]['points']
+
+
+def test_paper_routes_share_the_paper_ordering(client, paper):
+    client.post('/start_exam', json={'ordering': 'random'})
+    assert client.get('/paper/get_question').status_code == 400
+    assert client.post('/paper/submit_answer', json={'answer': 'A'}).status_code == 400
+    assert client.get('/paper/result').status_code == 400
+
+    # /start_exam 开始的试卷和 /paper/* 是同一个会话状态
+    assert client.post('/start_exam', json={'ordering': 'paper', 'paper_id': paper.id}).status_code == 200
+    assert client.get('/get_question').get_json()['question_number'] == 1
+    assert client.get('/paper/get_question').get_json()['question_number'] == 2
+    client.post('/submit_answer', json={'answer': 'A', 'question_number': 1})
+    client.post('/paper/submit_answer', json={'answer': 'A', 'question_number': 1})
+    result = client.get('/paper/result').get_json()
+    assert sum(s['answered'] for s in result['sections']) == 1
+    assert result['max_score'] == paper.max_score()
+
+
+def test_papers_list(client, paper):
+    papers = client.get('/papers').get_json()['papers']
+    assert paper.id in [p['paper_id'] for p in papers]
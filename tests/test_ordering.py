@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""出题顺序策略"""
+
+import pytest
+
+from ordering import get_library
+from web_exam_system import exam_system
+
+
+def start(data):
+    session = {}
+    body, status = exam_system.start(session, data)
+    assert status == 200, body
+    return session
+
+
+@pytest.mark.parametrize('name', ['sequential', 'shuffled'])
+def test_orderings_serve_every_question_once(name):
+    session = start({'ordering': name})
+    numbers = []
+    while True:
+        reply, status = exam_system.next_question(session)
+        if isinstance(reply, dict):
+            assert reply['status'] == 'error'
+            break
+        numbers.append(reply.items[0][2]['question_number'])
+    assert sorted(numbers) == list(range(1, exam_system.bank.record_count + 1))
+
+
+def test_sequential_follows_type_order():
+    session = start({'ordering': 'sequential', 'type_order': ['judgment', 'single_choice', 'multiple_choice']})
+    reply, _ = exam_system.next_question(session)
+    assert reply.items[0][0] == 'judgment'
+
+
+def test_random_reshuffles_after_a_round():
+    session = start({'ordering': 'random'})
+    total = exam_system.bank.record_count
+    for _ in range(total + 5):
+        reply, status = exam_system.next_question(session)
+        assert status == 200 and not isinstance(reply, dict)
+
+
+@pytest.fixture
+def paper():
+    summaries = get_library().summaries()
+    if not summaries:
+        pytest.skip('没有试卷文件')
+    return get_library().get(summaries[0]['paper_id'])
+
+
+def test_paper_ordering_counts_each_question_once(paper):
+    session = start({'ordering': 'paper', 'paper_id': paper.id})
+    reply, _ = exam_system.next_question(session)
+    question_type, q_idx, fields = reply.items[0]
+    number = fields['question_number']
+    answer = paper.bank.questions[question_type][q_idx]['answer']
+
+    first, _ = exam_system.submit(session, {'answer': answer})
+    assert first['counted']
+    for _ in range(3):
+        again, _ = exam_system.submit(session, {'answer': answer, 'question_number': number})
+        assert not again['counted']
+    section = again['sections'][fields['section_index']]
+    assert (section['answered'], section['correct']) == (1, 1)
+
+    # 另一题照常计分
+    reply, _ = exam_system.next_question(session)
+    second, _ = exam_system.submit(session, {'answer': 'Z'})
+    assert second['counted']
+    assert sum(s['answered'] for s in second['sections']) == 2
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""按请求剖析：配置、触发条件、结果文件、汇总、Flask 钩子"""
+
+import json
+import os
+import time
+
+import pytest
+
+import profiling
+from profiling import RequestProfiler
+
+
+def work():
+    return sum(i * i for i in range(20000))
+
+
+def profile_one(profiler, route='/jump_to', **info):
+    run = profiler.start(route)
+    assert run is not None
+    work()
+    return profiler.finish(run, **info)
+
+
+def test_from_config(monkeypatch, tmp_path):
+    for name in ('EXAM_PROFILE', 'EXAM_PROFILE_DIR', 'EXAM_PROFILE_RATE', 'EXAM_PROFILE_ROUTES'):
+        monkeypatch.delenv(name, raising=False)
+    assert profiling.from_config({}) is None
+    assert profiling.from_config({'EXAM_PROFILE': 'off'}) is None
+
+    profiler = profiling.from_config({'EXAM_PROFILE': 'yes', 'EXAM_PROFILE_DIR': str(tmp_path / 'p'),
+                                      'EXAM_PROFILE_RATE': '5', 'EXAM_PROFILE_ROUTES': '/a, ,/b'})
+    assert profiler.rate == 1.0 and profiler.routes == {'/a', '/b'} and profiler.mode == 'cprofile'
+    assert os.path.isdir(tmp_path / 'p')
+    # 环境变量优先于 app.config
+    monkeypatch.setenv('EXAM_PROFILE_RATE', '-1')
+    assert profiling.from_config({'EXAM_PROFILE': '1', 'EXAM_PROFILE_DIR': str(tmp_path)}).rate == 0.0
+    with pytest.raises(ValueError):
+        profiling.from_config({'EXAM_PROFILE': '1', 'EXAM_PROFILE_DIR': str(tmp_path), 'EXAM_PROFILE_MODE': 'x'})
+
+
+def test_trigger_rules(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), routes=['/jump_to'], token='secret')
+    assert profiler.start('/jump_to') is None              # 没有触发头、不采样
+    assert profiler.start('/jump_to', 'wrong') is None     # 口令不对
+    assert profiler.start('/get_stats', 'secret') is None  # 不在接口列表中
+    run = profiler.start('/jump_to', 'secret')
+    assert run is not None and run.reason == 'header'
+    # 同一时间只剖析一个请求
+    assert profiler.start('/jump_to', 'secret') is None
+    profiler.finish(run)
+    run = profiler.start('/jump_to', 'secret')
+    assert run is not None
+    profiler.finish(run)
+
+
+def test_max_profiles(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), rate=1.0, max_profiles=2)
+    for _ in range(2):
+        profile_one(profiler)
+    assert profiler.start('/jump_to') is None
+
+
+def test_cprofile_output_and_aggregate(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), rate=1.0)
+    path = profile_one(profiler, '/jump_to', status=200, method='GET')
+    profile_one(profiler, '/get_question')
+    assert path.endswith('-jump_to.prof') and os.path.exists(path)
+    with open(path[:-len('.prof')] + '.json', encoding='utf-8') as f:
+        meta = json.load(f)
+    assert meta['route'] == '/jump_to' and meta['status'] == 200 and meta['reason'] == 'sample'
+    assert meta['file'] == os.path.basename(path)
+
+    profiles = profiling.load_profiles(str(tmp_path), '/jump_to')
+    assert len(profiles) == 1
+    functions = profiling.aggregate(profiling.load_profiles(str(tmp_path)))
+    label = next(name for name in functions if name.endswith('(work)'))
+    assert functions[label]['calls'] == 2
+    assert functions[label]['cumtime'] >= functions[label]['tottime'] > 0
+
+
+def test_sample_mode_writes_folded_stacks(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), rate=1.0, mode='sample', interval=0.001)
+    run = profiler.start('/slow')
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        work()
+    path = profiler.finish(run)
+    assert path.endswith('.folded')
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert lines and all(line.rpartition(' ')[2].isdigit() for line in lines)
+    functions = profiling.aggregate(profiling.load_profiles(str(tmp_path)), 'cumtime')
+    assert any(name.endswith('(work)') for name in functions)
+
+
+def test_write_failure_releases_lock(tmp_path, capsys):
+    profiler = RequestProfiler(str(tmp_path), rate=1.0)
+    run = profiler.start('/jump_to')
+    profiler.directory = str(tmp_path / 'gone')
+    assert profiler.finish(run) is None
+    assert '剖析结果写入失败' in capsys.readouterr().out
+    profiler.directory = str(tmp_path)
+    assert profile_one(profiler) is not None
+
+
+def test_flask_hooks_profile_triggered_requests(monkeypatch, tmp_path):
+    from web_exam_system import create_app
+
+    monkeypatch.setenv('EXAM_PROFILE', '1')
+    monkeypatch.setenv('EXAM_PROFILE_DIR', str(tmp_path))
+    monkeypatch.delenv('EXAM_PROFILE_RATE', raising=False)
+    monkeypatch.delenv('EXAM_PROFILE_ROUTES', raising=False)
+    monkeypatch.delenv('EXAM_PROFILE_TOKEN', raising=False)
+    app = create_app('sequential')
+    assert app.extensions['exam_profiler'].directory == str(tmp_path)
+
+    client = app.test_client()
+    client.get('/get_stats')
+    assert profiling.load_profiles(str(tmp_path)) == []
+    client.get('/get_stats', headers={profiling.TRIGGER_HEADER: '1'})
+    [(meta, _)] = profiling.load_profiles(str(tmp_path))
+    assert (meta['route'], meta['method'], meta['status'], meta['reason']) == ('/get_stats', 'GET', 200, 'header')
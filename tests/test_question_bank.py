@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""编译后的 mmap 题库：与源 JSON 一致、自动重新编译、格式校验、加载失败时报错"""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from question_bank import (BANK_FILE, BANK_SOURCES, QuestionBank, QuestionBankError, answer_to_mask,
+                           compile_questions, load_bank, mask_to_answer, normalize_record, read_sources)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = {
+    'single_choice': [{'text': '单选一', 'options': ['甲', '乙', '丙', '丁'], 'answer': 'C'}],
+    'multiple_choice': [{'text': '多选一', 'options': ['甲', '乙', '丙', '丁', '戊'], 'answer': 'ACE'},
+                        {'text': '多选二', 'options': ['甲', '乙'], 'answer': 'AB'}],
+    'judgment': [{'text': '判断一', 'options': ['正确', '错误'], 'answer': 'B'}],
+}
+
+
+def test_round_trip():
+    bank = QuestionBank(compile_questions(SAMPLE))
+    assert bank.record_count == 4
+    assert bank.counts() == {'single_choice': 1, 'multiple_choice': 2, 'judgment': 1}
+    question = bank.questions['multiple_choice'][0]
+    assert question['text'] == '多选一'
+    assert question['options'] == ['甲', '乙', '丙', '丁', '戊']
+    assert question['answer'] == 'ACE'
+    assert question['id'] == 1
+    assert bank.questions['multiple_choice'][-1]['text'] == '多选二'
+    assert bank.answer_masks() == bytes([0b100, 0b10101, 0b11, 0b10])
+    assert bank.locate_id(3) == ('judgment', 0)
+    assert bank.question_id('judgment', 0) == 3
+    with pytest.raises(IndexError):
+        bank.questions['single_choice'][1]
+
+
+def test_rejects_bad_files():
+    with pytest.raises(QuestionBankError):
+        QuestionBank(b'xx')
+    with pytest.raises(QuestionBankError):
+        QuestionBank(b'NOPE' + bytes(64))
+
+
+def test_answer_masks():
+    assert answer_to_mask('cA') == 0b101
+    assert mask_to_answer(0b10110) == 'BCE'
+
+
+def test_normalize_pandas_record():
+    record = {'Unnamed: 1': '题干', 'Unnamed: 2': '甲', 'Unnamed: 3': '乙', 'Unnamed: 4': None, 'Unnamed: 7': 'B'}
+    assert normalize_record(record) == {'text': '题干', 'options': ['甲', '乙'], 'answer': 'B'}
+
+
+def test_loaded_bank_matches_json_sources():
+    bank = load_bank(ROOT)
+    sources = read_sources(ROOT)
+    assert bank.shared
+    for question_type, questions in sources.items():
+        assert len(bank.questions[question_type]) == len(questions)
+        for loaded, source in zip(bank.questions[question_type], map(normalize_record, questions)):
+            assert loaded['text'] == source['text']
+            assert loaded['answer'] == mask_to_answer(answer_to_mask(source['answer']))
+
+
+def test_recompiles_when_sources_change(tmp_path):
+    for _, filename in BANK_SOURCES:
+        shutil.copy(os.path.join(ROOT, filename), tmp_path / filename)
+    bank = load_bank(str(tmp_path))
+    count = bank.record_count
+    bank.close()
+    assert (tmp_path / BANK_FILE).exists()
+
+    path = tmp_path / BANK_SOURCES[-1][1]
+    questions = json.loads(path.read_text(encoding='utf-8'))
+    questions.append(questions[0])
+    path.write_text(json.dumps(questions, ensure_ascii=False), encoding='utf-8')
+    stamp = os.path.getmtime(tmp_path / BANK_FILE) + 10
+    os.utime(path, (stamp, stamp))
+    assert load_bank(str(tmp_path)).record_count == count + 1
+
+
+def test_web_system_fails_fast_and_reload_keeps_bank(monkeypatch):
+    import web_exam_system
+
+    def broken(base_dir='.'):
+        raise QuestionBankError('题库文件未找到: question_bank.bin')
+
+    monkeypatch.setattr(web_exam_system, 'load_bank', broken)
+    with pytest.raises(QuestionBankError):
+        web_exam_system.WebExamSystem()
+
+    system = web_exam_system.exam_system
+    bank, payloads, search_index = system.bank, system.payloads, system.search_index
+    with pytest.raises(QuestionBankError):
+        system.load_questions()
+    assert system.bank is bank and system.payloads is payloads and system.search_index is search_index
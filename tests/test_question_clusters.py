@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""近似重复题目检测：MinHash 签名、LSH 分桶与复核、结果文件、按簇合并作答统计"""
+
+import os
+
+import pytest
+
+import question_clusters
+from answer_log import connect
+from question_clusters import Item, MinHasher, find_clusters, jaccard, shingles
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ITEMS = [
+    Item(None, 0, 'single_choice', '职业道德是指从事一定职业劳动的人们在特定的工作中形成的行为规范的总和'),
+    Item('paper:1', 3, 'single_choice', '职业道德是指从事一定职业劳动的人们，在特定的工作中形成的行为规范的总和。'),
+    Item('bank_v2.xlsx', 7, 'single_choice', '职业道德是指从事某种职业劳动的人们在特定的工作中形成的行为规范的总和'),
+    # 题干相同但题型不同：不合并
+    Item(None, 1, 'judgment', '职业道德是指从事一定职业劳动的人们在特定的工作中形成的行为规范的总和'),
+    Item(None, 2, 'single_choice', '决策树是一种常用的有监督分类方法'),
+    Item('paper:2', 0, 'single_choice', '决策树是一种常用的有监督分类方法'),
+    Item(None, 4, 'single_choice', '完全不同的另一道题目内容'),
+    Item(None, 5, 'single_choice', '，。'),
+]
+
+
+def test_shingles_and_jaccard():
+    assert shingles('决策树') == shingles('决 策 树！')
+    assert len(shingles('决策树算法')) == 3
+    assert shingles('') == set()
+    a, b = shingles('决策树算法'), shingles('决策树模型')
+    assert jaccard(a, b) == pytest.approx(1 / 5)
+    assert jaccard(set(), set()) == 1.0
+
+
+def test_pure_python_signature_matches_numpy(monkeypatch):
+    values = shingles('随机森林由多棵决策树组成')
+    fast = MinHasher().signature(values)
+    monkeypatch.setattr(question_clusters, 'np', None)
+    assert MinHasher().signature(values) == fast
+    assert MinHasher().signature(set()) == (0,) * question_clusters.NUM_PERM
+
+
+def test_find_clusters_groups_near_duplicates_by_type():
+    clusters, info = find_clusters(ITEMS)
+    assert clusters == [[0, 1, 2], [4, 5]]
+    assert info['items'] == len(ITEMS)
+    assert info['distinct_stems'] == len(ITEMS) - 2  # 0/1 和 4/5 规范化后相同
+    assert info['merged_pairs'] == 1  # 只有措辞不同的 2 需要复核合并
+
+
+def test_threshold_splits_reworded_questions():
+    clusters, _ = find_clusters(ITEMS, threshold=0.99)
+    assert clusters == [[0, 1], [4, 5]]
+
+
+def test_cluster_file_and_merged_stats(tmp_path):
+    clusters, info = find_clusters(ITEMS)
+    path = str(tmp_path / 'clusters.json')
+    question_clusters.save_clusters(path, ITEMS, clusters, info, 0.7)
+    cluster_map = question_clusters.load_cluster_map(path)
+    assert cluster_map[(None, 0)] == cluster_map[('paper:1', 3)] == 0
+    assert cluster_map[('paper:2', 0)] == 1
+    assert (None, 4) not in cluster_map
+
+    conn = connect(str(tmp_path / 'answers.db'))
+    conn.executemany('INSERT INTO answers (learner, source, question_id, answer, correct, ts) VALUES (?, ?, ?, ?, ?, ?)',
+                     [('alice', None, 0, 'A', 1, 1.0), ('alice', 'paper:1', 3, 'B', 0, 2.0),
+                      ('alice', 'paper:2', 0, 'A', 1, 3.0), ('alice', None, 4, 'A', 1, 4.0),
+                      ('bob', None, 0, 'A', 1, 5.0)])
+    merged = question_clusters.merge_stats(conn, 'alice', cluster_map)
+    assert merged == [
+        {'cluster': 0, 'answered': 2, 'correct': 1, 'sources': ['paper:1', '题库'], 'accuracy': 50.0},
+        {'cluster': 1, 'answered': 1, 'correct': 1, 'sources': ['paper:2'], 'accuracy': 100.0},
+    ]
+
+
+def test_collect_items_covers_bank_and_papers():
+    items = question_clusters.collect_items(ROOT)
+    sources = {item.source for item in items}
+    assert None in sources
+    assert any(source and source.startswith('paper:') for source in sources)
+    bank_ids = [item.question_id for item in items if item.source is None]
+    assert bank_ids == list(range(len(bank_ids)))
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""题号索引：题号与 (题型, 题内下标) 互相转换"""
+
+import pytest
+
+from question_bank import QuestionIndex
+from web_exam_system import exam_system
+
+
+def test_locate_and_number_of_are_inverse():
+    index = QuestionIndex({'a': 3, 'b': 0, 'c': 2}, ('a', 'b', 'c'))
+    assert index.total == 5
+    assert [index.locate(n) for n in range(1, 6)] == [(0, 0), (0, 1), (0, 2), (2, 0), (2, 1)]
+    assert [index.number_of(t, i) for t, i in (('a', 0), ('a', 2), ('c', 0), ('c', 1))] == [1, 3, 4, 5]
+
+
+@pytest.mark.parametrize('number', [0, 6, -1])
+def test_locate_out_of_range(number):
+    with pytest.raises(IndexError):
+        QuestionIndex({'a': 3, 'c': 2}, ('a', 'c')).locate(number)
+
+
+def test_bank_indexes_follow_type_order():
+    bank = exam_system.bank
+    order = ('judgment', 'single_choice', 'multiple_choice')
+    index = bank.index(order)
+    assert index is bank.index(list(order))  # 同一顺序只构建一次
+    assert index.locate(1) == (0, 0)
+    judgment = len(bank.questions['judgment'])
+    assert index.locate(judgment + 1) == (1, 0)
+    for number in range(1, index.total + 1, 37):
+        type_idx, q_idx = index.locate(number)
+        assert index.number_of(order[type_idx], q_idx) == number
+
+
+def test_global_ids_cover_the_bank():
+    bank = exam_system.bank
+    seen = {bank.question_id(*bank.locate_id(i)) for i in range(bank.record_count)}
+    assert seen == set(range(bank.record_count))
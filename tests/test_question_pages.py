@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""批量取题 /get_questions 与预取题目的作答"""
+
+import pytest
+
+from web_exam_system import PAGE_SIZE, PAGE_SIZE_MAX, app
+
+
+@pytest.fixture
+def client():
+    client = app.test_client()
+    assert client.post('/start_exam', json={'ordering': 'sequential'}).status_code == 200
+    return client
+
+
+def numbers(page):
+    return [q['question_number'] for q in page['questions']]
+
+
+def test_pages_continue_from_the_pointer(client):
+    first = client.get('/get_questions?count=3').get_json()
+    assert first['start'] == 1 and numbers(first) == [1, 2, 3]
+    assert numbers(client.get('/get_questions?count=2').get_json()) == [4, 5]
+    assert client.get('/get_question').get_json()['question_number'] == 6
+
+
+def test_explicit_start_and_default_count(client):
+    page = client.get('/get_questions?start=10').get_json()
+    assert numbers(page) == list(range(10, 10 + PAGE_SIZE))
+    assert page['total_count'] == page['questions'][0]['total_count']
+
+
+def test_count_is_clamped(client):
+    assert len(client.get('/get_questions?count=1000').get_json()['questions']) == PAGE_SIZE_MAX
+    assert len(client.get('/get_questions?count=0').get_json()['questions']) == 1
+
+
+def test_last_page_and_bad_parameters(client):
+    total = client.get('/get_questions?count=1').get_json()['total_count']
+    last = client.get(f'/get_questions?start={total - 1}&count=5').get_json()
+    assert numbers(last) == [total - 1, total]
+    assert client.get(f'/get_questions?start={total + 1}').get_json()['status'] == 'error'
+    assert client.get('/get_questions?start=0').status_code == 400
+    assert client.get('/get_questions?count=abc').status_code == 400
+
+
+def test_unnumbered_orderings_ignore_start():
+    client = app.test_client()
+    client.post('/start_exam', json={'ordering': 'shuffled'})
+    page = client.get('/get_questions?start=100&count=5').get_json()
+    assert 'start' not in page and len(page['questions']) == 5
+    assert len(set(numbers(page))) == 5
+
+
+def test_answering_prefetched_questions(client):
+    page = client.get('/get_questions?count=3').get_json()
+    for question in page['questions']:
+        result = client.post('/submit_answer', json={'answer': question['correct_answer'],
+                                                     'question_number': question['question_number']}).get_json()
+        assert result['is_correct']
+    stats = client.get('/get_stats').get_json()
+    assert stats['answered_questions'] == 3 and stats['correct_answers'] == 3
+    assert client.post('/submit_answer', json={'answer': 'A', 'question_number': 10 ** 6}).status_code == 400
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""预渲染题目响应：拼接后的 JSON、强 ETag、304"""
+
+import gzip
+import json
+
+from question_bank import format_options
+from question_payloads import QuestionPayloadCache, encoded_etag
+from web_exam_system import app, exam_system
+
+QUESTIONS = {
+    'single_choice': [{'id': 0, 'text': '单选"题"\n', 'options': ['甲', '乙'], 'answer': 'A'}],
+    'judgment': [{'id': 1, 'text': '判断', 'options': ['正确', '错误'], 'answer': 'B'}],
+}
+
+
+def test_body_is_the_full_json():
+    cache = QuestionPayloadCache(QUESTIONS)
+    body = json.loads(cache.body('single_choice', 0, question_number=3, total_count=9))
+    question = QUESTIONS['single_choice'][0]
+    assert body == {'status': 'success', 'question_id': 0, 'question_type': 'single_choice',
+                    'question_text': question['text'], 'options': format_options(question),
+                    'correct_answer': 'A', 'question_number': 3, 'total_count': 9}
+
+
+def test_etag_depends_on_question_and_fields():
+    cache = QuestionPayloadCache(QUESTIONS)
+    etag = cache.etag('single_choice', 0, question_number=3)
+    assert etag == cache.etag('single_choice', 0, question_number=3)
+    assert etag != cache.etag('single_choice', 0, question_number=4)
+    assert etag != cache.etag('judgment', 0, question_number=3)
+    assert encoded_etag(etag, 'gzip') != etag
+
+
+def test_encoded_body_matches_identity():
+    cache = QuestionPayloadCache(exam_system.questions)
+    identity = cache.encoded_body('multiple_choice', 2, 'identity', question_number=1)
+    assert gzip.decompress(cache.encoded_body('multiple_choice', 2, 'gzip', question_number=1)) == identity
+
+
+def test_page_body_and_etag():
+    cache = QuestionPayloadCache(QUESTIONS)
+    items = [('single_choice', 0, {'question_number': 1}), ('judgment', 0, {'question_number': 2})]
+    page = json.loads(cache.page_body(items, 'identity', start=1, count=2))
+    assert page['start'] == 1 and page['count'] == 2
+    assert [q['question_number'] for q in page['questions']] == [1, 2]
+    assert cache.page_etag(items, start=1) != cache.page_etag(items, start=2)
+
+
+def test_jump_to_returns_304_for_matching_etag():
+    client = app.test_client()
+    client.post('/start_exam', json={'ordering': 'sequential'})
+    first = client.get('/jump_to?question_number=5')
+    assert first.status_code == 200 and first.headers['ETag']
+    assert first.headers['Cache-Control'] == 'no-cache'
+    again = client.get('/jump_to?question_number=5', headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304 and again.data == b''
+    other = client.get('/jump_to?question_number=6', headers={'If-None-Match': first.headers['ETag']})
+    assert other.status_code == 200
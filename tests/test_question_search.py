@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""全文搜索：规范化、二元组倒排索引、排序与容错、/search 接口"""
+
+from question_bank import QuestionBank, compile_questions
+from question_search import SearchIndex, grams, normalize, snippet
+
+SAMPLE = {
+    'single_choice': [
+        {'text': '决策树是一种常用的分类方法。', 'options': ['正确', '错误', '不确定', '都不对'], 'answer': 'A'},
+        {'text': '下列属于监督学习的是（）', 'options': ['聚类', '决策树', '降维', '关联规则'], 'answer': 'B'},
+        {'text': 'ＳＱＬ 语句中用于查询的是', 'options': ['SELECT', 'DROP'], 'answer': 'A'},
+    ],
+    'judgment': [
+        {'text': '随机森林由多棵决策树组成，比单棵决策树更稳定。', 'options': ['正确', '错误'], 'answer': 'A'},
+    ],
+}
+
+
+def make_index():
+    return SearchIndex(QuestionBank(compile_questions(SAMPLE)))
+
+
+def test_normalize_and_grams():
+    assert normalize('ＳＱＬ 语句，Select!') == 'sql语句select'
+    assert grams('决策树') == ['决策', '策树']
+    assert grams('树') == ['树']
+    assert grams('') == []
+
+
+def test_exact_matches_rank_stem_before_options():
+    hits = make_index().search('决策树')
+    assert [hit['question_id'] for hit in hits] == [0, 3, 1]
+    assert hits[0]['score'] == 1.0
+    assert [hit['in_options'] for hit in hits] == [False, False, True]
+    assert hits[1]['question_type'] == 'judgment'
+
+
+def test_fullwidth_and_case_insensitive():
+    assert [hit['question_id'] for hit in make_index().search('sql')] == [2]
+    assert [hit['question_id'] for hit in make_index().search('select')] == [2]
+
+
+def test_typo_falls_back_to_partial_matches():
+    # “决策林”只命中“决策”：按命中一半的二元组返回
+    hits = make_index().search('决策林')
+    assert hits and all(hit['score'] == 0.5 for hit in hits)
+    assert make_index().search('完全无关的词') == []
+    assert make_index().search('  ，。 ') == []
+
+
+def test_limit():
+    assert len(make_index().search('决策树', limit=1)) == 1
+
+
+def test_snippet():
+    raw = '前' * 30 + '决策树' + '后' * 30
+    text = snippet(raw, '决策树', radius=5)
+    assert text == '…' + '前' * 5 + '决策树' + '后' * 5 + '…'
+    assert snippet('短题干', '找不到') == '短题干'
+
+
+def test_search_route_adds_question_numbers():
+    from web_exam_system_v2 import app
+
+    client = app.test_client()
+    assert client.get('/search?q=').status_code == 400
+    client.post('/start_exam', json={'ordering': 'by_type', 'question_type': 'judgment'})
+    body = client.get('/search?q=的&limit=100').get_json()
+    assert body['status'] == 'success' and body['count'] == len(body['results']) > 0
+    for hit in body['results']:
+        if hit['question_type'] == 'judgment':
+            number = hit['question_number']
+            jumped = client.get(f"/jump_to?question_id={hit['question_id']}").get_json()
+            assert jumped['question_number'] == number
+            assert jumped['question_id'] == hit['question_id']
+        else:
+            assert hit['question_number'] is None
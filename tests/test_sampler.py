@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""无重复随机抽题：Feistel 排列是双射且可逆、加权排列、权重校验、本地抽题器"""
+
+import pytest
+
+import sampler
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 5, 17, 480, 1000])
+def test_feistel_is_a_bijection_with_inverse(n):
+    perm = sampler.FeistelPermutation(n, seed=12345)
+    values = [perm[i] for i in range(n)]
+    assert sorted(values) == list(range(n))
+    assert all(perm.position(v) == i for i, v in enumerate(values))
+    with pytest.raises(IndexError):
+        perm[n]
+    with pytest.raises(IndexError):
+        perm.position(-1)
+
+
+def test_feistel_depends_only_on_seed():
+    first = [sampler.FeistelPermutation(200, 7)[i] for i in range(200)]
+    again = [sampler.FeistelPermutation(200, 7)[i] for i in range(200)]
+    other = [sampler.FeistelPermutation(200, 8)[i] for i in range(200)]
+    assert first == again
+    assert first != other
+    assert first != list(range(200))
+
+
+def test_weighted_permutation_favours_heavy_types():
+    counts = (('single_choice', 100), ('judgment', 100))
+    heavy_first = 0
+    for seed in range(20):
+        perm = sampler.WeightedPermutation(counts, seed, {'judgment': 20.0})
+        assert sorted(perm.order) == list(range(200))
+        assert all(perm.position(perm[i]) == i for i in range(len(perm)))
+        heavy_first += sum(1 for qid in perm.order[:50] if qid >= 100)
+    # 权重 20 的判断题几乎占满前 50 个位置
+    assert heavy_first > 20 * 45
+
+
+def test_normalize_weights():
+    types = ('single_choice', 'multiple_choice', 'judgment')
+    assert sampler.normalize_weights(None, types) is None
+    assert sampler.normalize_weights({'judgment': 1}, types) is None
+    assert sampler.normalize_weights({'judgment': 2}, types) == (
+        ('single_choice', 1.0), ('multiple_choice', 1.0), ('judgment', 2.0))
+    for bad in ({'essay': 2}, {'judgment': 0}, {'judgment': -1}, {'judgment': True}, {'judgment': '2'}, [2]):
+        with pytest.raises(ValueError):
+            sampler.normalize_weights(bad, types)
+
+
+def test_permutation_picks_implementation():
+    counts = {'single_choice': 3, 'judgment': 2}
+    assert isinstance(sampler.permutation(counts, 1), sampler.FeistelPermutation)
+    weights = (('single_choice', 1.0), ('judgment', 3.0))
+    weighted = sampler.permutation(counts, 1, weights)
+    assert isinstance(weighted, sampler.WeightedPermutation)
+    assert sampler.permutation(counts, 1, weights) is weighted  # 同一 (种子, 权重) 只生成一次
+
+
+def test_local_sampler_covers_round_then_reshuffles():
+    local = sampler.PermutationSampler({'single_choice': 4, 'judgment': 3}, seed=99)
+    first_round = [local.next_id() for _ in range(7)]
+    assert sorted(first_round) == list(range(7))
+    assert local.seed == 99
+    local.next_id()
+    assert local.cursor == 1
+    assert sampler.PermutationSampler({}).next_id() is None
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""生产部署：题库冻结检查、线程池 WSGI 服务器、多进程启动与平滑停止"""
+
+import gc
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import types
+import urllib.request
+
+import pytest
+
+import serve_prod
+from question_bank import QuestionBank, QuestionBankError, compile_questions
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = {
+    'single_choice': [{'text': '单选一', 'options': ['甲', '乙'], 'answer': 'A'}],
+    'judgment': [{'text': '判断一', 'options': ['正确', '错误'], 'answer': 'B'}],
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def test_freeze_builds_caches_and_rejects_writable_buffers():
+    data = compile_questions(SAMPLE)
+    bank = QuestionBank(data)
+    bank.freeze([('judgment', 'single_choice')])
+    assert bank.frozen
+    assert bank._answer_masks is not None
+    assert ('judgment', 'single_choice') in bank._indexes
+
+    with pytest.raises(QuestionBankError):
+        QuestionBank(bytearray(data)).freeze()
+
+
+def test_freeze_bank_uses_module_type_order():
+    bank = QuestionBank(compile_questions(SAMPLE))
+    module = types.SimpleNamespace(exam_system=types.SimpleNamespace(bank=bank),
+                                   DEFAULT_TYPE_ORDER=('judgment', 'single_choice'))
+    try:
+        serve_prod.freeze_bank(module)
+    finally:
+        if hasattr(gc, 'unfreeze'):
+            gc.unfreeze()
+    assert bank.frozen
+    assert ('judgment', 'single_choice') in bank._indexes
+
+    with pytest.raises(SystemExit):
+        serve_prod.freeze_bank(types.SimpleNamespace(exam_system=types.SimpleNamespace(bank=None)))
+
+
+
+def test_failed_reload_keeps_bank_and_workers(capsys):
+    bank = QuestionBank(compile_questions(SAMPLE))
+
+    class System:
+        def __init__(self):
+            self.bank = bank
+
+        def load_questions(self):
+            raise QuestionBankError('题库文件格式错误')
+
+    server = serve_prod.PreforkServer(types.SimpleNamespace(exam_system=System()), '127.0.0.1', 0, 2, 2)
+    server.children = {101: 1, 102: 1}
+    server.generation = 1
+    server.spawn_generation = server.stop_workers = lambda *args: pytest.fail('不应替换工作进程')
+    try:
+        server.reload()
+    finally:
+        if hasattr(gc, 'unfreeze'):
+            gc.unfreeze()
+    assert server.module.exam_system.bank is bank and not bank.frozen
+    assert server.children == {101: 1, 102: 1} and server.generation == 1
+    assert '重新加载题库失败' in capsys.readouterr().out
+
+def test_pooled_server_serves_and_drains():
+    def app(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return [threading.current_thread().name.encode()]
+
+    server = serve_prod.PooledWSGIServer('127.0.0.1', free_port(), app, threads=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{server.server_port}/', timeout=5) as resp:
+            assert resp.read().startswith(b'exam-worker')
+    finally:
+        server.shutdown()
+        thread.join(5)
+        server.drain()
+    assert server.pool._shutdown
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='需要 fork')
+def test_prefork_serves_and_stops_gracefully(tmp_path):
+    port = free_port()
+    env = dict(os.environ, EXAM_SESSION_BACKEND='sqlite', EXAM_SESSION_DB=str(tmp_path / 'sessions.db'))
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'serve_prod.py'), '--app', 'v2', '--host', '127.0.0.1',
+         '--port', str(port), '--workers', '2', '--threads', '2'],
+        cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+    )
+    try:
+        url = f'http://127.0.0.1:{port}'
+        deadline = time.monotonic() + 30
+        while True:
+            assert proc.poll() is None, proc.stdout.read().decode()
+            try:
+                request = urllib.request.Request(url + '/start_exam', data=b'{}', method='POST',
+                                                 headers={'Content-Type': 'application/json'})
+                with urllib.request.urlopen(request, timeout=2) as resp:
+                    cookie = resp.headers['Set-Cookie'].split(';', 1)[0]
+                break
+            except OSError:
+                assert time.monotonic() < deadline, '服务器启动超时'
+                time.sleep(0.2)
+        # 会话存放在 SQLite 中，无论哪个工作进程处理后续请求都能读到
+        numbers = []
+        for _ in range(4):
+            request = urllib.request.Request(url + '/get_question', headers={'Cookie': cookie})
+            with urllib.request.urlopen(request, timeout=5) as resp:
+                numbers.append(json.loads(resp.read())['question_number'])
+        assert numbers == [1, 2, 3, 4]
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        output = proc.communicate(timeout=serve_prod.GRACEFUL_TIMEOUT + 10)[0].decode()
+    assert proc.returncode == 0, output
+    assert '服务器已停止' in output
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""服务端会话：内存 LRU/TTL、SQLite 持久化、Cookie 只携带会话ID"""
+
+import time
+
+import pytest
+from flask import Flask, session
+
+import session_store
+from session_store import MemorySessionStore, SQLiteSessionStore, create_session_store
+
+
+def test_memory_store_lru_and_ttl(monkeypatch):
+    store = MemorySessionStore(max_entries=2, ttl=60)
+    store.save('a', {'n': 1})
+    store.save('b', {'n': 2})
+    assert store.get('a') == {'n': 1}  # a 变为最近使用
+    store.save('c', {'n': 3})
+    assert store.get('b') is None
+    assert len(store) == 2
+
+    data = store.get('a')
+    data['n'] = 99  # 返回的是副本
+    assert store.get('a') == {'n': 1}
+
+    now = time.time()
+    monkeypatch.setattr(session_store.time, 'time', lambda: now + 61)
+    assert store.get('a') is None
+    store.delete('c')
+    assert len(store) == 0
+
+
+def test_sqlite_store_persists(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    store = SQLiteSessionStore(path, ttl=60)
+    store.save('sid', {'ordering': 'random', 'order_pos': 3})
+    assert SQLiteSessionStore(path).get('sid') == {'ordering': 'random', 'order_pos': 3}
+    store.delete('sid')
+    assert store.get('sid') is None
+    expired = SQLiteSessionStore(path, ttl=-1)
+    expired.save('old', {'x': 1})
+    assert expired.get('old') is None
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_session_store('redis')
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    session_store.init_app(app)
+
+    @app.route('/set/<int:n>')
+    def set_value(n):
+        session['n'] = n
+        session['payload'] = 'x' * 2000
+        return 'ok'
+
+    @app.route('/get')
+    def get_value():
+        return str(session.get('n'))
+
+    @app.route('/clear')
+    def clear():
+        session.clear()
+        return 'ok'
+
+    return app
+
+
+def test_cookie_only_carries_session_id(app):
+    client = app.test_client()
+    response = client.get('/set/5')
+    cookie = response.headers['Set-Cookie']
+    assert len(cookie.split(';')[0]) < 64  # 会话数据不在 Cookie 里
+    assert client.get('/get').get_data(as_text=True) == '5'
+    # 只读请求不重新保存
+    assert 'Set-Cookie' not in client.get('/get').headers
+    client.get('/clear')
+    assert client.get('/get').get_data(as_text=True) == 'None'
+
+
+def test_sessions_are_isolated(app):
+    first, second = app.test_client(), app.test_client()
+    first.get('/set/1')
+    second.get('/set/2')
+    assert first.get('/get').get_data(as_text=True) == '1'
+    assert second.get('/get').get_data(as_text=True) == '2'
+
+
+def test_sqlite_backend_from_config(tmp_path, monkeypatch):
+    monkeypatch.setenv('EXAM_SESSION_BACKEND', 'sqlite')
+    monkeypatch.setenv('EXAM_SESSION_DB', str(tmp_path / 's.db'))
+    app = Flask(__name__)
+    interface = session_store.init_app(app)
+    assert isinstance(interface.store, SQLiteSessionStore)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""间隔复习：复习间隔、取题顺序（到期 > 新题 > 提前复习）、状态文件读写"""
+
+import pytest
+
+import srs
+
+T0 = 1_700_000_000
+
+
+def test_intervals_grow_and_reset():
+    schedule = srs.LearnerSchedule(3, seed=1)
+    assert schedule.answer(0, True, now=T0) == srs.GRADUATE_INTERVAL
+
+    assert schedule.answer(1, False, now=T0) == srs.RELEARN_INTERVAL
+    assert schedule.ease[1] == pytest.approx(srs.DEFAULT_EASE - srs.EASE_PENALTY)
+    assert schedule.answer(1, True, now=T0) == srs.LEARN_INTERVAL
+    assert schedule.answer(1, True, now=T0) == srs.GRADUATE_INTERVAL
+    expected = int(srs.GRADUATE_INTERVAL * schedule.ease[1])
+    assert schedule.answer(1, True, now=T0) == expected
+    assert schedule.due[1] == T0 + expected
+
+    for _ in range(10):
+        schedule.answer(2, False, now=T0)
+    assert schedule.ease[2] == pytest.approx(srs.MIN_EASE)
+
+
+def test_pick_prefers_due_then_new_then_early_review():
+    schedule = srs.LearnerSchedule(3, seed=5)
+    [first] = schedule.pick(1, now=T0)
+    schedule.answer(first, False, now=T0)
+
+    # 还没到期：先引入新题
+    [second] = schedule.pick(1, now=T0 + 10)
+    assert second != first
+    # 两题都到期（second 出过但未作答），第三题还没出过
+    assert sorted(schedule.pick(2, now=T0 + srs.RELEARN_INTERVAL + 1)) == sorted([first, second])
+
+    for qid in range(3):
+        schedule.answer(qid, True, now=T0 + 100)
+    assert schedule.summary(now=T0 + 100)['new_count'] == 0
+    # 没有到期题也没有新题：提前复习，返回互不相同的题
+    picked = schedule.pick(3, now=T0 + 200)
+    assert sorted(picked) == [0, 1, 2]
+
+
+def test_every_question_introduced_once():
+    schedule = srs.LearnerSchedule(50, seed=9)
+    seen = []
+    for i in range(50):
+        [qid] = schedule.pick(1, now=T0 + i)
+        schedule.answer(qid, True, now=T0 + i)
+        seen.append(qid)
+    assert sorted(seen) == list(range(50))
+
+
+def test_bytes_round_trip_and_validation():
+    schedule = srs.LearnerSchedule(4, seed=42)
+    schedule.pick(2, now=T0)
+    schedule.answer(3, False, now=T0)
+    restored = srs.LearnerSchedule.from_bytes(schedule.to_bytes())
+    assert (restored.seed, restored.new_cursor) == (42, schedule.new_cursor)
+    assert list(restored.due) == list(schedule.due)
+    assert list(restored.interval) == list(schedule.interval)
+    assert list(restored.ease) == list(schedule.ease)
+
+    with pytest.raises(ValueError):
+        srs.LearnerSchedule.from_bytes(b'XXXX' + schedule.to_bytes()[4:])
+    with pytest.raises(ValueError):
+        srs.LearnerSchedule.from_bytes(schedule.to_bytes()[:-1])
+
+
+def test_resize_keeps_progress():
+    schedule = srs.LearnerSchedule(2, seed=1)
+    schedule.answer(1, False, now=T0)
+    schedule.resize(4)
+    assert schedule.record_count == 4
+    assert schedule.due[1] == T0 + srs.RELEARN_INTERVAL and schedule.due[3] == 0
+    schedule.resize(1)
+    assert len(schedule.interval) == len(schedule.ease) == 1
+
+
+def test_store_persists_per_learner(tmp_path):
+    store = srs.SRSStore(str(tmp_path))
+    store.answer('alice', 5, 2, False)
+    assert (tmp_path / 'alice.srs').exists()
+
+    reloaded = srs.SRSStore(str(tmp_path)).get('alice', 5)
+    assert reloaded.interval[2] == srs.RELEARN_INTERVAL
+    assert srs.SRSStore(str(tmp_path)).get('bob', 5).summary()['seen_count'] == 0
+    # 题库变大后补齐
+    assert srs.SRSStore(str(tmp_path)).get('alice', 8).record_count == 8
+
+    (tmp_path / 'broken.srs').write_bytes(b'garbage')
+    assert store.get('broken', 5).record_count == 5
+
+
+def test_store_rejects_unsafe_learner_ids(tmp_path):
+    store = srs.SRSStore(str(tmp_path))
+    for learner in ('../escape', '', 'a' * 65, None, 'a b'):
+        with pytest.raises(ValueError):
+            store.path(learner)
+    assert srs.check_learner(srs.new_learner_id())
+
+
+def test_format_interval():
+    assert srs.format_interval(srs.RELEARN_INTERVAL) == '1 分钟'
+    assert srs.format_interval(2 * 60 * 60) == '2 小时'
+    assert srs.format_interval(3 * srs.GRADUATE_INTERVAL) == '3 天'
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""/start_exam：策略参数无效时不改动正在进行的考试"""
+
+import pytest
+
+from web_exam_system import exam_system
+
+
+def started_session():
+    session = {}
+    body, status = exam_system.start(session, {'ordering': 'sequential'})
+    assert status == 200
+    exam_system.next_question(session)
+    exam_system.submit(session, {'answer': 'A'})
+    return session
+
+
+@pytest.mark.parametrize('data', [
+    {'ordering': 'by_type', 'question_type': 'essay'},
+    {'ordering': 'wrong', 'last': -1},
+    {'ordering': 'wrong', 'last': 'x'},
+    {'ordering': 'paper'},
+    {'ordering': 'paper', 'paper_id': 999},
+    {'ordering': 'sequential', 'type_order': ['judgment', 'judgment']},
+])
+def test_invalid_options_leave_session_unchanged(data):
+    session = started_session()
+    before = dict(session)
+    body, status = exam_system.start(session, data)
+    assert status == 400
+    assert body['status'] == 'error'
+    assert session == before
+
+
+def test_invalid_learner_leaves_session_unchanged():
+    session = started_session()
+    before = dict(session)
+    body, status = exam_system.start(session, {'ordering': 'random', 'learner': '../x'})
+    assert status == 400
+    assert session == before
+
+
+def test_unknown_ordering():
+    session = {}
+    body, status = exam_system.start(session, {'ordering': 'nope'})
+    assert status == 400
+    assert session == {}
+
+
+def test_success_resets_stats_and_keeps_learner():
+    session = started_session()
+    learner = session['learner']
+    body, status = exam_system.start(session, {'ordering': 'by_type', 'question_type': 'judgment'})
+    assert status == 200
+    assert body['learner'] == learner
+    assert session['learner'] == learner
+    assert session['ordering'] == 'by_type'
+    assert session['type_order'] == ['judgment']
+    assert session['answered_questions'] == 0
+    assert 'current_number' not in session
+    reply, status = exam_system.next_question(session)
+    assert reply.items[0][0] == 'judgment'
+
+
+def test_start_exam_route_keeps_session_on_error():
+    from web_exam_system import app
+    client = app.test_client()
+    assert client.post('/start_exam', json={'ordering': 'sequential'}).status_code == 200
+    first = client.get('/get_question').get_json()
+    response = client.post('/start_exam', json={'ordering': 'by_type', 'question_type': 'essay'})
+    assert response.status_code == 400
+    second = client.get('/get_question').get_json()
+    assert second['question_number'] == first['question_number'] + 1
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""前端页面：拆分内联样式/脚本、预压缩、各编码的强 ETag 与 304、离线模式文件"""
+
+import gzip
+import json
+
+from static_assets import ASSET_CACHE_CONTROL, ASSET_PREFIX, PAGE_CACHE_CONTROL, Asset, StaticPages, split_page
+
+HTML = """<html><head>
+    <style>
+body { color: red; }
+    </style>
+</head><body>
+    <script>
+console.log('hi');
+    </script>
+</body></html>"""
+
+
+def test_split_page_extracts_hashed_files():
+    page, files = split_page(HTML)
+    assert '<style>' not in page and '<script>' not in page
+    names = sorted(files)
+    assert [name.rsplit('.', 1)[1] for name in names] == ['css', 'js']
+    for name in names:
+        assert ASSET_PREFIX + name in page
+    css = next(body for ctype, body in files.values() if ctype.startswith('text/css'))
+    assert css.strip() == b'body { color: red; }'
+    # 内容不变时文件名不变
+    assert sorted(split_page(HTML)[1]) == names
+
+
+def test_asset_negotiates_encoding_and_etag():
+    body = ('题目' * 200).encode('utf-8')
+    asset = Asset('x.js', 'application/javascript', body, ASSET_CACHE_CONTROL)
+    status, identity, headers = asset.respond('GET', None, None)
+    headers = dict(headers)
+    assert status == 200 and identity == body
+    assert 'Content-Encoding' not in headers
+    assert headers['Cache-Control'] == ASSET_CACHE_CONTROL and headers['Vary'] == 'Accept-Encoding'
+
+    status, zipped, gz_headers = asset.respond('GET', 'gzip;q=1, identity;q=0.5', None)
+    gz_headers = dict(gz_headers)
+    assert gz_headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(zipped) == body
+    assert gz_headers['ETag'] != headers['ETag']
+
+    # 每种编码只匹配自己的 ETag
+    assert asset.respond('GET', 'gzip', gz_headers['ETag'])[0] == 304
+    assert asset.respond('HEAD', 'gzip', f'"other", {gz_headers["ETag"]}')[0] == 304
+    assert asset.respond('GET', None, gz_headers['ETag'])[0] == 200
+    assert asset.respond('GET', 'gzip', '*')[0] == 304
+    status, empty, not_modified = asset.respond('GET', 'gzip', gz_headers['ETag'])
+    assert empty == b'' and 'Content-Type' not in dict(not_modified)
+
+
+def test_tiny_bodies_are_not_compressed():
+    asset = Asset('x.css', 'text/css', b'a{}', ASSET_CACHE_CONTROL)
+    assert list(asset.bodies) == ['identity']
+    assert asset.negotiate('gzip, br') == 'identity'
+
+
+def test_service_worker_precaches_current_assets():
+    pages = StaticPages()
+    sw = pages.root_files['/sw.js'].bodies['identity'].decode('utf-8')
+    assert '__CACHE_VERSION__' not in sw and '__PRECACHE__' not in sw
+    for name in pages.assets:
+        assert json.dumps(ASSET_PREFIX + name) in sw
+    assert pages.root_files['/sw.js'].cache_control == PAGE_CACHE_CONTROL
+    assert pages.asset(ASSET_PREFIX + 'missing.js') is None
+    assert pages.asset('/sw.js') is None
+
+
+def test_flask_routes_serve_precompressed_page():
+    from web_exam_system_v2 import app
+
+    client = app.test_client()
+    first = client.get('/', headers={'Accept-Encoding': 'gzip'})
+    assert first.status_code == 200 and first.headers['Content-Encoding'] == 'gzip'
+    page = gzip.decompress(first.data).decode('utf-8')
+    again = client.get('/', headers={'Accept-Encoding': 'gzip', 'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304 and again.data == b''
+
+    href = page.split(f'src="{ASSET_PREFIX}', 1)[1].split('"', 1)[0]
+    script = client.get(ASSET_PREFIX + href)
+    assert script.status_code == 200
+    assert script.headers['Cache-Control'] == ASSET_CACHE_CONTROL
+    assert client.get(ASSET_PREFIX + 'app.missing.js').status_code == 404
+    assert client.get('/manifest.webmanifest').status_code == 200
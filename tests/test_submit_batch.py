@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""批量交卷 /submit_answers"""
+
+import pytest
+
+from ordering import get_library
+from question_bank import mask_to_answer
+from web_exam_system import SUBMIT_BATCH_MAX, app, exam_system
+
+
+def answer(question_id):
+    return mask_to_answer(exam_system.bank.answer_mask(question_id))
+
+
+def multiple_choice_id(min_letters=2):
+    bank = exam_system.bank
+    return next(i for i in range(bank.record_count)
+                if bank.locate_id(i)[0] == 'multiple_choice' and len(answer(i)) >= min_letters)
+
+
+def test_batch_updates_stats_once():
+    client = app.test_client()
+    client.post('/start_exam', json={'ordering': 'random'})
+    items = [{'question_id': i, 'answer': answer(i)} for i in range(4)]
+    items.append({'question_id': 4, 'answer': 'E' if answer(4) != 'E' else 'A'})
+    body = client.post('/submit_answers', json={'answers': items}).get_json()
+    assert body['graded'] == 5
+    assert [r['is_correct'] for r in body['results']] == [True] * 4 + [False]
+    assert (body['total_questions'], body['answered_questions'], body['correct_answers']) == (5, 5, 4)
+    assert body['accuracy'] == 80.0
+    assert 'score' not in body
+
+
+def test_partial_credit():
+    question_id = multiple_choice_id()
+    correct = answer(question_id)
+    body = app.test_client().post('/submit_answers', json={
+        'answers': [{'question_id': question_id, 'answer': correct[:1]}], 'partial_credit': True}).get_json()
+    assert body['results'][0]['score'] == round(1 / len(correct), 3)
+    assert body['score'] == body['results'][0]['score']
+    assert body['correct_answers'] == 0
+
+
+def test_invalid_items_are_reported_not_counted():
+    client = app.test_client()
+    client.post('/start_exam')
+    items = [{'question_id': 'x', 'answer': 'A'}, {'question_id': 0, 'answer': ''}, 'bad',
+             {'question_id': 0, 'answer': answer(0)}]
+    body = client.post('/submit_answers', json={'answers': items}).get_json()
+    assert [r['status'] for r in body['results']] == ['error', 'error', 'error', 'success']
+    assert body['graded'] == 1 and body['answered_questions'] == 1
+
+
+def test_batch_limits():
+    client = app.test_client()
+    assert client.post('/submit_answers', json={}).status_code == 400
+    too_many = [{'question_id': 0, 'answer': 'A'}] * (SUBMIT_BATCH_MAX + 1)
+    assert client.post('/submit_answers', json={'answers': too_many}).status_code == 400
+
+
+def test_batch_answers_are_logged():
+    client = app.test_client()
+    learner = 'batch-test-learner'
+    client.post('/start_exam', json={'learner': learner})
+    client.post('/submit_answers', json={'answers': [{'question_id': i, 'answer': answer(i)} for i in range(3)]})
+    exam_system.answer_log.flush()
+    stats = exam_system.answer_log.stats(learner)
+    assert stats['answered_questions'] == 3 and stats['correct_answers'] == 3
+
+
+def test_paper_question_ids_are_not_graded_as_bank_ids():
+    papers = get_library().summaries()
+    if not papers:
+        pytest.skip('没有试卷文件')
+    paper_id = papers[0]['paper_id']
+    client = app.test_client()
+    client.post('/start_exam', json={'ordering': 'paper', 'paper_id': paper_id})
+    question = client.get('/get_question').get_json()
+    assert question['question_id'] == f'paper:{paper_id}/0'
+
+    body = client.post('/submit_answers', json={
+        'answers': [{'question_id': question['question_id'], 'answer': question['correct_answer']}]}).get_json()
+    assert body['results'] == [{'question_id': question['question_id'], 'status': 'error', 'message': '题目ID无效'}]
+    assert body['graded'] == 0 and body['answered_questions'] == 0
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""错题本：位集合运算、随作答记录增量更新（按作答时间）、按考试选题、从作答记录重建"""
+
+import pytest
+
+import wrong_book
+from answer_log import AnswerLog, connect
+from wrong_book import WrongBook
+
+
+def test_bitset_helpers():
+    bits = (1 << 0) | (1 << 9) | (1 << 479)
+    assert list(wrong_book.iter_ids(bits)) == [0, 9, 479]
+    assert wrong_book.count(bits) == 3
+    assert len(wrong_book.to_blob(bits)) == 60
+    assert wrong_book.from_blob(wrong_book.to_blob(bits)) == bits
+    assert wrong_book.from_blob(None) == 0 and wrong_book.to_blob(0) == b''
+    assert wrong_book.combine([0b0110, 0b0011]) == 0b0111
+    assert wrong_book.combine([0b0110, 0b0011], 'intersection') == 0b0010
+    assert wrong_book.combine([]) == 0
+
+
+def test_apply_rows_adds_wrong_and_removes_corrected():
+    attempts = {}
+    rows = [
+        ('alice', None, 3, 'A', 0, 1.0, None, 10),
+        ('alice', None, 5, 'B', 0, 2.0, None, 10),
+        ('alice', 'paper-1', 7, 'A', 0, 3.0, None, 10),  # 模拟试卷题不计入
+        ('alice', None, 3, 'C', 1, 4.0, None, 11),
+    ]
+    notebook = wrong_book.apply_rows(0, attempts, rows)
+    assert list(wrong_book.iter_ids(notebook)) == [5]
+    assert attempts == {10: (1 << 3) | (1 << 5)}
+
+
+
+def test_apply_rows_follows_answer_time():
+    # 离线作答同步晚到：按作答时间，最后一次答对
+    rows = [('alice', None, 3, 'A', 1, 5.0, None, 11), ('alice', None, 3, 'B', 0, 1.0, None, 10)]
+    assert wrong_book.apply_rows(0, {}, rows) == 0
+    # 已写入的更晚作答：只计入那次考试的错题
+    attempts = {}
+    assert wrong_book.apply_rows(0, attempts, rows[1:], newest={3: 5.0}) == 0
+    assert attempts == {10: 1 << 3}
+
+@pytest.fixture
+def book(tmp_path):
+    log = AnswerLog(str(tmp_path / 'answers.db'))
+    yield WrongBook(log)
+    log.close()
+
+
+def record_attempt(log, attempt, wrong, right=()):
+    for qid in wrong:
+        log.record('alice', qid, 'X', False, attempt=attempt)
+    for qid in right:
+        log.record('alice', qid, 'A', True, attempt=attempt)
+
+
+def test_select_by_recent_attempts(book):
+    log = book.answer_log
+    record_attempt(log, 1, wrong=[1, 2, 3])
+    log.flush()
+    record_attempt(log, 2, wrong=[2, 3], right=[1])
+    # 第 3 次考试还没写入：也计入
+    record_attempt(log, 3, wrong=[3, 4], right=[2])
+
+    assert list(wrong_book.iter_ids(book.notebook('alice'))) == [3, 4]
+    assert list(wrong_book.iter_ids(book.select('alice', 3, 'intersection'))) == [3]
+    assert list(wrong_book.iter_ids(book.select('alice', 2, 'union'))) == [2, 3, 4]
+    assert book.summary('alice', last=2) == {
+        'wrong_count': 2,
+        'attempts': [{'attempt': 3, 'wrong_count': 2}, {'attempt': 2, 'wrong_count': 2}],
+    }
+    log.flush()
+    assert book.summary('alice', last=2)['wrong_count'] == 2
+    assert book.notebook('bob') == 0
+
+
+def test_old_attempts_are_pruned(book):
+    log = book.answer_log
+    for attempt in range(wrong_book.KEEP_ATTEMPTS + 5):
+        record_attempt(log, attempt, wrong=[attempt])
+        log.flush()
+    rows = log._reader.execute('SELECT attempt FROM wrong_attempts WHERE learner = ?', ('alice',)).fetchall()
+    assert sorted(r[0] for r in rows) == list(range(5, wrong_book.KEEP_ATTEMPTS + 5))
+
+
+def test_rebuild_matches_incremental(book):
+    log = book.answer_log
+    record_attempt(log, 1, wrong=[1, 2])
+    record_attempt(log, 2, wrong=[7], right=[2])
+    log.flush()
+    before = book.notebook('alice'), book.select('alice', 2)
+
+    conn = log._reader
+    conn.execute('DELETE FROM wrong_book')
+    conn.execute('BEGIN')
+    assert wrong_book.rebuild(conn) == 1
+    conn.execute('COMMIT')
+    assert (book.notebook('alice'), book.select('alice', 2)) == before
+
+
+
+def test_late_synced_rows_do_not_override_newer_answers(book):
+    log = book.answer_log
+    log.record('alice', 3, 'A', True, attempt=2, ts=200.0)
+    log.record('alice', 4, 'A', True, attempt=2, ts=210.0)
+    log.flush()
+    # 离线时答错的题（作答时间更早）在之后才同步：未写入和写入后都不改变错题本
+    log.record('alice', 3, 'X', False, attempt=1, ts=100.0)
+    log.record('alice', 5, 'X', False, attempt=1, ts=110.0)
+    assert list(wrong_book.iter_ids(book.notebook('alice'))) == [5]
+    log.flush()
+    assert list(wrong_book.iter_ids(book.notebook('alice'))) == [5]
+    assert list(wrong_book.iter_ids(book.select('alice', 1))) == [3, 5]
+
+    conn = log._reader
+    conn.execute('BEGIN')
+    wrong_book.rebuild(conn)
+    conn.execute('COMMIT')
+    assert list(wrong_book.iter_ids(book.notebook('alice'))) == [5]
+
+
+def test_old_wrong_book_table_is_migrated(tmp_path):
+    path = str(tmp_path / 'answers.db')
+    conn = connect(path)
+    conn.execute('CREATE TABLE wrong_book (learner TEXT PRIMARY KEY, bits BLOB NOT NULL)')
+    conn.execute("INSERT INTO wrong_book VALUES ('alice', ?)", (wrong_book.to_blob(1 << 2),))
+    conn.close()
+    log = AnswerLog(path)
+    try:
+        book = WrongBook(log)
+        assert list(wrong_book.iter_ids(book.notebook('alice'))) == [2]
+        log.record('alice', 2, 'A', True)
+        log.flush()
+        assert book.notebook('alice') == 0
+    finally:
+        log.close()
+
+def test_practice_mode_serves_only_wrong_questions():
+    from web_exam_system_v2 import app
+
+    client = app.test_client()
+    client.post('/start_exam', json={'ordering': 'sequential'})
+    wrong_ids = []
+    for _ in range(3):
+        question = client.get('/get_question').get_json()
+        wrong = next(letter for letter in 'ABCD' if letter not in question['correct_answer'])
+        client.post('/submit_answer', json={'answer': wrong})
+        wrong_ids.append(question['question_id'])
+
+    started = client.post('/start_exam', json={'ordering': 'wrong'})
+    assert started.status_code == 200
+    assert started.get_json()['ordering']['total_count'] == 3
+    served = [client.get('/get_question').get_json()['question_id'] for _ in range(3)]
+    assert sorted(served) == sorted(wrong_ids)
@@ -3,17 +3,59 @@
 """
 AI考试系统 - Web版本
 使用Flask创建Web界面，支持手机浏览器访问
+出题顺序（随机、固定顺序、分题型、乱序不重复、模拟试卷）在 /start_exam 时按会话选择，
+所有顺序共用同一份题库，一个进程、一个端口即可同时提供（见 ordering 模块）。
+本入口默认随机出题；web_exam_system_v2.py 为默认固定顺序的同一应用。
 """
 
-from flask import Flask, render_template, request, jsonify, session
-import json
-import random
 import os
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from flask import Blueprint, Flask, Response, abort, current_app, request, jsonify, session
+
+from answer_log import ANSWER_DB, AnswerLog, normalize_latency
+from bank_export import BankExport
+from ordering import DEFAULT_ORDERING, OrderingError, PaperOrdering, create_orderings, get_library
+from question_bank import QUESTION_TYPES, load_bank, mask_to_answer
+from question_payloads import QuestionPayloadCache
+from question_search import MAX_RESULTS, SearchIndex
+from static_assets import ASSET_PREFIX, StaticPages
+import compression
+import grading
+import metrics
+import profiling
+import session_store
+import srs
+from wrong_book import KEEP_ATTEMPTS, WrongBook, iter_ids
+
+# 固定顺序时的默认题型顺序：单选 -> 多选 -> 判断
+DEFAULT_TYPE_ORDER = QUESTION_TYPES
+# 批量取题每页的默认/最大题数
+PAGE_SIZE = 10
+PAGE_SIZE_MAX = 50
+# 批量提交答案的最大条数
+SUBMIT_BATCH_MAX = 500
+
+
+class QuestionReply(NamedTuple):
+    """返回预渲染题目的结果：items 为 [(题型, 题目下标, 会话字段)]，page 不为 None 时按一页返回"""
+    payloads: QuestionPayloadCache
+    items: List[Tuple[str, int, Dict[str, Any]]]
+    page: Optional[Dict[str, Any]] = None
+
+
+def _accuracy(session) -> float:
+    answered = session.get('answered_questions', 0)
+    return round(session.get('correct_answers', 0) / answered * 100, 1) if answered > 0 else 0
 
-app = Flask(__name__)
-app.secret_key = 'ai_exam_system_2024'  # 用于session管理
 
 class WebExamSystem:
+    """题库 + 会话操作；各接口（Flask 同步版、ASGI 异步版）只负责收发数据
+
+    会话操作的返回值为 (结果, 状态码)，结果是 JSON 字典或 QuestionReply。
+    """
+
     def __init__(self):
         self.questions = {
             'single_choice': [],
@@ -21,167 +63,652 @@ class WebExamSystem:
             'judgment': []
         }
         self.load_questions()
+        self.orderings = create_orderings(self)
+        # 作答记录和累计统计（按学习者持久保存，后台批量写入）
+        self.answer_log = AnswerLog(os.environ.get('EXAM_ANSWER_DB', ANSWER_DB))
+        self.wrong_book = WrongBook(self.answer_log)
 
     def load_questions(self):
-        """加载题库文件"""
+        """加载题库文件；题库缺失或损坏时抛出 QuestionBankError（启动时直接失败，重新加载时保留原题库）"""
+        # 映射编译后的题库（缺失或过期时自动从JSON编译）
+        bank = load_bank()
+        questions = dict(self.questions, **bank.questions)
+        # 预渲染每道题的响应体
+        payloads = QuestionPayloadCache(questions)
+        # 题干和选项的全文索引（/search）
+        search_index = SearchIndex(bank)
+        # 离线练习用的题库导出（/bank_export），版本记录默认保存在题库文件旁
+        bank_export = BankExport(bank, os.environ.get('EXAM_BANK_VERSIONS'))
+        # 全部构建成功后再替换，失败时正在服务的题库不受影响
+        self.bank = bank
+        self.questions.update(questions)
+        self.payloads = payloads
+        self.search_index = search_index
+        self.bank_export = bank_export
+
+    def ordering(self, session, default: str = DEFAULT_ORDERING):
+        """会话当前的出题顺序策略"""
+        return self.orderings.get(session.get('ordering') or default) or self.orderings[DEFAULT_ORDERING]
+
+    def learner(self, session) -> str:
+        """会话的学习者ID（作答记录、间隔复习进度按它保存），没有时新建"""
+        learner = session.get('learner')
+        if not learner:
+            learner = session['learner'] = srs.new_learner_id()
+        return learner
+
+    def _question_reply(self, ordering, source, session, numbers) -> QuestionReply:
+        items = []
+        for number in numbers:
+            question_type, q_idx = source.locate(number)
+            metrics.QUESTIONS_SERVED.inc(question_type)
+            fields = {'question_number': number, 'total_count': source.total}
+            fields.update(ordering.question_fields(session, number))
+            items.append((question_type, q_idx, fields))
+        return QuestionReply(source.payloads, items)
+
+    def start(self, session, data: Dict[str, Any], default: str = DEFAULT_ORDERING):
+        """开始考试：重置统计并按请求选择出题顺序
+
+        可传 learner（字母、数字、下划线、连字符）在多台设备间沿用同一个学习者的记录。
+        策略在会话的副本上初始化，参数无效时原会话（正在进行的考试）保持不变。
+        """
+        name = data.get('ordering') or default
+        ordering = self.orderings.get(name)
+        if ordering is None:
+            return {'status': 'error', 'message': f'未知的出题顺序: {name}'}, 400
+        learner = data.get('learner') or session.get('learner') or srs.new_learner_id()
+        try:
+            learner = srs.check_learner(learner)
+        except ValueError as e:
+            return {'status': 'error', 'message': str(e)}, 400
+        staged = dict(session)
+        staged.pop('current_number', None)
+        staged.update(learner=learner, total_questions=0, correct_answers=0, answered_questions=0, ordering=name,
+                      # 本次考试的标识（作答记录按它区分每次考试的错题）
+                      attempt=int(time.time() * 1000))
+        try:
+            ordering.start(staged, data)
+            description = ordering.describe(staged)
+        except OrderingError as e:
+            return {'status': 'error', 'message': str(e)}, 400
+        session.clear()
+        session.update(staged)
+        return {'status': 'success', 'message': '考试开始！', 'ordering': description, 'learner': learner}, 200
+
+    def next_question(self, session, default: str = DEFAULT_ORDERING):
+        """按会话的出题顺序出下一题"""
+        ordering = self.ordering(session, default)
+        try:
+            source = ordering.source(session)
+        except OrderingError as e:
+            return {'status': 'error', 'message': str(e)}, 400
+        number = ordering.next_number(session)
+        if number is None:
+            return {'status': 'error', 'message': '已无更多题目'}, 200
+
+        # 增加题目计数；session中只保存当前题号和出题时间（用于计算作答用时）
+        session['total_questions'] = session.get('total_questions', 0) + 1
+        session['current_number'] = number
+        session['served_at'] = round(time.time(), 3)
+        return self._question_reply(ordering, source, session, [number]), 200
+
+    def question_page(self, session, start: Optional[int], count: int, default: str = DEFAULT_ORDERING):
+        """一页题目，供客户端预取；start 只对按顺序编号的策略有效"""
+        ordering = self.ordering(session, default)
         try:
-            # 加载单选题
-            with open('single_choice.json', 'r', encoding='utf-8') as f:
-                self.questions['single_choice'] = json.load(f)
+            source = ordering.source(session)
+        except OrderingError as e:
+            return {'status': 'error', 'message': str(e)}, 400
+        if not ordering.numbered:
+            start = None
+        elif start is not None and start < 1:
+            return {'status': 'error', 'message': f'题号范围应在 1 到 {source.total} 之间'}, 400
+        elif start is not None and start > source.total:
+            return {'status': 'error', 'message': '已无更多题目'}, 200
+
+        numbers = ordering.page_numbers(session, start, count)
+        if not numbers:
+            return {'status': 'error', 'message': '已无更多题目'}, 200
+        reply = self._question_reply(ordering, source, session, numbers)
+        page = {'start': numbers[0]} if ordering.numbered else {}
+        page.update(count=len(numbers), total_count=source.total)
+        return reply._replace(page=page), 200
+
+    def _number_in(self, source, question_id) -> Optional[int]:
+        """全局题目ID在当前题目来源中的题号；不在当前练习范围内（如模拟试卷、单一题型）时返回 None"""
+        question_type, q_idx = self.bank.locate_id(int(question_id))
+        if source.bank is not self.bank or question_type not in source.index.type_order:
+            return None
+        return source.index.number_of(question_type, q_idx)
+
+    def search(self, session, query: str, limit: int = MAX_RESULTS, default: str = DEFAULT_ORDERING):
+        """按关键词搜索题干和选项；已开始考试时附上各题在当前顺序中的题号（可用于 /jump_to）"""
+        query = (query or '').strip()
+        if not query:
+            return {'status': 'error', 'message': '请输入搜索关键词'}, 400
+        results = self.search_index.search(query, limit)
+        if results and session.get('ordering'):
+            try:
+                source = self.ordering(session, default).source(session)
+            except OrderingError:
+                source = None
+            for hit in results:
+                hit['question_number'] = source and self._number_in(source, hit['question_id'])
+        return {'status': 'success', 'query': query, 'count': len(results), 'results': results}, 200
+
+    def jump(self, session, number, default: str = DEFAULT_ORDERING, question_id=None):
+        """跳到指定题号（1-based）或全局题目ID 并返回该题，之后从下一题继续"""
+        ordering = self.ordering(session, default)
+        try:
+            source = ordering.source(session)
+            if question_id is not None:
+                number = self._number_in(source, question_id)
+                if number is None:
+                    return {'status': 'error', 'message': '该题不在当前练习范围内'}, 400
+            n = int(number)
+        except OrderingError as e:
+            return {'status': 'error', 'message': str(e)}, 400
+        except (IndexError, TypeError, ValueError):
+            return {'status': 'error', 'message': '题号无效'}, 400
+        if n < 1 or n > source.total:
+            return {'status': 'error', 'message': f'题号范围应在 1 到 {source.total} 之间'}, 400
+
+        ordering.seek(session, n)
+        session['current_number'] = n
+        session['served_at'] = round(time.time(), 3)
+        # 统计总题计数用于进度
+        session['total_questions'] = session.get('total_questions', 0) + 1
+        return self._question_reply(ordering, source, session, [n]), 200
+
+    def submit(self, session, data: Dict[str, Any], default: str = DEFAULT_ORDERING):
+        """提交答案；预取的题目通过 question_number 指明作答的是哪一题"""
+        user_answer = data.get('answer', '')
+        if not user_answer:
+            return {'status': 'error', 'message': '请先选择答案'}, 200
+
+        ordering = self.ordering(session, default)
+        try:
+            source = ordering.source(session)
+        except OrderingError as e:
+            return {'status': 'error', 'message': str(e)}, 400
+
+        question_number = data.get('question_number')
+        if question_number is not None:
+            try:
+                question_number = int(question_number)
+                source.locate(question_number)
+            except (TypeError, ValueError, IndexError):
+                return {'status': 'error', 'message': '题号无效'}, 400
+            # 客户端本地展示的预取题目：作为新的当前题并计入题目数
+            if question_number != session.get('current_number'):
+                session['current_number'] = question_number
+                session['total_questions'] = session.get('total_questions', 0) + 1
+                session.pop('served_at', None)
+
+        number = session.get('current_number')
+        try:
+            question_type, q_idx = source.locate(number)
+        except (TypeError, IndexError):
+            return {'status': 'error', 'message': '没有当前题目'}, 200
+
+        correct_answer = source.bank.questions[question_type][q_idx]['answer']
+        is_correct = self.check_answer(question_type, user_answer, correct_answer)
+
+        # 更新统计
+        session['answered_questions'] = session.get('answered_questions', 0) + 1
+        if is_correct:
+            session['correct_answers'] = session.get('correct_answers', 0) + 1
+
+        # 作答用时：优先使用客户端上报的（预取的题目只有客户端知道何时展示），否则按出题时间计算
+        latency_ms = normalize_latency(data.get('latency_ms'))
+        if latency_ms is None and session.get('served_at'):
+            latency_ms = normalize_latency((time.time() - session['served_at']) * 1000)
+        self.answer_log.record(self.learner(session), source.bank.question_id(question_type, q_idx),
+                               user_answer, is_correct, latency_ms, ordering.log_source(session),
+                               session.get('attempt'))
+
+        result = {
+            'status': 'success',
+            'is_correct': is_correct,
+            'user_answer': user_answer,
+            'correct_answer': correct_answer,
+            'total_questions': session['total_questions'],
+            'correct_answers': session['correct_answers'],
+            'answered_questions': session['answered_questions'],
+            'accuracy': _accuracy(session)
+        }
+        result.update(ordering.on_answer(session, number, is_correct))
+        return result, 200
+
+    def submit_batch(self, session, data: Dict[str, Any]):
+        """批量提交答案：{"answers": [{"question_id": 全局题目ID, "answer": "AB", "latency_ms": 可选}, ...], "partial_credit": false}
+
+        一次判分并更新统计；partial_credit 为 true 时多选题少选按比例得分
+        """
+        items = data.get('answers')
+        if not isinstance(items, list) or not items:
+            return {'status': 'error', 'message': '请提供答案列表'}, 400
+        if len(items) > SUBMIT_BATCH_MAX:
+            return {'status': 'error', 'message': f'单次最多提交 {SUBMIT_BATCH_MAX} 道题'}, 400
+
+        partial_credit = bool(data.get('partial_credit', False))
+        results, answered, correct, total_score = self.grade_answers(items, partial_credit)
+        learner = self.learner(session)
+        for item, result in zip(items, results):
+            if result['status'] == 'success':
+                self.answer_log.record(learner, result['question_id'], result['user_answer'],
+                                       result['is_correct'], normalize_latency(item.get('latency_ms')),
+                                       attempt=session.get('attempt'))
+
+        # 统计只更新一次；离线作答的题目没有经过 get_question，同时计入题目数
+        session['total_questions'] = session.get('total_questions', 0) + answered
+        session['answered_questions'] = session.get('answered_questions', 0) + answered
+        session['correct_answers'] = session.get('correct_answers', 0) + correct
+
+        response = {
+            'status': 'success',
+            'results': results,
+            'graded': answered,
+            'total_questions': session['total_questions'],
+            'correct_answers': session['correct_answers'],
+            'answered_questions': session['answered_questions'],
+            'accuracy': _accuracy(session)
+        }
+        if partial_credit:
+            response['score'] = round(total_score, 3)
+        return response, 200
+
+    def sync_answers(self, session, data: Dict[str, Any]):
+        """同步离线作答：{"learner": ..., "answers": [{"question_id", "answer", "ts": 毫秒时间戳, "latency_ms", "attempt"}, ...]}
+
+        服务端重新判分后写入作答记录（不计入当前会话的统计）；按 (学习者, ts) 去重，客户端没收到响应重发时不会重复记录
+        """
+        items = data.get('answers')
+        if not isinstance(items, list) or not items:
+            return {'status': 'error', 'message': '请提供答案列表'}, 400
+        if len(items) > SUBMIT_BATCH_MAX:
+            return {'status': 'error', 'message': f'单次最多提交 {SUBMIT_BATCH_MAX} 道题'}, 400
+        try:
+            learner = srs.check_learner(data.get('learner') or self.learner(session))
+        except ValueError as e:
+            return {'status': 'error', 'message': str(e)}, 400
+
+        now = time.time()
+        timestamps = []
+        for item in items:
+            ts = item.get('ts') if isinstance(item, dict) else None
+            # 作答时间必须是过去的毫秒时间戳（允许少量时钟偏差）
+            valid = isinstance(ts, int) and not isinstance(ts, bool) and 0 < ts <= (now + 300) * 1000
+            timestamps.append(ts / 1000 if valid else None)
+        duplicates = self.answer_log.recorded_ts(learner, [ts for ts in timestamps if ts is not None])
+
+        results, _, _, _ = self.grade_answers(items)
+        synced = skipped = 0
+        errors = []
+        for item, result, ts in zip(items, results, timestamps):
+            if result['status'] != 'success' or ts is None:
+                errors.append(result.get('message') or '作答时间无效')
+                continue
+            if ts in duplicates:
+                skipped += 1
+                continue
+            duplicates.add(ts)
+            attempt = item.get('attempt')
+            self.answer_log.record(learner, result['question_id'], result['user_answer'], result['is_correct'],
+                                   normalize_latency(item.get('latency_ms')), ts=ts,
+                                   attempt=attempt if isinstance(attempt, int) and not isinstance(attempt, bool) else None)
+            synced += 1
+        return {'status': 'success', 'learner': learner, 'synced': synced, 'duplicates': skipped,
+                'errors': errors}, 200
+
+    def stats(self, session):
+        """统计信息：本次考试（会话）+ 学习者的累计统计（history）"""
+        result = {
+            'total_questions': session.get('total_questions', 0),
+            'correct_answers': session.get('correct_answers', 0),
+            'answered_questions': session.get('answered_questions', 0),
+            'accuracy': _accuracy(session)
+        }
+        if session.get('learner'):
+            result['history'] = self.answer_log.stats(session['learner'])
+        return result, 200
+
+    def wrong_summary(self, session, last: int = 3):
+        """错题本：错题数、错题的全局题目ID、最近几次考试的错题数"""
+        learner = session.get('learner')
+        if not learner:
+            return {'status': 'success', 'wrong_count': 0, 'question_ids': [], 'attempts': []}, 200
+        summary = self.wrong_book.summary(learner, last)
+        summary['question_ids'] = list(iter_ids(self.wrong_book.notebook(learner)))
+        return dict(summary, status='success'), 200
+
+    def papers(self):
+        """模拟试卷列表（大题、题数、分值）"""
+        return {'status': 'success', 'papers': get_library().summaries()}, 200
+
+    def paper_required(self, session):
+        """/paper/* 接口：会话没有在做模拟试卷时返回错误结果，否则返回 None"""
+        if session.get('ordering') != PaperOrdering.name:
+            return {'status': 'error', 'message': '请先选择试卷'}, 400
+        return None
+
+    def paper_result(self, session):
+        """模拟试卷各大题得分"""
+        error = self.paper_required(session)
+        if error:
+            return error
+        try:
+            result = self.orderings[PaperOrdering.name].result(session)
+        except OrderingError as e:
+            return {'status': 'error', 'message': str(e)}, 400
+        return dict(result, status='success'), 200
 
-            # 加载多选题
-            with open('multiple_choice.json', 'r', encoding='utf-8') as f:
-                self.questions['multiple_choice'] = json.load(f)
+    def check_answer(self, question_type, user_answer, correct_answer):
+        """检查答案是否正确（掩码比较，见 grading 模块）"""
+        is_correct = grading.check_answer(question_type, user_answer, correct_answer)
+        metrics.ANSWERS_GRADED.inc(question_type, metrics.grade_outcome(
+            is_correct, invalid=not is_correct and not grading.valid_answer(question_type, user_answer)))
+        return is_correct
+
+    def grade_answers(self, items, partial_credit=False):
+        """批量判分：items 为 [{'question_id': 全局题目ID, 'answer': 'AB'}, ...]
+
+        返回 (逐题结果列表, 已判分题数, 答对题数, 总得分)，无效条目在结果中标记为 error，不计入统计。
+        partial_credit 为 True 时多选题少选按比例得分。
+        先逐条校验并编码为掩码，再用 grading.grade_sheet 对整批一次判分。
+        """
+        results = []
+        graded = []  # (结果中的位置, 全局题目ID, 题型, 答案)
+        user_masks = bytearray()
+        for item in items:
+            if not isinstance(item, dict):
+                results.append({'status': 'error', 'message': '条目格式无效'})
+                continue
+            raw_id = item.get('question_id')
+            try:
+                question_id = int(raw_id)
+                question_type, _ = self.bank.locate_id(question_id)
+            except (TypeError, ValueError, IndexError):
+                results.append({'question_id': raw_id, 'status': 'error', 'message': '题目ID无效'})
+                continue
+            user_answer = str(item.get('answer') or '').strip()
+            if not user_answer:
+                results.append({'question_id': question_id, 'status': 'error', 'message': '答案为空'})
+                continue
+            if question_type != 'multiple_choice' and len(user_answer) != 1:
+                user_mask = grading.INVALID_BIT
+            else:
+                user_mask = grading.encode_answer(user_answer)
+            graded.append((len(results), question_id, question_type, user_answer))
+            user_masks.append(user_mask)
+            results.append(None)
+
+        answer_masks = self.bank.answer_masks()
+        correct_masks = bytes(answer_masks[question_id] for _, question_id, _, _ in graded)
+        multiple_flags = [question_type == 'multiple_choice' for _, _, question_type, _ in graded]
+        scores = grading.grade_sheet(user_masks, correct_masks, multiple_flags, partial_credit) if graded else []
+
+        correct = 0
+        total_score = 0.0
+        for (pos, question_id, question_type, user_answer), user_mask, correct_mask, score in zip(
+                graded, user_masks, correct_masks, scores):
+            score = float(score)
+            is_correct = score == 1.0
+            metrics.ANSWERS_GRADED.inc(question_type, metrics.grade_outcome(is_correct, score,
+                                                                            bool(user_mask & grading.INVALID_BIT)))
+            correct += is_correct
+            total_score += score
+            result = {
+                'question_id': question_id,
+                'status': 'success',
+                'is_correct': is_correct,
+                'user_answer': user_answer,
+                'correct_answer': mask_to_answer(correct_mask),
+            }
+            if partial_credit:
+                result['score'] = round(score, 3)
+            results[pos] = result
+        return results, len(graded), correct, total_score
+
+
+# 创建全局考试系统实例（同一进程内的所有应用共用）
+exam_system = WebExamSystem()
+# 首页及其样式、脚本（启动时预压缩，fork 出的工作进程共享）
+static_pages = StaticPages()
 
-            # 加载判断题
-            with open('judgment.json', 'r', encoding='utf-8') as f:
-                self.questions['judgment'] = json.load(f)
+bp = Blueprint('exam', __name__)
 
-            return True
-        except Exception as e:
-            print(f"加载题库失败: {e}")
-            return False
 
-    def get_random_question(self):
-        """随机获取一道题目"""
-        question_types = ['single_choice', 'multiple_choice', 'judgment']
-        question_type = random.choice(question_types)
+def _default_ordering() -> str:
+    return current_app.config['EXAM_ORDERING']
 
-        questions = self.questions[question_type]
-        if not questions:
-            return None, None
 
-        question = random.choice(questions)
-        return question_type, question
+def _reply(result):
+    """会话操作结果 -> Flask 响应"""
+    body, status = result
+    if isinstance(body, QuestionReply):
+        if body.page is not None:
+            return body.payloads.page_response(body.items, **body.page)
+        return body.payloads.response(*body.items[0][:2], **body.items[0][2])
+    return jsonify(body), status
 
-    def check_answer(self, question_type, user_answer, correct_answer):
-        """检查答案是否正确"""
-        user_answer = user_answer.upper().strip()
-        correct_answer = correct_answer.upper().strip()
-
-        if question_type == 'multiple_choice':
-            # 多选题需要所有选项都正确
-            user_set = set(user_answer.replace(' ', ''))
-            correct_set = set(correct_answer.replace(' ', ''))
-            return user_set == correct_set
-        else:
-            return user_answer == correct_answer
-
-# 创建全局考试系统实例
-exam_system = WebExamSystem()
 
-@app.route('/')
+def _static_response(asset) -> Response:
+    status, body, headers = asset.respond(request.method, request.headers.get('Accept-Encoding'),
+                                          request.headers.get('If-None-Match'))
+    return Response(body, status, headers)
+
+
+@bp.route('/')
 def index():
-    """主页"""
-    return render_template('index.html')
-
-@app.route('/start_exam', methods=['POST'])
-def start_exam():
-    """开始考试"""
-    session['total_questions'] = 0
-    session['correct_answers'] = 0
-    session['answered_questions'] = 0
-    return jsonify({'status': 'success', 'message': '考试开始！'})
-
-@app.route('/get_question', methods=['GET'])
-def get_question():
-    """获取下一题"""
-    question_type, question = exam_system.get_random_question()
-
-    if not question:
-        return jsonify({'status': 'error', 'message': '没有可用的题目'})
-
-    # 增加题目计数
-    session['total_questions'] = session.get('total_questions', 0) + 1
-
-    # 准备选项数据
-    options = []
-    if question_type == 'single_choice':
-        options = [
-            {'value': 'A', 'text': question['Unnamed: 2']},
-            {'value': 'B', 'text': question['Unnamed: 3']},
-            {'value': 'C', 'text': question['Unnamed: 4']},
-            {'value': 'D', 'text': question['Unnamed: 5']}
-        ]
-    elif question_type == 'multiple_choice':
-        options = [
-            {'value': 'A', 'text': question['Unnamed: 2']},
-            {'value': 'B', 'text': question['Unnamed: 3']},
-            {'value': 'C', 'text': question['Unnamed: 4']},
-            {'value': 'D', 'text': question['Unnamed: 5']},
-            {'value': 'E', 'text': question['Unnamed: 6']}
-        ]
-    elif question_type == 'judgment':
-        options = [
-            {'value': 'A', 'text': '正确'},
-            {'value': 'B', 'text': '错误'}
-        ]
-
-    # 保存当前题目到session
-    session['current_question'] = question
-    session['current_question_type'] = question_type
-
-    return jsonify({
-        'status': 'success',
-        'question_type': question_type,
-        'question_text': question['Unnamed: 1'],
-        'options': options,
-        'question_number': session['total_questions'],
-        'correct_answer': question['Unnamed: 7']  # 暂时返回，实际应该隐藏
-    })
+    """主页（启动时预渲染、预压缩）"""
+    return _static_response(static_pages.index)
+
+
+@bp.route('/sw.js')
+@bp.route('/manifest.webmanifest')
+@bp.route('/icon.svg')
+def root_file():
+    """Service Worker、应用清单和图标（须在根路径下，地址固定）"""
+    return _static_response(static_pages.root_files[request.path])
+
+
+@bp.route(ASSET_PREFIX + '<name>')
+def asset(name):
+    """页面拆出的样式和脚本（文件名带内容摘要，长期缓存）"""
+    item = static_pages.assets.get(name)
+    if item is None:
+        abort(404)
+    return _static_response(item)
+
+
+@bp.route('/bank_export', methods=['GET'])
+def bank_export():
+    """离线练习用的题库导出；?since=本机已有的版本 时只返回变化的题"""
+    return _static_response(exam_system.bank_export.export(request.args.get('since')))
 
-@app.route('/submit_answer', methods=['POST'])
-def submit_answer():
-    """提交答案"""
-    user_answer = request.json.get('answer', '')
 
-    if not user_answer:
-        return jsonify({'status': 'error', 'message': '请先选择答案'})
+class SessionRoute(NamedTuple):
+    """读写会话的接口，同步版（本模块的蓝图）和异步版（web_exam_system_async）共用同一个处理函数
 
-    current_question = session.get('current_question')
-    current_question_type = session.get('current_question_type')
+    handler(session, args, data, default) -> (结果, 状态码)：args 为查询参数，data 为 JSON 请求体（不是对象时为 {}），
+    default 为会话未选择出题顺序时使用的策略。blocking 为 True（或对该会话返回 True 的函数）表示处理时会读写
+    数据库或文件，异步版放到线程池执行。
+    """
+    methods: Tuple[str, ...]
+    handler: Callable[..., Tuple[Any, int]]
+    blocking: Union[bool, Callable[[Any], bool]] = False
 
-    if not current_question:
-        return jsonify({'status': 'error', 'message': '没有当前题目'})
 
-    correct_answer = current_question['Unnamed: 7']
-    is_correct = exam_system.check_answer(current_question_type, user_answer, correct_answer)
+SESSION_ROUTES: Dict[str, SessionRoute] = {}
 
-    # 更新统计
-    session['answered_questions'] = session.get('answered_questions', 0) + 1
-    if is_correct:
-        session['correct_answers'] = session.get('correct_answers', 0) + 1
 
-    # 计算正确率
-    accuracy = (session['correct_answers'] / session['answered_questions']) * 100 if session['answered_questions'] > 0 else 0
+def session_route(path: str, methods: Tuple[str, ...] = ('GET',), blocking=False):
+    """登记一个会话接口（见 SessionRoute）"""
+    def register(handler):
+        SESSION_ROUTES[path] = SessionRoute(methods, handler, blocking)
+        return handler
+    return register
 
-    return jsonify({
+
+def _ordering_blocks(session) -> bool:
+    """会话当前的出题顺序是否读写文件（间隔复习进度、试卷文件）"""
+    return exam_system.ordering(session).blocking
+
+
+def _int_arg(args, name: str, default: int) -> int:
+    try:
+        return int(args.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+@session_route('/orderings')
+def list_orderings(session, args, data, default):
+    """可选的出题顺序"""
+    return {
         'status': 'success',
-        'is_correct': is_correct,
-        'user_answer': user_answer,
-        'correct_answer': correct_answer,
-        'total_questions': session['total_questions'],
-        'correct_answers': session['correct_answers'],
-        'answered_questions': session['answered_questions'],
-        'accuracy': round(accuracy, 1)
-    })
-
-@app.route('/get_stats', methods=['GET'])
-def get_stats():
+        'default': default,
+        'orderings': [{'name': o.name, 'label': o.label, 'numbered': o.numbered}
+                      for o in exam_system.orderings.values()],
+    }, 200
+
+
+@session_route('/start_exam', ('POST',), blocking=True)
+def start_exam(session, args, data, default):
+    """开始考试：{"ordering": "shuffled", "type_weights": {...}, "type_order": [...], "question_type": "judgment", "paper_id": 1}（均可省略）"""
+    return exam_system.start(session, data, default)
+
+
+@session_route('/get_question', blocking=_ordering_blocks)
+def get_question(session, args, data, default):
+    """按会话的出题顺序获取下一题"""
+    return exam_system.next_question(session, default)
+
+
+@session_route('/get_questions', blocking=_ordering_blocks)
+def get_questions(session, args, data, default):
+    """批量获取一页题目，供客户端预取：?start=起始题号&count=题数（随机/乱序模式忽略 start）"""
+    try:
+        start = int(args['start']) if 'start' in args else None
+        count = max(1, min(int(args.get('count', PAGE_SIZE)), PAGE_SIZE_MAX))
+    except ValueError:
+        return {'status': 'error', 'message': '参数无效'}, 400
+    return exam_system.question_page(session, start, count, default)
+
+
+@session_route('/submit_answer', ('POST',), blocking=_ordering_blocks)
+def submit_answer(session, args, data, default):
+    """提交答案；预取的题目通过 question_number 指明作答的是哪一题"""
+    return exam_system.submit(session, data, default)
+
+
+@session_route('/submit_answers', ('POST',))
+def submit_answers(session, args, data, default):
+    """批量提交答案（按全局题目ID判分）"""
+    return exam_system.submit_batch(session, data)
+
+
+@session_route('/sync_answers', ('POST',), blocking=True)
+def sync_answers(session, args, data, default):
+    """离线作答批量同步（作答时间去重，可安全重发）"""
+    return exam_system.sync_answers(session, data)
+
+
+@session_route('/get_stats', blocking=True)
+def get_stats(session, args, data, default):
     """获取统计信息"""
-    answered_questions = session.get('answered_questions', 0)
-    accuracy = (session.get('correct_answers', 0) / answered_questions) * 100 if answered_questions > 0 else 0
+    return exam_system.stats(session)
+
+
+@session_route('/wrong_book', blocking=True)
+def get_wrong_book(session, args, data, default):
+    """错题本概况：?last=最近几次考试（默认 3）"""
+    return exam_system.wrong_summary(session, max(0, min(_int_arg(args, 'last', 3), KEEP_ATTEMPTS)))
+
+
+@session_route('/search')
+def search(session, args, data, default):
+    """全文搜索：?q=关键词&limit=最多结果数（默认 20）"""
+    limit = _int_arg(args, 'limit', MAX_RESULTS)
+    return exam_system.search(session, args.get('q', ''), max(1, min(limit, 100)), default)
+
+
+@session_route('/jump_to', ('GET', 'POST'), blocking=_ordering_blocks)
+def jump_to(session, args, data, default):
+    """跳到指定题号（1-based）或全局题目ID（搜索结果），并返回该题；
+    GET 方式通过 ?question_number= 或 ?question_id= 传参，可利用 ETag 缓存"""
+    params = data or args
+    return exam_system.jump(session, params.get('question_number', 1), default,
+                            question_id=params.get('question_id'))
+
+
+@session_route('/papers', blocking=True)
+def list_papers(session, args, data, default):
+    """模拟试卷列表"""
+    return exam_system.papers()
+
+
+# 模拟试卷接口：与 /start_exam {"ordering": "paper"} 及通用的取题、交卷接口相同（PaperOrdering），
+# 只是要求会话正在做模拟试卷
+@session_route('/paper/start', ('POST',), blocking=True)
+def start_paper(session, args, data, default):
+    """开始一套试卷 {"paper_id": 1}"""
+    return exam_system.start(session, dict(data, ordering=PaperOrdering.name))
+
+
+@session_route('/paper/get_question', blocking=True)
+def paper_get_question(session, args, data, default):
+    """按试卷顺序获取下一题"""
+    return exam_system.paper_required(session) or exam_system.next_question(session)
+
+
+@session_route('/paper/submit_answer', ('POST',), blocking=True)
+def paper_submit_answer(session, args, data, default):
+    """提交试卷中当前题的答案 {"answer": "A", "question_number": 可选}，按大题累计得分（每题只计第一次作答）"""
+    return exam_system.paper_required(session) or exam_system.submit(session, data)
+
+
+@session_route('/paper/result', blocking=True)
+def paper_result(session, args, data, default):
+    """各大题得分汇总"""
+    return exam_system.paper_result(session)
+
+
+def _session_view(route: SessionRoute):
+    def view():
+        data = request.get_json(silent=True) if request.method == 'POST' else None
+        return _reply(route.handler(session, request.args, data if isinstance(data, dict) else {},
+                                    _default_ordering()))
+    view.__doc__ = route.handler.__doc__
+    return view
+
+
+for _path, _route in SESSION_ROUTES.items():
+    bp.add_url_rule(_path, _route.handler.__name__, _session_view(_route), methods=list(_route.methods))
+
+
+def create_app(default_ordering: str = DEFAULT_ORDERING) -> Flask:
+    """创建应用；default_ordering 为 /start_exam 未指定顺序时使用的策略"""
+    app = Flask(__name__)
+    app.secret_key = 'ai_exam_system_2024'  # 用于session管理
+    app.config['EXAM_ORDERING'] = default_ordering
+    app.json.ensure_ascii = False  # UTF-8 输出中文，不转义为 \uXXXX
+    profiling.init_app(app)  # 按请求剖析（EXAM_PROFILE=1 开启，默认不注册任何钩子）
+    metrics.init_app(app)  # 请求计数、耗时和大小，/metrics（须在压缩之前注册，记录压缩后的大小）
+    compression.init_app(app)  # 按 Accept-Encoding 压缩 JSON 响应
+    session_store.init_app(app)  # 会话数据保存在服务端，Cookie只携带会话ID
+    app.register_blueprint(bp)
+    return app
+
 
-    return jsonify({
-        'total_questions': session.get('total_questions', 0),
-        'correct_answers': session.get('correct_answers', 0),
-        'answered_questions': answered_questions,
-        'accuracy': round(accuracy, 1)
-    })
+app = create_app('random')
 
 if __name__ == '__main__':
     print("🚀 AI考试系统Web版本启动中...")
     print("📱 支持手机浏览器访问")
     print("🌐 访问地址: http://localhost:5000")
     print("📶 手机访问: http://[电脑IP]:5000")
+    print("🏭 生产部署请使用: python serve_prod.py --app random --workers 4")
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
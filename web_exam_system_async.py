@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI考试系统 - Web版本 v2（固定顺序）的异步 ASGI 实现
+适合一个培训班几百台手机同时答题的场景：单个事件循环处理全部连接，不再每个请求占用一个线程。
+
+与同步版共用同一个 WebExamSystem（题库映射、出题顺序策略、预渲染题目、判分）和会话存储，
+会话接口（/start_exam、/get_question、/get_questions、/submit_answer、/paper/* 等）直接使用同步版登记的
+处理函数（web_exam_system.SESSION_ROUTES），两个版本的接口和 JSON 格式不会不一致；
+离线模式的 /bank_export、/sw.js 等静态响应也相同。
+处理时会读写数据库或文件的接口（作答统计、离线同步、错题本、间隔复习、试卷）放到线程池执行，不阻塞事件循环。
+不依赖 Web 框架，只需要一个 ASGI 服务器：
+
+    pip install uvicorn
+    python web_exam_system_async.py
+    # 或 uvicorn web_exam_system_async:app --host 0.0.0.0 --port 5000
+
+与同步版对比: python bench_load.py --server v2 --output sync.json && python bench_load.py --server async --compare sync.json
+"""
+
+import asyncio
+import json
+import time
+import traceback
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qsl
+
+from werkzeug.http import parse_etags
+
+import web_exam_system_v2 as sync_app
+import metrics
+from compression import ENCODINGS, choose_encoding, compress, should_compress
+from profiling import TRIGGER_HEADER
+from question_payloads import encoded_etag
+from session_store import SQLiteSessionStore, ServerSideSession, ServerSideSessionInterface
+from static_assets import ASSET_PREFIX
+from web_exam_system import SESSION_ROUTES, QuestionReply, SessionRoute, exam_system, static_pages
+
+# 与 web_exam_system_v2 相同：未指定时按固定顺序出题
+DEFAULT_ORDERING = sync_app.app.config['EXAM_ORDERING']
+
+# 与同步版共用会话存储和 Cookie 名称，两种服务器可以混合部署
+_store = sync_app.app.session_interface.store
+_cookie_name = sync_app.app.config['SESSION_COOKIE_NAME']
+# SQLite 会话读写会阻塞，放到线程池执行
+_blocking_store = isinstance(_store, SQLiteSessionStore)
+# 与同步版共用剖析配置和输出目录（未开启时为 None）
+_profiler = sync_app.app.extensions.get('exam_profiler')
+
+
+class Request:
+    """一次 HTTP 请求（只保留接口需要的部分）"""
+
+    def __init__(self, scope, body: bytes):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.args = dict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+        self.headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope['headers']}
+        self.body = body
+        self.profile_run = None  # 正在剖析本请求时为剖析句柄
+
+    @property
+    def json(self):
+        try:
+            return json.loads(self.body) if self.body else None
+        except ValueError:
+            return None
+
+    @property
+    def cookies(self):
+        cookie = SimpleCookie()
+        cookie.load(self.headers.get('cookie', ''))
+        return {k: m.value for k, m in cookie.items()}
+
+
+def json_response(data, status: int = 200):
+    """与同步版 jsonify 相同的序列化方式（键排序、紧凑、UTF-8、末尾换行）"""
+    body = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':')) + '\n'
+    return status, body.encode('utf-8'), [(b'content-type', b'application/json')]
+
+
+def question_response(request: Request, reply: QuestionReply):
+    """预渲染题目（单题或一页）+ 强 ETag，GET 命中 If-None-Match 时返回 304"""
+    payloads = reply.payloads
+    accept = request.headers.get('accept-encoding')
+    if reply.page is not None:
+        encoding = payloads.negotiate(accept, reply.items, ENCODINGS)
+        etag = encoded_etag(payloads.page_etag(reply.items, **reply.page), encoding)
+    else:
+        question_type, q_idx, fields = reply.items[0]
+        encoding = payloads.negotiate(accept, reply.items)
+        etag = encoded_etag(payloads.etag(question_type, q_idx, **fields), encoding)
+    headers = [(b'etag', f'"{etag}"'.encode('latin-1')), (b'cache-control', b'no-cache'),
+               (b'vary', b'Accept-Encoding')]
+    if request.method in ('GET', 'HEAD') and parse_etags(request.headers.get('if-none-match')).contains(etag):
+        return 304, b'', headers
+    headers.append((b'content-type', b'application/json'))
+    if encoding != 'identity':
+        headers.append((b'content-encoding', encoding.encode('latin-1')))
+    if reply.page is not None:
+        return 200, payloads.page_body(reply.items, encoding, **reply.page), headers
+    return 200, payloads.encoded_body(question_type, q_idx, encoding, **fields), headers
+
+
+def compress_response(request: Request, status: int, body: bytes, headers: list):
+    """与同步版 compression.init_app 相同：实时压缩 JSON/文本响应（带 ETag 的响应自行协商编码）"""
+    names = {name for name, _ in headers}
+    content_type = dict(headers).get(b'content-type', b'').decode('latin-1')
+    if (status != 200 or b'etag' in names or b'content-encoding' in names
+            or not should_compress(body, content_type)):
+        return body
+    headers.append((b'vary', b'Accept-Encoding'))
+    encoding = choose_encoding(request.headers.get('accept-encoding'))
+    if encoding == 'identity':
+        return body
+    headers.append((b'content-encoding', encoding.encode('latin-1')))
+    return compress(body, encoding)
+
+
+async def _store_call(func, *args):
+    if _blocking_store:
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    return func(*args)
+
+
+async def open_session(request: Request) -> ServerSideSession:
+    sid = request.cookies.get(_cookie_name)
+    if sid:
+        data = await _store_call(_store.get, sid)
+        if data is not None:
+            return ServerSideSession(data, sid=sid)
+    return ServerSideSession(sid=ServerSideSessionInterface.generate_sid(), new=True)
+
+
+async def save_session(session: ServerSideSession, headers: list):
+    """与 ServerSideSessionInterface.save_session 相同的规则"""
+    if session.accessed:
+        headers.append((b'vary', b'Cookie'))
+    if not session:
+        if session.modified and not session.new:
+            await _store_call(_store.delete, session.sid)
+            headers.append((b'set-cookie', f'{_cookie_name}=; Expires=Thu, 01 Jan 1970 00:00:00 GMT; '
+                                            f'Max-Age=0; HttpOnly; Path=/'.encode('latin-1')))
+        return
+    if session.modified or session.new:
+        await _store_call(_store.save, session.sid, dict(session))
+        headers.append((b'set-cookie', f'{_cookie_name}={session.sid}; HttpOnly; Path=/'.encode('latin-1')))
+
+
+def static_response(request: Request, asset):
+    """预压缩的页面或资源文件（与同步版相同的协商、ETag 和缓存头）"""
+    status, body, headers = asset.respond(request.method, request.headers.get('accept-encoding'),
+                                          request.headers.get('if-none-match'))
+    return status, body, [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+
+
+async def index(request, session):
+    return static_response(request, static_pages.index)
+
+
+def static_asset(request: Request):
+    """不读写会话的静态响应：资源文件、Service Worker/清单/图标、离线题库导出"""
+    if request.path == '/bank_export':
+        return exam_system.bank_export.export(request.args.get('since'))
+    return static_pages.root_files.get(request.path) or static_pages.asset(request.path)
+
+
+def _reply(request: Request, result):
+    """会话操作结果 -> (状态码, 响应体, 响应头)"""
+    body, status = result
+    if isinstance(body, QuestionReply):
+        return question_response(request, body)
+    return json_response(body, status)
+
+
+async def get_metrics(request, session):
+    """运行指标（Prometheus 文本格式）"""
+    return 200, metrics.REGISTRY.render().encode('utf-8'), [(b'content-type', metrics.CONTENT_TYPE.encode('latin-1')),
+                                                           (b'cache-control', b'no-store')]
+
+
+def session_endpoint(route: SessionRoute):
+    """同步版登记的会话接口 -> 异步处理函数（会读写数据库或文件的放到线程池执行）"""
+    async def endpoint(request, session):
+        data = request.json if request.method == 'POST' else None
+        args = (session, request.args, data if isinstance(data, dict) else {}, DEFAULT_ORDERING)
+        blocking = route.blocking(session) if callable(route.blocking) else route.blocking
+        if blocking and request.profile_run is not None:
+            # 剖析在工作线程中进行，否则只能看到事件循环在等待
+            result = await asyncio.to_thread(request.profile_run.call, route.handler, *args)
+        elif blocking:
+            result = await asyncio.to_thread(route.handler, *args)
+        else:
+            result = route.handler(*args)
+        return _reply(request, result)
+    endpoint.__doc__ = route.handler.__doc__
+    return endpoint
+
+
+ROUTES = {
+    '/': (('GET', 'HEAD'), index),
+    metrics.METRICS_PATH: (('GET', 'HEAD'), get_metrics),
+}
+for _path, _route in SESSION_ROUTES.items():
+    ROUTES[_path] = (_route.methods + ('HEAD',) if 'GET' in _route.methods else _route.methods,
+                     session_endpoint(_route))
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+def _text_response(status: int, body: bytes):
+    return status, body, [(b'content-type', b'text/plain; charset=utf-8')]
+
+
+async def _dispatch(request: Request, route, asset):
+    """按路由处理请求，返回 (状态码, 响应体, 响应头)"""
+    if asset is not None:
+        # 静态资源不读写会话
+        if request.method in ('GET', 'HEAD'):
+            return static_response(request, asset)
+        return _text_response(405, b'Method Not Allowed')
+    if route is None:
+        return _text_response(404, b'Not Found')
+    if request.method not in route[0]:
+        return _text_response(405, b'Method Not Allowed')
+    session = await open_session(request)
+    status, body, headers = await route[1](request, session)
+    await save_session(session, headers)
+    return status, compress_response(request, status, body, headers), headers
+
+
+async def app(scope, receive, send):
+    """ASGI 入口"""
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    request = Request(scope, await _read_body(receive))
+    started = time.perf_counter()
+    route = ROUTES.get(request.path)
+    asset = static_asset(request) if route is None else None
+    # 指标中的接口名与同步版的路由规则一致（资源文件合为一项）
+    if asset is not None and request.path.startswith(ASSET_PREFIX):
+        route_name = ASSET_PREFIX + '<name>'
+    else:
+        route_name = request.path if route is not None or asset is not None else 'unmatched'
+    run = None
+    if _profiler is not None and route_name != 'unmatched':
+        run = request.profile_run = _profiler.start(route_name, request.headers.get(TRIGGER_HEADER.lower()))
+    status = 500
+    try:
+        try:
+            status, body, headers = await _dispatch(request, route, asset)
+        except Exception:
+            # 与同步版相同：记录异常并返回 500，不让连接无响应地断开
+            traceback.print_exc()
+            status, body, headers = _text_response(500, b'Internal Server Error')
+
+        headers.append((b'content-length', str(len(body)).encode('latin-1')))
+        elapsed = time.perf_counter() - started
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b'' if request.method == 'HEAD' else body})
+        metrics.observe_request(route_name, request.method, status, elapsed, len(body),
+                                request.headers.get('cookie'))
+    finally:
+        if run is not None:
+            _profiler.finish(run, method=request.method, path=request.path,
+                             query=scope.get('query_string', b'').decode('latin-1'), status=status)
+
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        print('需要安装 ASGI 服务器: pip install uvicorn')
+        raise SystemExit(1)
+    print('AI考试系统Web版本 v2（异步）启动中...')
+    print('访问地址: http://localhost:5000')
+    uvicorn.run(app, host='0.0.0.0', port=5000, log_level='warning')
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+错题本（Web 版和 GUI 共用）
+每个学习者的错题用位集合表示：第 i 位对应全局题目ID i，480 道题只需 60 字节。
+
+- 错题本：最近一次作答答错的题（再次答对后移出）。“最近一次”按作答时间而不是写入顺序：
+  离线同步的记录可能在之后的作答写入后才到达，这时只计入那次考试的错题，不改变错题本
+- 每次考试的错题：按考试（attempt）分别记录，保留最近 KEEP_ATTEMPTS 次，
+  “最近 3 次考试都错的题”“最近 3 次考试错过的题”只是几个整数的与/或运算
+
+位集合保存在作答记录数据库中（wrong_book / wrong_attempts 表），由作答记录的写线程在同一事务中更新，
+丢失或升级后可从作答记录重建: python wrong_book.py --rebuild
+
+用法: python wrong_book.py [学习者ID] [--rebuild]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from answer_log import ANSWER_DB, connect
+
+KEEP_ATTEMPTS = 20
+
+_SCHEMA = (
+    # ts：已计入错题本的最新作答时间
+    'CREATE TABLE IF NOT EXISTS wrong_book (learner TEXT PRIMARY KEY, bits BLOB NOT NULL, ts REAL NOT NULL DEFAULT 0)',
+    'CREATE TABLE IF NOT EXISTS wrong_attempts ('
+    'learner TEXT NOT NULL, attempt INTEGER NOT NULL, bits BLOB NOT NULL, PRIMARY KEY (learner, attempt))',
+)
+
+
+def to_blob(bits: int) -> bytes:
+    return bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+
+
+def from_blob(blob: Optional[bytes]) -> int:
+    return int.from_bytes(blob or b'', 'little')
+
+
+def count(bits: int) -> int:
+    return bin(bits).count('1')
+
+
+def iter_ids(bits: int) -> Iterator[int]:
+    """位集合中的题目ID（从小到大）"""
+    question_id = 0
+    while bits:
+        if bits & 1:
+            yield question_id
+        bits >>= 1
+        question_id += 1
+
+
+def combine(sets: Sequence[int], mode: str = 'union') -> int:
+    """多个位集合的并集（union）或交集（intersection）"""
+    if not sets:
+        return 0
+    result = sets[0]
+    for bits in sets[1:]:
+        result = result | bits if mode == 'union' else result & bits
+    return result
+
+
+def apply_rows(notebook: int, attempts: Dict[int, int], rows, newest: Optional[Dict[int, float]] = None) -> int:
+    """把作答记录（answer_log 的记录格式）按作答时间顺序计入错题本和各次考试的错题，返回新的错题本
+
+    newest 为 {题目ID: 已写入的该题最新作答时间}（见 _newest），早于它的记录只计入那次考试的错题。
+    """
+    for row in sorted(rows, key=lambda row: row[5]):
+        if row[1] is not None:
+            # 模拟试卷的题目ID不是全局题目ID
+            continue
+        bit = 1 << row[2]
+        if not row[4] and row[7] is not None:
+            attempts[row[7]] = attempts.get(row[7], 0) | bit
+        if newest is not None and row[5] < newest.get(row[2], row[5]):
+            continue
+        if row[4]:
+            notebook &= ~bit
+        else:
+            notebook |= bit
+    return notebook
+
+
+def _newest(conn: sqlite3.Connection, learner: str, rows, last_ts: float) -> Dict[int, float]:
+    """早于 last_ts（错题本已计入的最新作答）的记录（离线同步晚到）：查出这些题已写入的最新作答时间"""
+    late = sorted({row[2] for row in rows if row[1] is None and row[5] < last_ts})
+    if not late:
+        return {}
+    return dict(conn.execute(
+        'SELECT question_id, MAX(ts) FROM answers WHERE learner = ? AND source IS NULL '
+        f'AND question_id IN ({", ".join("?" * len(late))}) GROUP BY question_id', [learner] + late))
+
+
+def _init_schema(conn: sqlite3.Connection):
+    for statement in _SCHEMA:
+        conn.execute(statement)
+    # 旧版本数据库的 wrong_book 表没有 ts 列
+    if 'ts' not in [row[1] for row in conn.execute('PRAGMA table_info(wrong_book)')]:
+        conn.execute('ALTER TABLE wrong_book ADD COLUMN ts REAL NOT NULL DEFAULT 0')
+
+
+class WrongBook:
+    """注册到 AnswerLog 的错题本"""
+
+    def __init__(self, answer_log):
+        self.answer_log = answer_log
+        answer_log.add_aggregate(self)
+
+    def init(self, conn: sqlite3.Connection):
+        fresh = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'wrong_book'").fetchone() is None
+        _init_schema(conn)
+        # 旧版本数据库已有作答记录时，从记录重建
+        if fresh and conn.execute('SELECT 1 FROM answers LIMIT 1').fetchone():
+            conn.execute('BEGIN')
+            rebuild(conn)
+            conn.execute('COMMIT')
+
+    def apply(self, conn: sqlite3.Connection, rows):
+        """写线程在写入作答记录的事务中调用"""
+        by_learner = {}
+        for row in rows:
+            if row[1] is None:
+                by_learner.setdefault(row[0], []).append(row)
+        for learner, learner_rows in by_learner.items():
+            notebook, attempts, last_ts = _read(conn, learner, [row[7] for row in learner_rows if row[7] is not None])
+            # 本批记录已写入 answers 表，晚到的记录也与本批中更晚的作答比较
+            newest = _newest(conn, learner, learner_rows, last_ts)
+            notebook = apply_rows(notebook, attempts, learner_rows, newest)
+            _write(conn, learner, notebook, attempts, max([last_ts] + [row[5] for row in learner_rows]))
+
+    def _state(self, learner: str, last: int = 0) -> Tuple[int, List[Tuple[int, int]]]:
+        def read(conn, learner):
+            bits, last_ts = conn.execute('SELECT bits, ts FROM wrong_book WHERE learner = ?',
+                                         (learner,)).fetchone() or (None, 0)
+            attempts = conn.execute('SELECT attempt, bits FROM wrong_attempts WHERE learner = ? '
+                                    'ORDER BY attempt DESC LIMIT ?', (learner, last)).fetchall()
+            return from_blob(bits), {attempt: from_blob(bits) for attempt, bits in attempts}, last_ts
+
+        (notebook, attempts, last_ts), pending = self.answer_log.snapshot(learner, read)
+        newest = {}
+        if any(row[5] < last_ts for row in pending):
+            newest, _ = self.answer_log.snapshot(
+                learner, lambda conn, learner: _newest(conn, learner, pending, last_ts))
+        notebook = apply_rows(notebook, attempts, pending, newest)
+        recent = sorted(attempts.items(), reverse=True)[:last]
+        return notebook, recent
+
+    def notebook(self, learner: str) -> int:
+        """当前错题本"""
+        return self._state(learner)[0]
+
+    def select(self, learner: str, last: int = 0, mode: str = 'union') -> int:
+        """last 为 0 时返回错题本，否则返回最近 last 次考试错题的并集或交集"""
+        notebook, recent = self._state(learner, last)
+        if not last:
+            return notebook
+        return combine([bits for _, bits in recent], mode)
+
+    def summary(self, learner: str, last: int = 3) -> Dict[str, object]:
+        notebook, recent = self._state(learner, last)
+        return {
+            'wrong_count': count(notebook),
+            'attempts': [{'attempt': attempt, 'wrong_count': count(bits)} for attempt, bits in recent],
+        }
+
+
+def _read(conn: sqlite3.Connection, learner: str, attempt_ids) -> Tuple[int, Dict[int, int], float]:
+    row = conn.execute('SELECT bits, ts FROM wrong_book WHERE learner = ?', (learner,)).fetchone()
+    attempts = {}
+    for attempt in set(attempt_ids):
+        bits = conn.execute('SELECT bits FROM wrong_attempts WHERE learner = ? AND attempt = ?',
+                            (learner, attempt)).fetchone()
+        if bits is not None:
+            attempts[attempt] = from_blob(bits[0])
+    if row is None:
+        return 0, attempts, 0
+    return from_blob(row[0]), attempts, row[1]
+
+
+def _write(conn: sqlite3.Connection, learner: str, notebook: int, attempts: Dict[int, int], last_ts: float):
+    conn.execute('INSERT OR REPLACE INTO wrong_book (learner, bits, ts) VALUES (?, ?, ?)',
+                 (learner, to_blob(notebook), last_ts))
+    conn.executemany('INSERT OR REPLACE INTO wrong_attempts (learner, attempt, bits) VALUES (?, ?, ?)',
+                     [(learner, attempt, to_blob(bits)) for attempt, bits in attempts.items()])
+    if attempts:
+        conn.execute('DELETE FROM wrong_attempts WHERE learner = ? AND attempt NOT IN '
+                     '(SELECT attempt FROM wrong_attempts WHERE learner = ? ORDER BY attempt DESC LIMIT ?)',
+                     (learner, learner, KEEP_ATTEMPTS))
+
+
+def rebuild(conn: sqlite3.Connection, learner: Optional[str] = None) -> int:
+    """从作答记录重建错题本（全部或指定学习者），返回重建的学习者数"""
+    where, params = ('WHERE learner = ?', (learner,)) if learner else ('', ())
+    conn.execute(f'DELETE FROM wrong_book {where}', params)
+    conn.execute(f'DELETE FROM wrong_attempts {where}', params)
+    cursor = conn.execute('SELECT learner, source, question_id, answer, correct, ts, latency_ms, attempt '
+                          f'FROM answers {where} ORDER BY learner, ts, id', params)
+    rebuilt = 0
+    current, notebook, attempts, last_ts = None, 0, {}, 0
+    for row in cursor.fetchall() + [(None,) * 8]:
+        if row[0] != current:
+            if current is not None:
+                _write(conn, current, notebook, attempts, last_ts)
+                rebuilt += 1
+            current, notebook, attempts, last_ts = row[0], 0, {}, 0
+        if current is not None:
+            notebook = apply_rows(notebook, attempts, [row])
+            last_ts = row[5]
+    return rebuilt
+
+
+def main():
+    parser = argparse.ArgumentParser(description='错题本')
+    parser.add_argument('learner', nargs='?', help='学习者ID（省略时为全部）')
+    parser.add_argument('--rebuild', action='store_true', help='从作答记录重建错题本')
+    args = parser.parse_args()
+
+    path = os.environ.get('EXAM_ANSWER_DB', ANSWER_DB)
+    if not os.path.exists(path):
+        print(f'没有作答记录: {path}')
+        sys.exit(1)
+    conn = connect(path)
+    _init_schema(conn)
+    if args.rebuild:
+        conn.execute('BEGIN')
+        rebuilt = rebuild(conn, args.learner)
+        conn.execute('COMMIT')
+        print(f'已重建 {rebuilt} 个学习者的错题本')
+
+    where, params = ('WHERE learner = ?', (args.learner,)) if args.learner else ('', ())
+    for learner, bits in conn.execute(f'SELECT learner, bits FROM wrong_book {where} ORDER BY learner', params):
+        ids = list(iter_ids(from_blob(bits)))
+        preview = ', '.join(str(i + 1) for i in ids[:20]) + (' ...' if len(ids) > 20 else '')
+        print(f'{learner}: 错题 {len(ids)} 道（{len(bits)} 字节）  题号: {preview}')
+
+
+if __name__ == '__main__':
+    main()